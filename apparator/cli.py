@@ -1,52 +1,222 @@
 import argparse
 import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from apparator.core.browser import with_browsers
-from apparator.handlers.hackerrank import HackerRankHandler
-from apparator.config import get_config
+# Playwright, the handlers and the .env loader are imported only by the
+# commands that go online, so --help and offline queries start instantly.
+
+# The sync script's state database, which doubles as the local index
+STATE_DB = Path("submissions.db")
+# What HackerRankHandler archives with --snapshots
+SNAPSHOT_KINDS = ("listing", "listing_api", "submission", "submission_api")
+
+
+def _open_store(args: argparse.Namespace):
+    from apparator.utils.state_store import SubmissionStore
+
+    if not args.state.exists():
+        print(f"No local index at {args.state}; run `list --refresh` or "
+              "scripts/process_submissions.py first", file=sys.stderr)
+        raise SystemExit(1)
+    return SubmissionStore(args.state)
+
+
+@contextmanager
+def _live_handler(args: argparse.Namespace) -> Iterator[Any]:
+    """A logged-in HackerRankHandler on one browser engine."""
+    from apparator.config import get_config
+    from apparator.core.browser import with_browsers
+    from apparator.handlers.hackerrank import HackerRankHandler
+    from apparator.utils.auth import SESSION_FILE
+
+    block = None if args.load_all else HackerRankHandler.resource_policy
+    with with_browsers(headless=args.headless, engines=["chromium"]) as bm:
+        page = bm.new_page(storage_path=SESSION_FILE, block=block)
+        handler = HackerRankHandler(page, get_config())
+        handler.ensure_login(SESSION_FILE)
+        yield handler
+
+
+def _indexed(store, status: Optional[str]) -> List[Tuple[int, Dict[str, Any]]]:
+    """Entries numbered in the order they were first listed; numbers are stable."""
+    entries = list(enumerate(store.entries()))
+    if status:
+        entries = [(i, e) for i, e in entries if e["status"] == status]
+    return entries
+
+
+def _print_entries(entries: List[Tuple[int, Dict[str, Any]]]) -> None:
+    for idx, entry in entries:
+        print(f"[{idx}] {entry['title']} -> {entry['url']} ({entry['status']})")
 
 
 def list_submissions(args: argparse.Namespace) -> None:
-    cfg = get_config()
-    with with_browsers(headless=args.headless) as bm:
-        page = bm.new_page()
-        handler = HackerRankHandler(page, cfg)
-        handler.login()
-        submissions = handler.list_submissions()
-        for idx, sub in enumerate(submissions):
-            print(f"[{idx}] {sub['title']} -> {sub['url']}")
+    if args.refresh:
+        from apparator.utils.state_store import SubmissionStore
+
+        with SubmissionStore(args.state) as store, _live_handler(args) as handler:
+            added = store.record_listed(handler.iter_submissions(known=store.known_urls()))
+        print(f"{added} new submission(s) recorded", file=sys.stderr)
+    with _open_store(args) as store:
+        _print_entries(_indexed(store, args.status))
+
+
+def search_submissions(args: argparse.Namespace) -> None:
+    query = args.query.casefold()
+    with _open_store(args) as store:
+        _print_entries([
+            (i, e) for i, e in _indexed(store, args.status)
+            if any(query in (e.get(k) or "").casefold() for k in ("title", "challenge", "url"))
+        ])
 
 
 def fetch_submission(args: argparse.Namespace) -> None:
-    cfg = get_config()
-    with with_browsers(headless=args.headless) as bm:
-        page = bm.new_page()
-        handler = HackerRankHandler(page, cfg)
-        handler.login()
-        submissions = handler.list_submissions()
-        if args.index < 0 or args.index >= len(submissions):
-            print("Index out of range", file=sys.stderr)
-            return
-        entry = submissions[args.index]
-        details = handler.fetch_submission(entry, download_dir=args.output)
+    from apparator.utils.artifacts import STATEMENT_FILE, solution_name
+
+    with _open_store(args) as store:
+        entries = store.entries()
+    if args.index < 0 or args.index >= len(entries):
+        print("Index out of range", file=sys.stderr)
+        return
+    entry = entries[args.index]
+
+    if args.live:
+        with _live_handler(args) as handler:
+            details = handler.fetch_submission(entry, download_dir=args.output)
         print(details["solution"])
         if details.get("pdf"):
             print(f"PDF saved to {details['pdf']}")
+        return
+
+    folder = Path(entry["folder"]) if entry.get("folder") else None
+    solution = folder / solution_name(entry["digest"]) if folder and entry.get("digest") else None
+    if solution is None or not solution.exists():
+        print(f"{entry['title']} has not been synced ({entry['status']}); "
+              "use --live to fetch it from HackerRank", file=sys.stderr)
+        raise SystemExit(1)
+    print(solution.read_text())
+    statement = folder / STATEMENT_FILE
+    if statement.exists():
+        print(f"Statement PDF: {statement}")
+
+
+def reextract_snapshots(args: argparse.Namespace) -> None:
+    import json
+    import time
+
+    from apparator.core.reextract import reextract
+    from apparator.handlers.hackerrank import HackerRankHandler
+    from apparator.utils.snapshots import SnapshotArchive
+
+    if not HackerRankHandler.supports_snapshots:
+        print(f"{HackerRankHandler.__name__} cannot re-extract snapshots", file=sys.stderr)
+        raise SystemExit(1)
+    archive = SnapshotArchive(args.snapshots)
+    config = {"HR_BASE_URL": args.base_url} if args.base_url else {}
+    started = time.monotonic()
+    total = errors = 0
+    incomplete: List[Any] = []
+    entries: List[Dict[str, Any]] = []
+    out = open(args.output, "w") if args.output else None
+    try:
+        for result in reextract(
+            archive, HackerRankHandler, config, processes=args.processes, kinds=args.kind,
+        ):
+            total += 1
+            if not result.ok:
+                errors += 1
+                print(f"{result.path}: {result.error}", file=sys.stderr)
+            elif result.missing:
+                incomplete.append(result)
+            if result.ok and "entries" in result.details:
+                entries.extend(result.details["entries"])
+            if out is not None:
+                out.write(json.dumps(result.as_dict()) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+
+    print(f"Re-extracted {total} snapshot(s) in {time.monotonic() - started:.1f}s: "
+          f"{len(incomplete)} with empty fields, {errors} error(s)")
+    for result in incomplete[:args.show]:
+        print(f"  {result.kind} {result.url}: no {', '.join(result.missing)}")
+    if len(incomplete) > args.show:
+        print(f"  ... and {len(incomplete) - args.show} more")
+    if args.record and entries:
+        from apparator.utils.state_store import SubmissionStore
+
+        with SubmissionStore(args.state) as store:
+            added = store.record_listed(entries)
+        print(f"{added} new submission(s) recorded from archived listings")
 
 
 def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(description="Interact with HackerRank submissions")
+    parser.add_argument(
+        "--state", type=Path, default=STATE_DB,
+        help="Local index of synced submissions (the sync script's state database)",
+    )
     parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
+    parser.add_argument(
+        "--load-all", action="store_true",
+        help="Load images, fonts and trackers instead of blocking them",
+    )
     sub = parser.add_subparsers(dest="command", required=True)
 
-    list_p = sub.add_parser("list", help="List all submissions")
+    list_p = sub.add_parser("list", help="List submissions from the local index")
+    list_p.add_argument(
+        "--refresh", action="store_true",
+        help="First record new submissions from HackerRank (opens a browser)",
+    )
+    list_p.add_argument("--status", help="Only entries with this status, e.g. committed")
     list_p.set_defaults(func=list_submissions)
 
-    fetch_p = sub.add_parser("fetch", help="Fetch a submission by index")
+    search_p = sub.add_parser("search", help="Find submissions by title, challenge or URL")
+    search_p.add_argument("query", help="Case-insensitive text to look for")
+    search_p.add_argument("--status", help="Only entries with this status, e.g. committed")
+    search_p.set_defaults(func=search_submissions)
+
+    fetch_p = sub.add_parser("fetch", help="Show a synced submission by index")
     fetch_p.add_argument("index", type=int, help="Index of submission from list")
-    fetch_p.add_argument("-o", "--output", default=".", help="Directory to store downloaded PDF")
+    fetch_p.add_argument(
+        "--live", action="store_true",
+        help="Fetch from HackerRank instead of the synced files (opens a browser)",
+    )
+    fetch_p.add_argument(
+        "-o", "--output", default=".", help="With --live, directory to store the downloaded PDF",
+    )
     fetch_p.set_defaults(func=fetch_submission)
 
+    reextract_p = sub.add_parser(
+        "reextract",
+        help="Re-run the page parsing over archived snapshots (no browser or network)",
+    )
+    reextract_p.add_argument(
+        "--snapshots", type=Path, default=Path("snapshots"),
+        help="Snapshot archive written by process_submissions.py --snapshots",
+    )
+    reextract_p.add_argument(
+        "--kind", action="append", choices=SNAPSHOT_KINDS,
+        help="Only snapshots of this kind (repeatable)",
+    )
+    reextract_p.add_argument(
+        "--processes", type=int, default=None, help="Worker processes (default: one per CPU)",
+    )
+    reextract_p.add_argument("-o", "--output", help="Write every result as a JSON line to this file")
+    reextract_p.add_argument(
+        "--show", type=int, default=20, help="How many incomplete pages to list",
+    )
+    reextract_p.add_argument(
+        "--record", action="store_true",
+        help="Record submissions found in archived listings in the --state index",
+    )
+    reextract_p.add_argument(
+        "--base-url", default=None, help="Resolve relative links against this host (default: HackerRank)",
+    )
+    reextract_p.set_defaults(func=reextract_snapshots)
+
     args = parser.parse_args(argv)
     args.func(args)
 
@@ -1,27 +1,49 @@
 # apparator/config.py
 import os
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Any
 
 # 1) Figure out where our .env lives (project root)
 PROJECT_ROOT = Path(__file__).parent.parent
 ENV_PATH = PROJECT_ROOT / ".env"
 
-# 2) Load it
-load_dotenv(dotenv_path=ENV_PATH)
+# 2) The values we expose, read from the environment (and .env) on first use:
+#    HR_USER / HR_PASS    HackerRank credentials
+#    GH_TOKEN             token used to push commits
+#    HR_BASE_URL          point the HackerRank handler at another host, e.g. the benchmark server
+#    HR_ACCOUNTS          JSON file listing several accounts to sync (see apparator/core/accounts.py)
+ENV_KEYS = ("HR_USER", "HR_PASS", "GH_TOKEN", "HR_BASE_URL", "HR_ACCOUNTS")
 
-# 3) Expose the values
-HR_USER = os.getenv("HR_USER")
-HR_PASS = os.getenv("HR_PASS")
-GH_TOKEN = os.getenv("GH_TOKEN")
+_loaded = False
+
+
+def load_env() -> None:
+    """
+    Load ``.env`` and read the settings into module attributes. Deferred
+    until a setting is needed so importing apparator stays cheap; values
+    assigned to the module beforehand (e.g. by the benchmarks) are kept.
+    """
+    global _loaded
+    if _loaded:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path=ENV_PATH)
+    for key in ENV_KEYS:
+        globals().setdefault(key, os.getenv(key))
+    _loaded = True
+
+
+def __getattr__(name: str) -> Any:
+    if name in ENV_KEYS:
+        load_env()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_config() -> dict:
     """
     Returns a dict of all the config values your handlers will need.
     """
-    return {
-        "HR_USER": HR_USER,
-        "HR_PASS": HR_PASS,
-        "GH_TOKEN": GH_TOKEN,
-    }
+    load_env()
+    return {key: globals()[key] for key in ENV_KEYS}
@@ -0,0 +1,150 @@
+# apparator/core/accounts.py
+"""Sync several accounts in one run, sharing one browser."""
+
+import asyncio
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from apparator.core.blocking import ResourcePolicy
+from apparator.core.sync import MAX_ATTEMPTS, AsyncSyncRunner, SyncReport
+from apparator.utils.github_sync import BackgroundPusher
+from apparator.utils.snapshots import SnapshotArchive
+from apparator.utils.state_store import SubmissionStore
+
+# Per-account state databases and saved sessions live here by default
+STATE_DIR = Path("accounts_state")
+SESSION_DIR = Path("sessions")
+# Accounts synced at the same time by default
+ACCOUNT_LIMIT = 4
+# Account names become directory and file names
+NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+class Account:
+    """One account to sync: a name and the handler config to use for it."""
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        if not NAME_RE.match(name):
+            raise ValueError(f"Invalid account name {name!r}: use letters, digits, '_', '.' and '-'")
+        self.name = name
+        self.config = config
+
+    def __repr__(self) -> str:
+        return f"Account({self.name!r})"
+
+
+def load_accounts(path: Union[str, Path], base: Optional[Dict[str, Any]] = None) -> List[Account]:
+    """
+    Read accounts from a JSON file: a list of objects (or ``{"accounts":
+    [...]}``) with a ``name`` and config values such as ``HR_USER`` and
+    ``HR_PASS``. ``HR_PASS_ENV`` names an environment variable holding the
+    password instead, so the file can be committed. Each account's config
+    starts from ``base``, so shared objects (rate limiter, PDF cache,
+    metrics) are shared between accounts; a snapshot archive is split into
+    one subdirectory per account.
+    """
+    data = json.loads(Path(path).read_text())
+    if isinstance(data, dict):
+        data = data.get("accounts", [])
+    accounts = []
+    seen = set()
+    for item in data:
+        item = dict(item)
+        name = item.pop("name", None) or item.get("HR_USER")
+        if not name:
+            raise ValueError(f"{path}: every account needs a name or HR_USER")
+        if name in seen:
+            raise ValueError(f"{path}: duplicate account {name!r}")
+        seen.add(name)
+        env = item.pop("HR_PASS_ENV", None)
+        if env is not None:
+            item["HR_PASS"] = os.getenv(env)
+        config = {**(base or {}), **item}
+        if config.get("SNAPSHOTS") is not None:
+            # Every account sees the same listing URLs; keep their pages apart
+            config["SNAPSHOTS"] = SnapshotArchive(config["SNAPSHOTS"].root / name)
+        accounts.append(Account(name, config))
+    return accounts
+
+
+async def _sync_account(
+    account: Account,
+    bm: Any,
+    handler_class: Callable[[Any, Dict[str, Any]], Any],
+    repo: Path,
+    state_dir: Path,
+    session_dir: Path,
+    block: Optional[ResourcePolicy],
+    max_attempts: int,
+    pusher: Optional[BackgroundPusher],
+    full: bool,
+    fetch_kwargs: Dict[str, Any],
+) -> SyncReport:
+    session = session_dir / f"{account.name}.json"
+    ctx = await bm.new_context(storage_path=session, block=block)
+    try:
+        handler = handler_class(await ctx.new_page(), account.config)
+        await handler.ensure_login(session)
+        with SubmissionStore(state_dir / f"{account.name}.db") as store:
+            runner = AsyncSyncRunner(
+                handler, store, repo,
+                problems_dir=repo / account.name / "problems",
+                max_attempts=max_attempts,
+                pusher=pusher,
+                label=account.name,
+            )
+            return await runner.run(full=full, **fetch_kwargs)
+    finally:
+        await ctx.close()
+
+
+async def sync_accounts(
+    accounts: Iterable[Account],
+    bm: Any,
+    handler_class: Callable[[Any, Dict[str, Any]], Any],
+    repo: Union[str, Path],
+    state_dir: Union[str, Path] = STATE_DIR,
+    session_dir: Union[str, Path] = SESSION_DIR,
+    limit: int = ACCOUNT_LIMIT,
+    block: Optional[ResourcePolicy] = None,
+    max_attempts: int = MAX_ATTEMPTS,
+    pusher: Optional[BackgroundPusher] = None,
+    full: bool = False,
+    **fetch_kwargs,
+) -> Dict[str, Union[SyncReport, Exception]]:
+    """
+    Sync ``accounts`` through one entered
+    :class:`~apparator.core.async_browser.AsyncBrowserManager`, at most
+    ``limit`` at a time.
+
+    Every account gets its own browser context started from
+    ``session_dir/<name>.json`` (refreshed after a login), its own state
+    database ``state_dir/<name>.db`` and its own namespace
+    ``<repo>/<name>/problems``; its commits are labelled with its name.
+    ``fetch_kwargs`` (e.g. ``concurrency``) go to each account's
+    :class:`~apparator.core.sync.AsyncSyncRunner`. An account that fails
+    does not stop the others: the result maps each name to its
+    :class:`SyncReport` or to the exception it raised.
+    """
+    repo, state_dir, session_dir = Path(repo), Path(state_dir), Path(session_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    semaphore = asyncio.Semaphore(max(1, limit))
+    accounts = list(accounts)
+
+    async def one(account: Account) -> Union[SyncReport, Exception]:
+        async with semaphore:
+            try:
+                return await _sync_account(
+                    account, bm, handler_class, repo, state_dir, session_dir,
+                    block, max_attempts, pusher, full, fetch_kwargs,
+                )
+            except Exception as exc:
+                print(f"Account {account.name} failed: {exc}", file=sys.stderr)
+                return exc
+
+    results = await asyncio.gather(*(one(account) for account in accounts))
+    return {account.name: result for account, result in zip(accounts, results)}
@@ -0,0 +1,123 @@
+# apparator/core/async_browser.py
+from playwright.async_api import async_playwright, Playwright, Browser, BrowserContext
+from pathlib import Path
+from typing import Optional, Dict, Iterable, Tuple, Union
+
+from apparator.core.blocking import BlockStats, ResourcePolicy, apply_policy_async
+from apparator.core.browser import ENGINES
+
+
+class AsyncBrowserManager:
+    """
+    Asyncio counterpart of :class:`~apparator.core.browser.BrowserManager`.
+
+    Use with ``async with``; engines are launched lazily on first use, and
+    any number of contexts and pages can be driven concurrently from one
+    event loop.
+    """
+
+    def __init__(
+        self,
+        headless: bool = True,
+        engines: Optional[Iterable[str]] = None,
+        preload: Iterable[str] = (),
+    ):
+        self.headless = headless
+        self.engines: Tuple[str, ...] = tuple(engines) if engines is not None else ENGINES
+        unknown = [e for e in self.engines if e not in ENGINES]
+        if unknown:
+            raise ValueError(
+                f"Unknown engine(s) {unknown}. Choose from {list(ENGINES)}")
+        self.preload: Tuple[str, ...] = tuple(preload)
+        not_allowed = [e for e in self.preload if e not in self.engines]
+        if not_allowed:
+            raise ValueError(
+                f"Preloaded engine(s) {not_allowed} are not in {list(self.engines)}")
+        self._playwright: Optional[Playwright] = None
+        self.browsers: Dict[str, Browser] = {}
+        self.block_stats = BlockStats()
+
+    async def __aenter__(self) -> "AsyncBrowserManager":
+        self._playwright = await async_playwright().start()
+        try:
+            for engine in self.preload:
+                await self.browser(engine)
+        except BaseException:
+            # __aexit__ is not called when __aenter__ raises
+            await self.__aexit__(None, None, None)
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        for browser in self.browsers.values():
+            try:
+                await browser.close()
+            except Exception:
+                pass
+        self.browsers.clear()
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def browser(self, engine: str = "chromium") -> Browser:
+        """
+        Return the running Browser for ``engine``, launching it if this is
+        the first time it is needed.
+        """
+        if engine not in self.engines:
+            raise ValueError(
+                f"Unknown engine '{engine}'. Choose one of {list(self.engines)}")
+        if engine not in self.browsers:
+            if self._playwright is None:
+                raise RuntimeError("AsyncBrowserManager must be entered before use")
+            launcher = getattr(self._playwright, engine)
+            self.browsers[engine] = await launcher.launch(headless=self.headless)
+        return self.browsers[engine]
+
+    async def new_context(
+        self,
+        engine: str = "chromium",
+        storage_path: Optional[Union[str, Path]] = None,
+        block: Optional[ResourcePolicy] = None,
+        **kwargs,
+    ) -> BrowserContext:
+        """
+        Create a fresh browser context (like an incognito profile).
+        Pass kwargs through to new_context(), e.g. viewport, user_agent.
+        With ``storage_path`` the context starts from that saved session
+        file when it exists; with ``block`` requests go through the policy.
+        """
+        browser = await self.browser(engine)
+        if storage_path is not None and Path(storage_path).exists():
+            kwargs["storage_state"] = str(storage_path)
+        ctx = await browser.new_context(**kwargs)
+        if block is not None:
+            await apply_policy_async(ctx, block, self.block_stats)
+        return ctx
+
+    async def new_page(
+        self,
+        engine: str = "chromium",
+        storage_path: Optional[Union[str, Path]] = None,
+        block: Optional[ResourcePolicy] = None,
+        **kwargs,
+    ):
+        """
+        Convenience: open a new context + page in one call.
+        """
+        ctx = await self.new_context(engine, storage_path=storage_path, block=block, **kwargs)
+        return await ctx.new_page()
+
+
+def with_async_browsers(
+    headless: bool = True,
+    engines: Optional[Iterable[str]] = None,
+    preload: Iterable[str] = (),
+):
+    """
+    Usage:
+        async with with_async_browsers() as bm:
+            page = await bm.new_page()
+            await page.goto("https://example.com")
+    """
+    return AsyncBrowserManager(headless=headless, engines=engines, preload=preload)
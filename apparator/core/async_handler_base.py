@@ -0,0 +1,145 @@
+# apparator/core/async_handler_base.py
+
+from abc import ABC, abstractmethod
+from apparator.core.blocking import ResourcePolicy
+from apparator.core.handler_base import KNOWN_RUN, take_new
+from apparator.core.metrics import NULL_METRICS, Metrics
+from apparator.core.rate_limit import RateLimiter, RetryPolicy, acall_with_retry
+from apparator.utils.snapshots import SnapshotArchive
+from pathlib import Path
+from playwright.async_api import Page
+from typing import List, Dict, Any, AsyncIterable, AsyncIterator, Container, Optional, Union
+
+
+async def atake_new(
+    entries: AsyncIterable[Dict[str, Any]],
+    known: Optional[Container[str]] = None,
+    known_run: Optional[int] = KNOWN_RUN,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Async version of :func:`apparator.core.handler_base.take_new`."""
+    streak = 0
+    async for entry in entries:
+        if known is not None and entry.get("url") in known:
+            streak += 1
+            if known_run is not None and streak >= known_run:
+                return
+            continue
+        streak = 0
+        yield entry
+
+
+class AsyncSiteHandler(ABC):
+    """
+    Asyncio counterpart of :class:`~apparator.core.handler_base.SiteHandler`.
+    Each handler must know how to:
+      1. await login()
+      2. await list_submissions() → returns a list of metadata dicts
+      3. await fetch_submission(entry) → navigates page and returns full details
+    """
+
+    resource_policy: Optional[ResourcePolicy] = None
+
+    def __init__(self, page: Page, config: Dict[str, Any]):
+        """
+        :param page: a Playwright async Page instance (fresh context)
+        :param config: dict loaded from your .env or config.py
+        """
+        self.page = page
+        self.config = config
+        self.limiter: Optional[RateLimiter] = config.get("RATE_LIMITER")
+        self.retry: RetryPolicy = config.get("RETRY_POLICY") or RetryPolicy()
+        self.metrics: Metrics = config.get("METRICS") or NULL_METRICS
+        self.snapshots: Optional[SnapshotArchive] = config.get("SNAPSHOTS")
+
+    def _count_retry(self) -> None:
+        self.metrics.count("retries")
+
+    async def goto(self, url: str, **kwargs: Any) -> Any:
+        """Navigate through the rate limiter with retries, as ``SiteHandler.goto``."""
+        kwargs.setdefault("timeout", self.retry.timeout)
+        with self.metrics.timer("navigation"):
+            return await acall_with_retry(
+                url, lambda: self.page.goto(url, **kwargs), self.limiter, self.retry,
+                on_retry=self._count_retry,
+            )
+
+    async def request_get(self, url: str, **kwargs: Any) -> Any:
+        kwargs.setdefault("timeout", self.retry.timeout)
+        with self.metrics.timer("request"):
+            return await acall_with_retry(
+                url, lambda: self.page.context.request.get(url, **kwargs), self.limiter,
+                self.retry, on_retry=self._count_retry,
+            )
+
+    async def snapshot(
+        self,
+        kind: str,
+        url: str,
+        body: Optional[str] = None,
+        entry: Optional[Dict[str, Any]] = None,
+        content_type: str = "text/html",
+    ) -> None:
+        """Archive ``body`` or the page's HTML, as ``SiteHandler.snapshot``."""
+        if self.snapshots is None:
+            return
+        with self.metrics.timer("snapshot"):
+            if body is None:
+                body = await self.page.content()
+            self.snapshots.add(kind, url, body, content_type=content_type, entry=entry)
+        self.metrics.count("snapshots")
+
+    @abstractmethod
+    async def login(self) -> None:
+        """Perform whatever steps are needed to log in."""
+        pass
+
+    async def is_logged_in(self) -> bool:
+        """Cheaply check whether the page's context is already authenticated."""
+        return False
+
+    async def ensure_login(self, storage_path: Optional[Union[str, Path]] = None) -> bool:
+        """
+        Reuse the context's session if it is still valid, otherwise log in
+        and save the refreshed session. Returns True after a full login.
+        """
+        if await self.is_logged_in():
+            self.metrics.count("sessions_reused")
+            return False
+        with self.metrics.timer("login"):
+            await self.login()
+        if storage_path is not None:
+            storage_path = Path(storage_path)
+            storage_path.parent.mkdir(parents=True, exist_ok=True)
+            await self.page.context.storage_state(path=str(storage_path))
+        return True
+
+    def challenge_key(self, entry: Dict[str, Any]) -> str:
+        """Name shared by submissions to one problem, as for ``SiteHandler.challenge_key``."""
+        return entry["title"].replace(" ", "_")
+
+    @abstractmethod
+    async def list_submissions(self) -> List[Dict[str, Any]]:
+        """Return a list of entries, as for ``SiteHandler.list_submissions``."""
+        pass
+
+    async def iter_submissions(
+        self,
+        known: Optional[Container[str]] = None,
+        known_run: Optional[int] = KNOWN_RUN,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield entries newest first, skipping ``known`` URLs and stopping
+        after ``known_run`` of them in a row. The default wraps
+        list_submissions(); paginating handlers should override it.
+        """
+        for entry in take_new(await self.list_submissions(), known, known_run):
+            yield entry
+
+    @abstractmethod
+    async def fetch_submission(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Given one metadata entry from list_submissions(),
+        navigate/fetch the problem statement + code + any other info,
+        and return it in a structured dict.
+        """
+        pass
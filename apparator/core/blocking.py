@@ -0,0 +1,128 @@
+# apparator/core/blocking.py
+"""Request interception that drops resources the handlers never read."""
+
+import threading
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterable
+
+# Resource types (Playwright's request.resource_type) that never carry text
+DEFAULT_BLOCKED_TYPES = ("image", "media", "font")
+
+
+class BlockStats:
+    """Counters shared by every context a policy was applied to."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests_allowed = 0
+        self.requests_blocked = 0
+        self.bytes_received = 0
+        self.blocked_by_type: Dict[str, int] = {}
+
+    def record(self, resource_type: str, blocked: bool) -> None:
+        with self._lock:
+            if blocked:
+                self.requests_blocked += 1
+                self.blocked_by_type[resource_type] = (
+                    self.blocked_by_type.get(resource_type, 0) + 1
+                )
+            else:
+                self.requests_allowed += 1
+
+    def record_bytes(self, size: int) -> None:
+        with self._lock:
+            self.bytes_received += size
+
+    def merge(self, stats: Dict[str, Any]) -> None:
+        """Add counts reported by another process (see :meth:`as_dict`)."""
+        with self._lock:
+            self.requests_allowed += stats["requests_allowed"]
+            self.requests_blocked += stats["requests_blocked"]
+            self.bytes_received += stats["bytes_received"]
+            for resource_type, n in stats["blocked_by_type"].items():
+                self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + n
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests_allowed": self.requests_allowed,
+                "requests_blocked": self.requests_blocked,
+                "bytes_received": self.bytes_received,
+                "blocked_by_type": dict(self.blocked_by_type),
+            }
+
+    def __str__(self) -> str:
+        d = self.as_dict()
+        by_type = ", ".join(f"{k}={v}" for k, v in sorted(d["blocked_by_type"].items()))
+        return (
+            f"blocked {d['requests_blocked']} of "
+            f"{d['requests_blocked'] + d['requests_allowed']} requests"
+            f"{f' ({by_type})' if by_type else ''}, "
+            f"received {d['bytes_received']} bytes"
+        )
+
+
+class ResourcePolicy:
+    """
+    Decide which requests a context may make.
+
+    A request is blocked when its resource type is in ``block_types`` or its
+    URL matches one of the ``block_patterns`` globs, unless the URL matches
+    one of the ``allow_patterns`` globs, which always win.
+    """
+
+    def __init__(
+        self,
+        block_types: Iterable[str] = DEFAULT_BLOCKED_TYPES,
+        block_patterns: Iterable[str] = (),
+        allow_patterns: Iterable[str] = (),
+    ):
+        self.block_types = frozenset(block_types)
+        self.block_patterns = tuple(block_patterns)
+        self.allow_patterns = tuple(allow_patterns)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if any(fnmatchcase(url, p) for p in self.allow_patterns):
+            return False
+        if resource_type in self.block_types:
+            return True
+        return any(fnmatchcase(url, p) for p in self.block_patterns)
+
+
+def _content_length(response) -> int:
+    try:
+        return int(response.headers.get("content-length", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def apply_policy(context, policy: ResourcePolicy, stats: BlockStats) -> BlockStats:
+    """Route every request of a sync ``context`` through ``policy``."""
+
+    def handle(route, request):
+        blocked = policy.should_block(request.resource_type, request.url)
+        stats.record(request.resource_type, blocked)
+        if blocked:
+            route.abort()
+        else:
+            route.continue_()
+
+    context.route("**/*", handle)
+    context.on("response", lambda response: stats.record_bytes(_content_length(response)))
+    return stats
+
+
+async def apply_policy_async(context, policy: ResourcePolicy, stats: BlockStats) -> BlockStats:
+    """Async version of :func:`apply_policy` for ``playwright.async_api``."""
+
+    async def handle(route, request):
+        blocked = policy.should_block(request.resource_type, request.url)
+        stats.record(request.resource_type, blocked)
+        if blocked:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle)
+    context.on("response", lambda response: stats.record_bytes(_content_length(response)))
+    return stats
@@ -1,69 +1,369 @@
 # apparator/core/browser.py
 from playwright.sync_api import sync_playwright, Playwright, Browser, BrowserContext
-from typing import Optional, Dict
+from pathlib import Path
+from typing import Any, List, Optional, Dict, Iterable, Tuple, Union
+
+from apparator.core.blocking import BlockStats, ResourcePolicy, apply_policy
+from apparator.core.har import har_files, har_path
+from apparator.core.metrics import NULL_METRICS, Metrics
+from apparator.utils.auth import load_session
+
+ENGINES: Tuple[str, ...] = ("chromium", "firefox", "webkit")
+
+# Navigations a recycling page serves before it is replaced
+RECYCLE_AFTER = 200
+# With a memory limit, check the JS heap every this many navigations
+MEMORY_CHECK_EVERY = 20
+# Errors Playwright raises once a page's renderer is gone
+_CRASH_MARKERS = ("crash", "Target closed", "has been closed")
 
 
 class BrowserManager:
     """
-    Context manager that boots up Playwright, launches browsers,
+    Context manager that boots up Playwright, launches browsers on demand,
     and shuts everything down cleanly on exit.
+
+    Engines are launched lazily the first time a context is requested for
+    them. ``engines`` restricts which engines may be used at all and
+    ``preload`` lists engines to launch up front in ``__enter__``.
+
+    With ``record_har_path`` every context records its traffic, bodies
+    included, to a HAR file: the first to that path, later ones to
+    numbered siblings (``run-1.har``, ...); they are written when the
+    context or the manager closes. With ``route_from_har`` contexts are
+    served entirely from such a recording and any request it does not
+    contain is aborted, so nothing reaches the network.
     """
 
-    def __init__(self, headless: bool = True):
+    def __init__(
+        self,
+        headless: bool = True,
+        engines: Optional[Iterable[str]] = None,
+        preload: Iterable[str] = (),
+        block_stats: Optional[BlockStats] = None,
+        metrics: Optional[Metrics] = None,
+        record_har_path: Optional[Union[str, Path]] = None,
+        route_from_har: Optional[Union[str, Path]] = None,
+    ):
+        if record_har_path is not None and route_from_har is not None:
+            raise ValueError("record_har_path and route_from_har are mutually exclusive")
         self.headless = headless
+        self.engines: Tuple[str, ...] = tuple(engines) if engines is not None else ENGINES
+        unknown = [e for e in self.engines if e not in ENGINES]
+        if unknown:
+            raise ValueError(
+                f"Unknown engine(s) {unknown}. Choose from {list(ENGINES)}")
+        self.preload: Tuple[str, ...] = tuple(preload)
+        not_allowed = [e for e in self.preload if e not in self.engines]
+        if not_allowed:
+            raise ValueError(
+                f"Preloaded engine(s) {not_allowed} are not in {list(self.engines)}")
         self._playwright: Optional[Playwright] = None
         self.browsers: Dict[str, Browser] = {}
+        # Requests blocked/allowed across every context opened with ``block``;
+        # pass a shared instance to aggregate over several managers
+        self.block_stats = block_stats if block_stats is not None else BlockStats()
+        # Times browser launches and context creation when enabled
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.record_har_path = Path(record_har_path) if record_har_path is not None else None
+        self.route_from_har = Path(route_from_har) if route_from_har is not None else None
+        # HAR files written (or being written) by this manager's contexts
+        self.har_paths: List[Path] = []
+        self._recording: List[BrowserContext] = []
 
     def __enter__(self) -> "BrowserManager":
         # Start Playwright
         self._playwright = sync_playwright().start()
-        # Launch 3 engines
-        self.browsers["chromium"] = self._playwright.chromium.launch(
-            headless=self.headless
-        )
-        self.browsers["firefox"] = self._playwright.firefox.launch(
-            headless=self.headless
-        )
-        self.browsers["webkit"] = self._playwright.webkit.launch(
-            headless=self.headless
-        )
+        # Launch only the engines explicitly asked for; the rest start on first use
+        try:
+            for engine in self.preload:
+                self.browser(engine)
+        except BaseException:
+            # __exit__ is not called when __enter__ raises
+            self.__exit__(None, None, None)
+            raise
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        # Close all browsers
+        # A HAR is only saved when its context is closed
+        for ctx in self._recording:
+            try:
+                ctx.close()
+            except Exception:
+                pass
+        self._recording.clear()
+        # Close the browsers that were actually launched
         for browser in self.browsers.values():
             try:
                 browser.close()
             except Exception:
                 pass
+        self.browsers.clear()
         # Stop Playwright
         if self._playwright:
             self._playwright.stop()
+            self._playwright = None
 
-    def new_context(self, engine: str = "chromium", **kwargs) -> BrowserContext:
+    def browser(self, engine: str = "chromium") -> Browser:
+        """
+        Return the running Browser for ``engine``, launching it if this is
+        the first time it is needed.
+        """
+        if engine not in self.engines:
+            raise ValueError(
+                f"Unknown engine '{engine}'. Choose one of {list(self.engines)}")
+        if engine not in self.browsers:
+            if self._playwright is None:
+                raise RuntimeError("BrowserManager must be entered before use")
+            launcher = getattr(self._playwright, engine)
+            with self.metrics.timer("browser_launch"):
+                self.browsers[engine] = launcher.launch(headless=self.headless)
+        return self.browsers[engine]
+
+    def new_context(
+        self,
+        engine: str = "chromium",
+        storage_path: Optional[Union[str, Path]] = None,
+        block: Optional[ResourcePolicy] = None,
+        **kwargs,
+    ) -> BrowserContext:
         """
         Create a fresh browser context (like an incognito profile).
         Pass kwargs through to new_context(), e.g. viewport, user_agent.
+        With ``storage_path`` the context starts from that saved session
+        file when it exists. With ``block`` every request is checked against
+        the policy and counted in ``self.block_stats``.
         """
-        if engine not in self.browsers:
-            raise ValueError(
-                f"Unknown engine '{engine}'. Choose one of {list(self.browsers)}")
-        return self.browsers[engine].new_context(**kwargs)
+        browser = self.browser(engine)
+        if self.record_har_path is not None:
+            path = har_path(self.record_har_path, len(self.har_paths))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.har_paths.append(path)
+            kwargs.setdefault("record_har_path", str(path))
+        with self.metrics.timer("context_open"):
+            if storage_path is not None:
+                ctx = load_session(browser, Path(storage_path), **kwargs)
+            else:
+                ctx = browser.new_context(**kwargs)
+        if self.record_har_path is not None:
+            self._recording.append(ctx)
+        if block is not None:
+            apply_policy(ctx, block, self.block_stats)
+        if self.route_from_har is not None:
+            self._replay(ctx)
+        return ctx
+
+    def _replay(self, ctx: BrowserContext) -> None:
+        """Answer ``ctx``'s requests from the recording; abort everything else."""
+        # Routes registered later are consulted first: the recording files,
+        # falling back to each other, then the catch-all abort
+        ctx.route("**/*", lambda route: route.abort())
+        for path in har_files(self.route_from_har):
+            ctx.route_from_har(str(path), not_found="fallback")
 
-    def new_page(self, engine: str = "chromium", **kwargs):
+    def new_page(
+        self,
+        engine: str = "chromium",
+        storage_path: Optional[Union[str, Path]] = None,
+        block: Optional[ResourcePolicy] = None,
+        **kwargs,
+    ):
         """
         Convenience: open a new context + page in one call.
         """
-        ctx = self.new_context(engine, **kwargs)
+        ctx = self.new_context(engine, storage_path=storage_path, block=block, **kwargs)
         return ctx.new_page()
 
+    def recycling_page(
+        self,
+        engine: str = "chromium",
+        storage_path: Optional[Union[str, Path]] = None,
+        block: Optional[ResourcePolicy] = None,
+        max_navigations: Optional[int] = RECYCLE_AFTER,
+        max_memory_mb: Optional[float] = None,
+        scope: str = "context",
+        **kwargs,
+    ) -> "RecyclingPage":
+        """
+        Like new_page(), but the page is replaced every ``max_navigations``
+        navigations, when its JS heap grows past ``max_memory_mb`` or when
+        it crashes. See RecyclingPage.
+        """
+        return RecyclingPage(
+            self, engine, storage_path=storage_path, block=block,
+            max_navigations=max_navigations, max_memory_mb=max_memory_mb,
+            scope=scope, **kwargs,
+        )
+
+
+def _is_crash(exc: BaseException) -> bool:
+    message = str(exc)
+    return any(marker in message for marker in _CRASH_MARKERS)
+
+
+class RecyclingPage:
+    """
+    Stands in for a Page that is swapped for a fresh one before it grows
+    too large. Everything but goto() and close() is forwarded to the
+    current page, so handlers use it like any other page.
+
+    Recycling happens at the start of a goto(), when the old page's DOM is
+    about to be discarded anyway. With ``scope="context"`` the whole context
+    is replaced, which also frees its caches: its storage state (cookies,
+    local storage) is copied into the new context first, so the session
+    survives. ``scope="page"`` only opens a new page in the same context.
+
+    A crashed page (Playwright's ``crash`` event, or a goto() failing because
+    the target is gone) is replaced the same way and the navigation retried
+    once, so the run carries on. Counted as ``pages_recycled`` and
+    ``page_crashes`` in the manager's metrics.
+    """
+
+    def __init__(
+        self,
+        manager: BrowserManager,
+        engine: str = "chromium",
+        storage_path: Optional[Union[str, Path]] = None,
+        block: Optional[ResourcePolicy] = None,
+        max_navigations: Optional[int] = RECYCLE_AFTER,
+        max_memory_mb: Optional[float] = None,
+        scope: str = "context",
+        **context_kwargs: Any,
+    ):
+        if scope not in ("page", "context"):
+            raise ValueError(f"Unknown recycle scope '{scope}'. Choose 'page' or 'context'")
+        self.manager = manager
+        self.engine = engine
+        self.block = block
+        self.max_navigations = max_navigations
+        self.max_memory_mb = max_memory_mb
+        self.scope = scope
+        self.context_kwargs = context_kwargs
+        self.navigations = 0
+        self.recycles = 0
+        self.crashes = 0
+        self._crashed = False
+        self._state: Optional[Dict[str, Any]] = None
+        self._context = manager.new_context(
+            engine, storage_path=storage_path, block=block, **context_kwargs
+        )
+        self._open_page()
+
+    @property
+    def page(self) -> Any:
+        """The Playwright page currently in use."""
+        return self._page
+
+    @property
+    def context(self) -> BrowserContext:
+        return self._context
+
+    def _open_page(self) -> None:
+        page = self._context.new_page()
+        page.on("crash", self._on_crash)
+        self._page = page
+        self._crashed = False
+        self.navigations = 0
+
+    def _on_crash(self, *args: Any) -> None:
+        self._crashed = True
+
+    def _open_context(self) -> None:
+        kwargs = dict(self.context_kwargs)
+        if self._state is not None:
+            kwargs["storage_state"] = self._state
+        self._context = self.manager.new_context(self.engine, block=self.block, **kwargs)
+        self._open_page()
+
+    def memory_mb(self) -> Optional[float]:
+        """JS heap in use by the current page, or None where the engine hides it."""
+        try:
+            used = self._page.evaluate(
+                "() => performance.memory ? performance.memory.usedJSHeapSize : null"
+            )
+        except Exception:
+            return None
+        return used / (1024 * 1024) if used else None
+
+    def due(self) -> Optional[str]:
+        """Why the current page should be replaced before the next navigation, if at all."""
+        if self._crashed:
+            return "crash"
+        if self.max_navigations and self.navigations >= self.max_navigations:
+            return "navigations"
+        if (self.max_memory_mb and self.navigations
+                and self.navigations % MEMORY_CHECK_EVERY == 0):
+            used = self.memory_mb()
+            if used is not None and used > self.max_memory_mb:
+                return "memory"
+        return None
+
+    def recycle(self, reason: str = "manual") -> None:
+        """Replace the page (and, with context scope, its context) now."""
+        old_page, old_context = self._page, self._context
+        if reason == "crash":
+            self.crashes += 1
+            self.manager.metrics.count("page_crashes")
+        if self.scope == "context":
+            try:
+                self._state = old_context.storage_state()
+            except Exception:
+                # Keep the state saved at the previous recycle, if any
+                pass
+            self._open_context()
+            closing = old_context
+        else:
+            self._open_page()
+            closing = old_page
+        try:
+            closing.close()
+        except Exception:
+            pass
+        self.recycles += 1
+        self.manager.metrics.count("pages_recycled")
+
+    def goto(self, url: str, **kwargs: Any) -> Any:
+        reason = self.due()
+        if reason is not None:
+            self.recycle(reason)
+        try:
+            response = self._page.goto(url, **kwargs)
+        except Exception as exc:
+            if not (self._crashed or _is_crash(exc)):
+                raise
+            self.recycle("crash")
+            response = self._page.goto(url, **kwargs)
+        self.navigations += 1
+        return response
+
+    def close(self) -> None:
+        try:
+            self._context.close()
+        except Exception:
+            pass
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._page, name)
+
 
 # Convenience function for one-off scripts:
-def with_browsers(headless: bool = True):
+def with_browsers(
+    headless: bool = True,
+    engines: Optional[Iterable[str]] = None,
+    preload: Iterable[str] = (),
+    metrics: Optional[Metrics] = None,
+    record_har_path: Optional[Union[str, Path]] = None,
+    route_from_har: Optional[Union[str, Path]] = None,
+):
     """
     Usage:
         with with_browsers(headless=False) as bm:
             page = bm.new_page(engine="firefox")
             page.goto("https://example.com")
     """
-    return BrowserManager(headless=headless)
+    return BrowserManager(
+        headless=headless, engines=engines, preload=preload, metrics=metrics,
+        record_har_path=record_har_path, route_from_har=route_from_har,
+    )
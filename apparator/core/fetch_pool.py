@@ -0,0 +1,309 @@
+# apparator/core/fetch_pool.py
+"""Fetch many submissions with a bounded pool of browser pages."""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional
+
+from apparator.core.blocking import BlockStats, ResourcePolicy
+from apparator.core.browser import RECYCLE_AFTER, BrowserManager
+from apparator.core.handler_base import SiteHandler
+from apparator.core.http_session import HttpSession
+from apparator.core.metrics import NULL_METRICS
+
+# Requests in flight on the HTTP fetch path by default
+HTTP_WORKERS = 8
+
+_STOP = object()
+_WORKER_EXIT = object()
+
+
+class FetchResult:
+    """Outcome of fetching one entry: either ``details`` or ``error`` is set."""
+
+    def __init__(
+        self,
+        entry: Dict[str, Any],
+        details: Optional[Dict[str, Any]] = None,
+        error: Optional[BaseException] = None,
+    ):
+        self.entry = entry
+        self.details = details
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        state = "ok" if self.ok else f"error={self.error!r}"
+        return f"FetchResult({self.entry.get('url')!r}, {state})"
+
+
+def _fetch_one(
+    handler: SiteHandler,
+    entry: Dict[str, Any],
+    download_dir: Optional[Callable[[Dict[str, Any]], str]],
+) -> FetchResult:
+    metrics = getattr(handler, "metrics", None) or NULL_METRICS
+    try:
+        with metrics.timer("fetch"):
+            if download_dir is not None:
+                details = handler.fetch_submission(entry, download_dir=download_dir(entry))
+            else:
+                details = handler.fetch_submission(entry)
+    except Exception as exc:
+        return FetchResult(entry, error=exc)
+    return FetchResult(entry, details=details)
+
+
+async def _afetch_one(
+    handler: Any,
+    entry: Dict[str, Any],
+    download_dir: Optional[Callable[[Dict[str, Any]], str]],
+) -> FetchResult:
+    metrics = getattr(handler, "metrics", None) or NULL_METRICS
+    try:
+        with metrics.timer("fetch"):
+            if download_dir is not None:
+                details = await handler.fetch_submission(entry, download_dir=download_dir(entry))
+            else:
+                details = await handler.fetch_submission(entry)
+    except Exception as exc:
+        return FetchResult(entry, error=exc)
+    return FetchResult(entry, details=details)
+
+
+def fetch_submissions(
+    handler: SiteHandler,
+    entries: Iterable[Dict[str, Any]],
+    concurrency: int = 1,
+    download_dir: Optional[Callable[[Dict[str, Any]], str]] = None,
+    handler_factory: Optional[Callable[[Any], SiteHandler]] = None,
+    headless: bool = True,
+    engine: str = "chromium",
+    block: Optional[ResourcePolicy] = None,
+    block_stats: Optional[BlockStats] = None,
+    recycle_after: Optional[int] = RECYCLE_AFTER,
+    recycle_mb: Optional[float] = None,
+) -> Iterator[FetchResult]:
+    """
+    Fetch ``entries`` and yield a :class:`FetchResult` for each one as soon
+    as it completes.
+
+    With ``concurrency=1`` every entry is fetched in order on ``handler``'s
+    own page. With a higher limit, up to ``concurrency`` worker threads each
+    start their own Playwright instance (the sync API is bound to the thread
+    that created it) and open a context from ``handler``'s current storage
+    state, so they share its logged-in session. A failure only affects the
+    entry that raised it.
+
+    :param download_dir: called with each entry to pick its PDF directory
+    :param handler_factory: builds a worker handler from a page; defaults to
+        ``type(handler)(page, handler.config)``
+    :param block: resource policy applied to the worker contexts, counted
+        in ``block_stats`` when given
+    :param recycle_after: worker pages are replaced after this many
+        navigations (None or 0: never), once their JS heap passes
+        ``recycle_mb`` and whenever they crash; see
+        :class:`~apparator.core.browser.RecyclingPage`
+    """
+    pending: List[Dict[str, Any]] = list(entries)
+    workers = min(max(1, concurrency), len(pending))
+    if workers <= 1:
+        for entry in pending:
+            yield _fetch_one(handler, entry, download_dir)
+        return
+
+    if handler_factory is None:
+        def handler_factory(page):
+            return type(handler)(page, handler.config)
+
+    storage_state = handler.page.context.storage_state()
+    tasks: "queue.Queue[Any]" = queue.Queue()
+    results: "queue.Queue[Any]" = queue.Queue()
+    stop = threading.Event()
+    for entry in pending:
+        tasks.put(entry)
+    for _ in range(workers):
+        tasks.put(_STOP)
+
+    def worker() -> None:
+        try:
+            with BrowserManager(
+                headless=headless, engines=[engine], block_stats=block_stats,
+                metrics=getattr(handler, "metrics", None),
+            ) as bm:
+                page = bm.recycling_page(
+                    engine, block=block, storage_state=storage_state,
+                    max_navigations=recycle_after or None, max_memory_mb=recycle_mb,
+                )
+                worker_handler = handler_factory(page)
+                while not stop.is_set():
+                    entry = tasks.get()
+                    if entry is _STOP:
+                        break
+                    results.put(_fetch_one(worker_handler, entry, download_dir))
+        except Exception:
+            # A worker that cannot start simply leaves its entries to the others
+            pass
+        finally:
+            results.put(_WORKER_EXIT)
+
+    threads = [
+        threading.Thread(target=worker, name=f"fetch-worker-{i}", daemon=True)
+        for i in range(workers)
+    ]
+    for t in threads:
+        t.start()
+
+    remaining = len(pending)
+    alive = workers
+    try:
+        while remaining and alive:
+            item = results.get()
+            if item is _WORKER_EXIT:
+                alive -= 1
+                continue
+            remaining -= 1
+            yield item
+        # Every worker is gone: report whatever nobody picked up
+        while remaining:
+            try:
+                entry = tasks.get_nowait()
+            except queue.Empty:
+                # The rest were taken by workers that died before reporting
+                break
+            if entry is _STOP:
+                continue
+            remaining -= 1
+            yield FetchResult(entry, error=RuntimeError("no fetch worker available"))
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+
+
+def _fetch_http_one(
+    handler: SiteHandler, session: HttpSession, entry: Dict[str, Any], download_dir: str
+) -> FetchResult:
+    metrics = getattr(handler, "metrics", None) or NULL_METRICS
+    try:
+        with metrics.timer("fetch"):
+            details = handler.fetch_submission_http(entry, session, download_dir=download_dir)
+    except Exception as exc:
+        return FetchResult(entry, error=exc)
+    return FetchResult(entry, details=details)
+
+
+def fetch_submissions_http(
+    handler: SiteHandler,
+    entries: Iterable[Dict[str, Any]],
+    workers: int = HTTP_WORKERS,
+    download_dir: Optional[Callable[[Dict[str, Any]], str]] = None,
+    session: Optional[HttpSession] = None,
+    **fallback_kwargs: Any,
+) -> Iterator[FetchResult]:
+    """
+    Fetch ``entries`` with ``handler.fetch_submission_http`` from ``workers``
+    threads sharing one :class:`HttpSession` (by default built from the
+    cookies of ``handler.page``'s context), yielding results as they
+    complete. Entries that fail over HTTP are then fetched again through
+    the rendered pages by :func:`fetch_submissions`, which receives
+    ``fallback_kwargs`` (``concurrency``, ``block``, ...).
+    """
+    pending: List[Dict[str, Any]] = list(entries)
+    if not pending:
+        return
+    own_session = session is None
+    if own_session:
+        session = HttpSession.from_context(
+            handler.page.context, timeout=handler.retry.timeout / 1000
+        )
+    # Resolved once, so a fallback fetch reuses the same directory (and any
+    # claim download_dir made for it)
+    dirs = {e["url"]: download_dir(e) if download_dir is not None else "" for e in pending}
+    failed: List[FetchResult] = []
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending))),
+                              thread_name_prefix="http-fetch")
+    try:
+        futures = [
+            pool.submit(_fetch_http_one, handler, session, entry, dirs[entry["url"]])
+            for entry in pending
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            if result.ok:
+                yield result
+            else:
+                failed.append(result)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if own_session:
+            session.close()
+    if not failed:
+        return
+    (getattr(handler, "metrics", None) or NULL_METRICS).count("http_fallbacks", len(failed))
+    yield from fetch_submissions(
+        handler, [r.entry for r in failed],
+        download_dir=(lambda e: dirs[e["url"]]) if download_dir is not None else None,
+        **fallback_kwargs,
+    )
+
+
+async def fetch_submissions_async(
+    handler: Any,
+    entries: Iterable[Dict[str, Any]],
+    concurrency: int = 1,
+    download_dir: Optional[Callable[[Dict[str, Any]], str]] = None,
+    handler_factory: Optional[Callable[[Any], Any]] = None,
+) -> AsyncIterator[FetchResult]:
+    """
+    Asyncio version of :func:`fetch_submissions` for
+    :class:`~apparator.core.async_handler_base.AsyncSiteHandler` instances.
+
+    Extra pages are opened in ``handler``'s own browser context, so they
+    share its session without copying storage state, and are closed once
+    every entry has been yielded.
+    """
+    pending: List[Dict[str, Any]] = list(entries)
+    workers = min(max(1, concurrency), len(pending))
+    if workers <= 1:
+        for entry in pending:
+            yield await _afetch_one(handler, entry, download_dir)
+        return
+
+    if handler_factory is None:
+        def handler_factory(page):
+            return type(handler)(page, handler.config)
+
+    tasks: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+    results: "asyncio.Queue[FetchResult]" = asyncio.Queue()
+    for entry in pending:
+        tasks.put_nowait(entry)
+
+    async def worker(worker_handler) -> None:
+        while True:
+            try:
+                entry = tasks.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await results.put(await _afetch_one(worker_handler, entry, download_dir))
+
+    extra_pages = [await handler.page.context.new_page() for _ in range(workers - 1)]
+    handlers = [handler] + [handler_factory(page) for page in extra_pages]
+    jobs = [asyncio.create_task(worker(h)) for h in handlers]
+    try:
+        for _ in range(len(pending)):
+            yield await results.get()
+    finally:
+        for job in jobs:
+            job.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+        for page in extra_pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
@@ -1,8 +1,48 @@
 # apparator/core/handler_base.py
 
 from abc import ABC, abstractmethod
+from pathlib import Path
 from playwright.sync_api import Page
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Container, Iterable, Iterator, Optional, Union
+
+from apparator.core.blocking import ResourcePolicy
+from apparator.core.har import HarReplay
+from apparator.core.metrics import NULL_METRICS, Metrics
+from apparator.core.rate_limit import RateLimiter, RetryPolicy, call_with_retry
+from apparator.utils.auth import save_session
+from apparator.utils.snapshots import SnapshotArchive
+
+# Consecutive already-known entries after which incremental listing stops
+KNOWN_RUN = 10
+
+
+class SessionExpired(RuntimeError):
+    """The site rejected the context's session; log in again and retry."""
+
+
+def take_new(
+    entries: Iterable[Dict[str, Any]],
+    known: Optional[Container[str]] = None,
+    known_run: Optional[int] = KNOWN_RUN,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the entries of a newest-first listing whose ``url`` is not in
+    ``known``. Once ``known_run`` known entries have been seen in a row the
+    listing is abandoned, so a lazy ``entries`` iterable stops paginating.
+    ``known_run=None`` filters without stopping early.
+    """
+    if known is None:
+        yield from entries
+        return
+    streak = 0
+    for entry in entries:
+        if entry.get("url") in known:
+            streak += 1
+            if known_run is not None and streak >= known_run:
+                return
+            continue
+        streak = 0
+        yield entry
 
 
 class SiteHandler(ABC):
@@ -14,19 +54,128 @@ class SiteHandler(ABC):
       3. fetch_submission(entry) → navigates page and returns full details
     """
 
+    # Default request blocking for contexts opened for this handler, e.g.
+    # ``bm.new_page(block=MyHandler.resource_policy)``; None loads everything.
+    resource_policy: Optional[ResourcePolicy] = None
+    # Whether the handler implements fetch_submission_http(entry, session,
+    # download_dir): the same details as fetch_submission() fetched with
+    # plain HTTP requests through ``session``, from a worker thread
+    supports_http = False
+    # Whether the handler implements extract_snapshot(snapshot): its parsing
+    # re-run over a record from apparator.utils.snapshots.load_snapshot(),
+    # without a browser or network
+    supports_snapshots = False
+
     def __init__(self, page: Page, config: Dict[str, Any]):
         """
         :param page: a Playwright Page instance (fresh context)
-        :param config: dict loaded from your .env or config.py
+        :param config: dict loaded from your .env or config.py; a
+            ``RATE_LIMITER`` / ``RETRY_POLICY`` / ``METRICS`` / ``SNAPSHOTS``
+            / ``HAR_REPLAY`` in it is shared by every handler built from the
+            same config
         """
         self.page = page
         self.config = config
+        self.limiter: Optional[RateLimiter] = config.get("RATE_LIMITER")
+        self.retry: RetryPolicy = config.get("RETRY_POLICY") or RetryPolicy()
+        self.metrics: Metrics = config.get("METRICS") or NULL_METRICS
+        # Raw pages are archived here for offline re-extraction when set
+        self.snapshots: Optional[SnapshotArchive] = config.get("SNAPSHOTS")
+        # Serves request_get()/http_get() from a HAR recording when set; the
+        # page itself is replayed by BrowserManager(route_from_har=...)
+        self.har_replay: Optional[HarReplay] = config.get("HAR_REPLAY")
+
+    def _count_retry(self) -> None:
+        self.metrics.count("retries")
+
+    def goto(self, url: str, **kwargs: Any) -> Any:
+        """
+        Navigate through the rate limiter, retrying timeouts and throttled
+        responses. ``timeout`` defaults to the retry policy's.
+        """
+        kwargs.setdefault("timeout", self.retry.timeout)
+        with self.metrics.timer("navigation"):
+            return call_with_retry(
+                url, lambda: self.page.goto(url, **kwargs), self.limiter, self.retry,
+                on_retry=self._count_retry,
+            )
+
+    def request_get(self, url: str, **kwargs: Any) -> Any:
+        """GET ``url`` with the page's cookies, throttled and retried like goto()."""
+        kwargs.setdefault("timeout", self.retry.timeout)
+        get = self.har_replay.get if self.har_replay is not None else self.page.context.request.get
+        with self.metrics.timer("request"):
+            return call_with_retry(
+                url, lambda: get(url, **kwargs), self.limiter,
+                self.retry, on_retry=self._count_retry,
+            )
+
+    def http_get(self, session: Any, url: str, **kwargs: Any) -> Any:
+        """
+        GET ``url`` through an :class:`~apparator.core.http_session.HttpSession`,
+        throttled and retried like request_get(). Safe to call from any thread.
+        """
+        get = self.har_replay.get if self.har_replay is not None else session.get
+        with self.metrics.timer("http"):
+            return call_with_retry(
+                url, lambda: get(url, **kwargs), self.limiter, self.retry,
+                on_retry=self._count_retry,
+            )
+
+    def snapshot(
+        self,
+        kind: str,
+        url: str,
+        body: Optional[str] = None,
+        entry: Optional[Dict[str, Any]] = None,
+        content_type: str = "text/html",
+    ) -> None:
+        """
+        Archive what was just parsed when ``snapshots`` is set: ``body``, or
+        the page's current HTML when it is None. A no-op otherwise.
+        """
+        if self.snapshots is None:
+            return
+        with self.metrics.timer("snapshot"):
+            if body is None:
+                body = self.page.content()
+            self.snapshots.add(kind, url, body, content_type=content_type, entry=entry)
+        self.metrics.count("snapshots")
 
     @abstractmethod
     def login(self) -> None:
         """Perform whatever steps are needed to log in."""
         pass
 
+    def is_logged_in(self) -> bool:
+        """
+        Cheaply check whether the page's context is already authenticated.
+        Handlers that cannot tell return False, which forces a full login.
+        """
+        return False
+
+    def ensure_login(self, storage_path: Optional[Union[str, Path]] = None) -> bool:
+        """
+        Reuse the context's session if it is still valid, otherwise run
+        login() and, with ``storage_path``, save the refreshed session.
+        Returns True when a full login was performed.
+        """
+        if self.is_logged_in():
+            self.metrics.count("sessions_reused")
+            return False
+        with self.metrics.timer("login"):
+            self.login()
+        if storage_path is not None:
+            save_session(self.page.context, Path(storage_path))
+        return True
+
+    def challenge_key(self, entry: Dict[str, Any]) -> str:
+        """
+        Name shared by every submission to the same problem; sync runs store
+        a problem's solutions and statement together under it.
+        """
+        return entry["title"].replace(" ", "_")
+
     @abstractmethod
     def list_submissions(self) -> List[Dict[str, Any]]:
         """
@@ -38,6 +187,30 @@ class SiteHandler(ABC):
         """
         pass
 
+    def iter_submissions(
+        self,
+        known: Optional[Container[str]] = None,
+        known_run: Optional[int] = KNOWN_RUN,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield entries newest first. With ``known`` (a set of URLs), only new
+        entries are yielded and listing stops after ``known_run`` known
+        entries in a row; see :func:`take_new`.
+
+        The default wraps list_submissions(); handlers that paginate should
+        override it to fetch pages lazily.
+        """
+        return take_new(self.list_submissions(), known, known_run)
+
+    def newest_submission(self) -> Optional[Dict[str, Any]]:
+        """
+        The most recent entry, or None when the listing is empty, for cheap
+        change detection between syncs. Handlers may raise
+        :class:`SessionExpired` when the site rejects the session. The
+        default takes the first entry of iter_submissions().
+        """
+        return next(iter(self.iter_submissions(known_run=None)), None)
+
     @abstractmethod
     def fetch_submission(self, entry: Dict[str, Any]) -> Dict[str, Any]:
         """
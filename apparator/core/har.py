@@ -0,0 +1,130 @@
+# apparator/core/har.py
+"""Serve requests from HAR files recorded by ``BrowserManager(record_har_path=...)``."""
+
+import base64
+import json
+import threading
+import zipfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from apparator.core.http_session import HttpResponse
+
+
+class HarMiss(RuntimeError):
+    """A replayed run asked for something the recording does not contain."""
+
+
+def har_path(path: Union[str, Path], index: int) -> Path:
+    """Where the ``index``-th context of a recording is saved (0 is ``path`` itself)."""
+    path = Path(path)
+    if index == 0:
+        return path
+    return path.with_name(f"{path.stem}-{index}{path.suffix}")
+
+
+def har_files(path: Union[str, Path]) -> List[Path]:
+    """``path`` followed by the files of later contexts of the same recording."""
+    files = []
+    index = 0
+    while har_path(path, index).exists():
+        files.append(har_path(path, index))
+        index += 1
+    if not files:
+        raise FileNotFoundError(f"no HAR recording at {path}")
+    return files
+
+
+def _read_har(path: Path) -> Tuple[Dict[str, Any], Dict[str, bytes]]:
+    """The HAR log and, for ``.zip`` recordings, the attached bodies."""
+    if path.suffix != ".zip":
+        return json.loads(path.read_text()), {}
+    with zipfile.ZipFile(path) as zf:
+        names = zf.namelist()
+        har = next(n for n in names if n.endswith(".har"))
+        return json.loads(zf.read(har)), {n: zf.read(n) for n in names if n != har}
+
+
+def _body(content: Dict[str, Any], attachments: Dict[str, bytes], base: Path) -> bytes:
+    if "_file" in content:
+        name = content["_file"]
+        if name in attachments:
+            return attachments[name]
+        return (base / name).read_bytes()
+    text = content.get("text") or ""
+    if content.get("encoding") == "base64":
+        return base64.b64decode(text)
+    return text.encode()
+
+
+def _key(method: str, url: str) -> Tuple[str, str]:
+    return method.upper(), url.split("#", 1)[0]
+
+
+class HarReplay:
+    """
+    Responses from one or more HAR files, looked up by method and URL.
+
+    Playwright's ``route_from_har`` only answers the page's own requests;
+    this serves the rest of a recorded run (``context.request`` and
+    :class:`~apparator.core.http_session.HttpSession` calls) from the same
+    files. A URL recorded several times is answered with its responses in
+    recorded order, the last one repeating, so a replay sees what the
+    recorded run saw. Safe to share between threads.
+    """
+
+    def __init__(self, paths: Iterable[Union[str, Path]]):
+        self._responses: Dict[Tuple[str, str], List[HttpResponse]] = defaultdict(list)
+        self._served: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.paths = [Path(p) for p in paths]
+        for path in self.paths:
+            log, attachments = _read_har(path)
+            for item in log["log"]["entries"]:
+                request, response = item["request"], item["response"]
+                if response.get("status", 0) <= 0:
+                    # Aborted or failed while recording
+                    continue
+                headers = {h["name"].lower(): h["value"] for h in response.get("headers", [])}
+                body = _body(response.get("content") or {}, attachments, path.parent)
+                self._responses[_key(request["method"], request["url"])].append(
+                    HttpResponse(request["url"], response["status"], headers, body)
+                )
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_recording(cls, path: Union[str, Path]) -> "HarReplay":
+        """Load ``path`` and the files of later contexts from the same recording."""
+        return cls(har_files(path))
+
+    def __len__(self) -> int:
+        return sum(len(r) for r in self._responses.values())
+
+    def origins(self) -> List[str]:
+        """The ``scheme://host`` of every site in the recording, sorted."""
+        return sorted({"://".join(urlsplit(url)[:2]) for _, url in self._responses})
+
+    def __contains__(self, url: str) -> bool:
+        return _key("GET", url) in self._responses
+
+    def fetch(self, method: str, url: str) -> HttpResponse:
+        key = _key(method, url)
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                self.misses += 1
+                raise HarMiss(f"{method.upper()} {url} is not in the HAR recording")
+            served = self._served[key]
+            self._served[key] = served + 1
+            self.hits += 1
+        return responses[min(served, len(responses) - 1)]
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs: Any) -> HttpResponse:
+        """Drop-in for ``context.request.get`` / ``HttpSession.get``; options are ignored."""
+        return self.fetch("GET", url)
+
+    def __str__(self) -> str:
+        return f"{self.hits} replayed, {self.misses} missing"
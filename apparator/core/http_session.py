@@ -0,0 +1,165 @@
+# apparator/core/http_session.py
+"""Plain HTTP client carrying a browser context's cookies."""
+
+import gzip
+import http.client
+import json
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+# Seconds to wait for a connection or response
+DEFAULT_TIMEOUT = 30.0
+
+
+class HttpResponse:
+    """A fully read response, shaped like Playwright's ``APIResponse``."""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def body(self) -> bytes:
+        return self._body
+
+    def text(self) -> str:
+        return self._body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self._body)
+
+
+def _decode(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        return zlib.decompress(body)
+    return body
+
+
+def _cookie_matches(cookie: Dict[str, Any], host: str, path: str, secure: bool) -> bool:
+    domain = (cookie.get("domain") or "").lstrip(".")
+    if domain and host != domain and not host.endswith("." + domain):
+        return False
+    if not path.startswith(cookie.get("path") or "/"):
+        return False
+    return secure or not cookie.get("secure")
+
+
+class HttpSession:
+    """
+    GET requests with the cookies of a logged-in browser context, over
+    keep-alive connections pooled per thread and host, so many worker
+    threads can have requests in flight without launching pages.
+
+    Redirects are followed (cookies are only sent to hosts they belong to)
+    and gzip/deflate bodies are decoded. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        cookies: Iterable[Dict[str, Any]] = (),
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_redirects: int = 3,
+    ):
+        self.cookies: List[Dict[str, Any]] = list(cookies)
+        self.headers = {"Accept-Encoding": "gzip, deflate", **(headers or {})}
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self._local = threading.local()
+        self._all: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_context(cls, context: Any, **kwargs: Any) -> "HttpSession":
+        """Copy the cookies of a Playwright ``BrowserContext`` (call from its thread)."""
+        return cls(context.cookies(), **kwargs)
+
+    def cookie_header(self, url: str) -> str:
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        return "; ".join(
+            f"{c['name']}={c['value']}" for c in self.cookies
+            if _cookie_matches(c, host, parts.path or "/", parts.scheme == "https")
+        )
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        pool: Dict[Tuple[str, str], http.client.HTTPConnection] = getattr(self._local, "pool", None)
+        if pool is None:
+            pool = self._local.pool = {}
+        conn = pool.get((scheme, netloc))
+        if conn is None:
+            factory = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = pool[(scheme, netloc)] = factory(netloc, timeout=self.timeout)
+            with self._lock:
+                self._all.append(conn)
+        return conn
+
+    def _drop(self, scheme: str, netloc: str) -> None:
+        conn = self._local.pool.pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def _send(self, url: str, headers: Dict[str, str]) -> http.client.HTTPResponse:
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        request_headers = dict(self.headers)
+        cookie = self.cookie_header(url)
+        if cookie:
+            request_headers["Cookie"] = cookie
+        request_headers.update(headers)
+        # A pooled connection may have been closed by the server while idle;
+        # retry once on a fresh one before giving up
+        for attempt in (1, 2):
+            conn = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", target, headers=request_headers)
+                return conn.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self._drop(parts.scheme, parts.netloc)
+                if attempt == 2:
+                    raise ConnectionError(f"connection to {parts.netloc} was closed")
+            except (http.client.HTTPException, OSError):
+                self._drop(parts.scheme, parts.netloc)
+                raise
+        raise AssertionError("unreachable")
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        for _ in range(self.max_redirects + 1):
+            resp = self._send(url, headers or {})
+            body = resp.read()
+            if resp.will_close:
+                parts = urlsplit(url)
+                self._drop(parts.scheme, parts.netloc)
+            location = resp.getheader("Location")
+            if resp.status in REDIRECT_STATUSES and location:
+                url = urljoin(url, location)
+                continue
+            response_headers = {k.lower(): v for k, v in resp.getheaders()}
+            body = _decode(body, response_headers.get("content-encoding"))
+            return HttpResponse(url, resp.status, response_headers, body)
+        raise RuntimeError(f"too many redirects fetching {url}")
+
+    def close(self) -> None:
+        """Close every pooled connection, from any thread."""
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            conn.close()
+
+    def __enter__(self) -> "HttpSession":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
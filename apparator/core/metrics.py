@@ -0,0 +1,159 @@
+# apparator/core/metrics.py
+"""Phase timers and counters for handlers, browsers and sync runs."""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, IO, Optional, Union
+
+
+class _NullTimer:
+    """Timer handed out by disabled metrics; does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.metrics.record(self.name, time.perf_counter() - self.start, failed=exc_type is not None)
+
+
+class Metrics:
+    """
+    Named timers and counters, safe to share between threads.
+
+    ``with metrics.timer("navigation"): ...`` times one phase and
+    ``metrics.count("bytes_downloaded", n)`` bumps a counter. With a
+    ``log`` path every finished timer and :meth:`event` is appended as a
+    JSON line. A disabled instance (see :data:`NULL_METRICS`) returns a
+    shared no-op timer and ignores counts, so instrumented code costs one
+    attribute check.
+    """
+
+    def __init__(self, enabled: bool = True, log: Optional[Union[str, Path]] = None):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._timers: Dict[str, Dict[str, float]] = {}
+        self._counters: Dict[str, float] = {}
+        self._log: Optional[IO[str]] = None
+        if enabled and log is not None:
+            Path(log).parent.mkdir(parents=True, exist_ok=True)
+            self._log = open(log, "a", buffering=1)
+
+    def timer(self, name: str):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def record(self, name: str, seconds: float, failed: bool = False) -> None:
+        """Add one timed occurrence of ``name``."""
+        if not self.enabled:
+            return
+        with self._lock:
+            t = self._timers.get(name)
+            if t is None:
+                t = self._timers[name] = {"count": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0}
+            t["count"] += 1
+            t["errors"] += failed
+            t["total_s"] += seconds
+            t["max_s"] = max(t["max_s"], seconds)
+        if self._log is not None:
+            self.event("timer", name=name, seconds=round(seconds, 6), failed=failed)
+
+    def count(self, name: str, n: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def event(self, kind: str, **fields: Any) -> None:
+        """Append a JSON-lines event when a log is configured."""
+        if self._log is None:
+            return
+        line = json.dumps({"ts": round(time.time(), 6), "event": kind, **fields}, default=str)
+        with self._lock:
+            self._log.write(line + "\n")
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def merge(self, summary: Dict[str, Any]) -> None:
+        """Add a :meth:`summary` recorded elsewhere, e.g. in a worker process."""
+        if not self.enabled:
+            return
+        with self._lock:
+            for name, other in summary["timers"].items():
+                t = self._timers.setdefault(
+                    name, {"count": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0}
+                )
+                t["count"] += other["count"]
+                t["errors"] += other["errors"]
+                t["total_s"] += other["total_s"]
+                t["max_s"] = max(t["max_s"], other["max_s"])
+            for name, value in summary["counters"].items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def summary(self) -> Dict[str, Any]:
+        """Every timer and counter as plain data, e.g. for a run report."""
+        with self._lock:
+            return {
+                "timers": {
+                    name: {**t, "total_s": round(t["total_s"], 6), "max_s": round(t["max_s"], 6)}
+                    for name, t in sorted(self._timers.items())
+                },
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def prometheus(self, prefix: str = "apparator") -> str:
+        """The summary in the Prometheus text exposition format."""
+        summary = self.summary()
+        lines = []
+        if summary["timers"]:
+            lines += [
+                f"# HELP {prefix}_phase_seconds Time spent per phase.",
+                f"# TYPE {prefix}_phase_seconds summary",
+            ]
+            for name, t in summary["timers"].items():
+                lines.append(f'{prefix}_phase_seconds_count{{phase="{name}"}} {t["count"]}')
+                lines.append(f'{prefix}_phase_seconds_sum{{phase="{name}"}} {t["total_s"]}')
+            lines += [f"# TYPE {prefix}_phase_errors_total counter"]
+            for name, t in summary["timers"].items():
+                lines.append(f'{prefix}_phase_errors_total{{phase="{name}"}} {t["errors"]}')
+        for name, value in summary["counters"].items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def __str__(self) -> str:
+        summary = self.summary()
+        parts = [
+            f"{name} {t['count']}x {t['total_s']:.2f}s" for name, t in summary["timers"].items()
+        ]
+        parts += [f"{name}={value:g}" for name, value in summary["counters"].items()]
+        return ", ".join(parts) or "nothing recorded"
+
+
+# Shared disabled instance used when no metrics are configured
+NULL_METRICS = Metrics(enabled=False)
@@ -0,0 +1,276 @@
+# apparator/core/rate_limit.py
+"""Per-host request throttling and retries shared by site handlers."""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+# Responses that mean "slow down" or "try again later"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Default navigation/request timeout in milliseconds
+DEFAULT_TIMEOUT = 60000
+
+
+class HostBucket:
+    """
+    Token bucket for one host whose refill rate follows AIMD: every
+    successful response adds ``increase`` requests/second, every throttled
+    one multiplies the rate by ``decrease`` (at most once per
+    ``cooldown`` seconds, so a burst of 429s counts as one signal).
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        min_rate: float,
+        max_rate: float,
+        increase: float,
+        decrease: float,
+        cooldown: float,
+        clock: Callable[[], float],
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+        self.last_decrease = float("-inf")
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return how long to wait before using it."""
+        now = self.clock()
+        self._refill(now)
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def throttled(self) -> None:
+        now = self.clock()
+        self._refill(now)
+        # Stop the rest of the current burst as well
+        self.tokens = min(self.tokens, 0.0)
+        if now - self.last_decrease >= self.cooldown:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.last_decrease = now
+
+
+class RateLimiter:
+    """
+    Adaptive per-host rate limiter, safe to share between threads and
+    between the handlers of a fetch pool.
+
+    Each host starts at ``rate`` requests/second (or its entry in
+    ``host_rates``) and converges on the fastest rate it tolerates.
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: float = 4.0,
+        min_rate: float = 0.2,
+        max_rate: float = 20.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+        host_rates: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.host_rates = dict(host_rates or {})
+        self.clock = clock
+        self._buckets: Dict[str, HostBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url: str) -> HostBucket:
+        host = urlparse(url).netloc or url
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = HostBucket(
+                self.host_rates.get(host, self.rate), self.burst,
+                self.min_rate, self.max_rate, self.increase, self.decrease,
+                self.cooldown, self.clock,
+            )
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        """Claim a slot for ``url``; returns the seconds to wait before sending."""
+        with self._lock:
+            return self._bucket(url).reserve()
+
+    def acquire(self, url: str, sleep: Optional[Callable[[float], None]] = None) -> None:
+        delay = self.reserve(url)
+        if delay:
+            (sleep or time.sleep)(delay)
+
+    async def acquire_async(self, url: str) -> None:
+        delay = self.reserve(url)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def success(self, url: str) -> None:
+        with self._lock:
+            self._bucket(url).success()
+
+    def throttled(self, url: str) -> None:
+        with self._lock:
+            self._bucket(url).throttled()
+
+    def rates(self) -> Dict[str, float]:
+        """Current requests/second per host."""
+        with self._lock:
+            return {host: bucket.rate for host, bucket in self._buckets.items()}
+
+    def __str__(self) -> str:
+        return ", ".join(f"{host} {rate:.2f}/s" for host, rate in self.rates().items()) or "idle"
+
+
+class RetryPolicy:
+    """
+    How often and how patiently to retry a navigation or request that
+    timed out or was answered with one of ``RETRY_STATUSES``.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 4,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # Per-attempt timeout in milliseconds, as Playwright expects
+        self.timeout = timeout
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Jittered exponential delay after failed ``attempt`` (1-based)."""
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        delay *= random.uniform(0.5, 1.5)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_backoff))
+        return delay
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Timeouts and dropped connections, including Playwright's TimeoutError."""
+    return isinstance(exc, (TimeoutError, ConnectionError)) or type(exc).__name__ == "TimeoutError"
+
+
+def _status(response: Any) -> Optional[int]:
+    return getattr(response, "status", None)
+
+
+def _retry_after(response: Any) -> Optional[float]:
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retry(
+    url: str,
+    send: Callable[[], Any],
+    limiter: Optional[RateLimiter] = None,
+    retry: Optional[RetryPolicy] = None,
+    sleep: Optional[Callable[[float], None]] = None,
+    on_retry: Optional[Callable[[], None]] = None,
+) -> Any:
+    """
+    Call ``send()`` (a navigation or request to ``url``) through ``limiter``,
+    retrying timeouts and throttled responses per ``retry``. The last
+    response is returned even if it is still throttled; the last timeout is
+    re-raised. ``on_retry`` is called before every retry.
+    """
+    retry = retry or RetryPolicy()
+    sleep = sleep or time.sleep
+    for attempt in range(1, retry.attempts + 1):
+        if limiter is not None:
+            limiter.acquire(url, sleep)
+        try:
+            response = send()
+        except Exception as exc:
+            if not is_retryable_error(exc):
+                raise
+            if limiter is not None:
+                limiter.throttled(url)
+            if attempt == retry.attempts:
+                raise
+            if on_retry is not None:
+                on_retry()
+            sleep(retry.delay(attempt))
+            continue
+        if _status(response) in RETRY_STATUSES:
+            if limiter is not None:
+                limiter.throttled(url)
+            if attempt < retry.attempts:
+                if on_retry is not None:
+                    on_retry()
+                sleep(retry.delay(attempt, _retry_after(response)))
+                continue
+            return response
+        if limiter is not None:
+            limiter.success(url)
+        return response
+
+
+async def acall_with_retry(
+    url: str,
+    send: Callable[[], Awaitable[Any]],
+    limiter: Optional[RateLimiter] = None,
+    retry: Optional[RetryPolicy] = None,
+    on_retry: Optional[Callable[[], None]] = None,
+) -> Any:
+    """asyncio version of :func:`call_with_retry`."""
+    retry = retry or RetryPolicy()
+    for attempt in range(1, retry.attempts + 1):
+        if limiter is not None:
+            await limiter.acquire_async(url)
+        try:
+            response = await send()
+        except Exception as exc:
+            if not is_retryable_error(exc):
+                raise
+            if limiter is not None:
+                limiter.throttled(url)
+            if attempt == retry.attempts:
+                raise
+            if on_retry is not None:
+                on_retry()
+            await asyncio.sleep(retry.delay(attempt))
+            continue
+        if _status(response) in RETRY_STATUSES:
+            if limiter is not None:
+                limiter.throttled(url)
+            if attempt < retry.attempts:
+                if on_retry is not None:
+                    on_retry()
+                await asyncio.sleep(retry.delay(attempt, _retry_after(response)))
+                continue
+            return response
+        if limiter is not None:
+            limiter.success(url)
+        return response
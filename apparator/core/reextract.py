@@ -0,0 +1,141 @@
+# apparator/core/reextract.py
+"""Re-run a handler's parsing over archived snapshots on every CPU core."""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type, Union
+
+from apparator.core.shards import _portable_config
+from apparator.utils.snapshots import SnapshotArchive, load_snapshot
+
+# Snapshots handed to a worker process at a time
+CHUNK_SIZE = 64
+
+# The handler of this worker process, built once by _init_worker()
+_handler: Any = None
+
+
+class ExtractResult:
+    """What the handler made of one snapshot: either ``details`` or ``error`` is set."""
+
+    def __init__(
+        self,
+        path: str,
+        url: str,
+        kind: str,
+        details: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ):
+        self.path = path
+        self.url = url
+        self.kind = kind
+        self.details = details
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def missing(self) -> List[str]:
+        """Fields that came back empty, the usual sign of a selector gone stale."""
+        if self.details is None:
+            return []
+        return [k for k, v in self.details.items() if v is None or v == "" or v == []]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "kind": self.kind,
+            "details": self.details,
+            "missing": self.missing,
+            "error": self.error,
+        }
+
+    def __repr__(self) -> str:
+        state = "ok" if self.ok else f"error={self.error!r}"
+        return f"ExtractResult({self.url!r}, {self.kind!r}, {state})"
+
+
+def _extract_one(handler: Any, path: str) -> ExtractResult:
+    try:
+        snapshot = load_snapshot(path)
+    except Exception as exc:
+        return ExtractResult(path, "", "", error=f"unreadable snapshot: {exc}")
+    try:
+        details = handler.extract_snapshot(snapshot)
+    except Exception as exc:
+        return ExtractResult(path, snapshot.get("url", ""), snapshot.get("kind", ""),
+                             error=f"{type(exc).__name__}: {exc}")
+    return ExtractResult(path, snapshot.get("url", ""), snapshot.get("kind", ""), details)
+
+
+def _init_worker(handler_class: Type[Any], config: Dict[str, Any]) -> None:
+    global _handler
+    _handler = handler_class(None, config)
+
+
+def _extract_chunk(paths: List[str]) -> List[ExtractResult]:
+    return [_extract_one(_handler, p) for p in paths]
+
+
+def reextract(
+    source: Union[SnapshotArchive, Iterable[Union[str, Path]]],
+    handler_class: Type[Any],
+    config: Optional[Dict[str, Any]] = None,
+    processes: Optional[int] = None,
+    kinds: Optional[Iterable[str]] = None,
+    chunk_size: int = CHUNK_SIZE,
+    mp_context: Optional[Any] = None,
+) -> Iterator[ExtractResult]:
+    """
+    Yield an :class:`ExtractResult` for every snapshot in ``source`` (an
+    archive, optionally narrowed to ``kinds``, or a list of snapshot files),
+    in archive order.
+
+    Parsing is pure CPU work, so the snapshots are split into chunks of
+    ``chunk_size`` and spread over ``processes`` worker processes (default:
+    one per CPU), each with its own ``handler_class(None, config)``. Only
+    the plain values of ``config`` (e.g. ``HR_BASE_URL``) reach the workers.
+    A snapshot that fails to parse only affects its own result; a handler
+    without ``supports_snapshots`` is a TypeError.
+    """
+    if not getattr(handler_class, "supports_snapshots", False):
+        raise TypeError(f"{handler_class.__name__} cannot re-extract snapshots")
+    return _reextract(source, handler_class, config, processes, kinds, chunk_size, mp_context)
+
+
+def _reextract(
+    source: Union[SnapshotArchive, Iterable[Union[str, Path]]],
+    handler_class: Type[Any],
+    config: Optional[Dict[str, Any]],
+    processes: Optional[int],
+    kinds: Optional[Iterable[str]],
+    chunk_size: int,
+    mp_context: Optional[Any],
+) -> Iterator[ExtractResult]:
+    if isinstance(source, SnapshotArchive):
+        paths = [str(p) for p in source.paths(kinds)]
+    else:
+        paths = [str(p) for p in source]
+    config = _portable_config(config or {})
+    processes = processes or os.cpu_count() or 1
+    processes = min(processes, ceil(len(paths) / chunk_size))
+    if processes <= 1:
+        handler = handler_class(None, config)
+        for path in paths:
+            yield _extract_one(handler, path)
+        return
+
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=mp_context or multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(handler_class, config),
+    ) as pool:
+        for results in pool.map(_extract_chunk, chunks):
+            yield from results
@@ -0,0 +1,314 @@
+# apparator/core/shards.py
+"""Fetch submissions in several worker processes, one browser each."""
+
+import multiprocessing
+import queue
+from collections import deque
+from contextlib import contextmanager
+from math import ceil
+from typing import Any, Callable, ContextManager, Deque, Dict, Iterator, List, Optional
+
+from apparator.core.blocking import BlockStats, ResourcePolicy
+from apparator.core.browser import RECYCLE_AFTER
+from apparator.core.fetch_pool import FetchResult, fetch_submissions
+from apparator.core.metrics import Metrics
+from apparator.core.rate_limit import RateLimiter
+from apparator.utils.snapshots import SnapshotArchive
+
+# Shards per worker process, so a slow shard does not leave the others idle
+SHARDS_PER_WORKER = 4
+# How often a crashed worker's shard is handed to another worker
+MAX_REASSIGN = 2
+# Seconds between liveness checks while waiting for worker messages
+POLL_INTERVAL = 0.5
+# Config values that survive pickling into a worker process as-is
+_PORTABLE = (str, int, float, bool, type(None))
+
+
+class ShardError(RuntimeError):
+    """A submission failed inside a worker process (the original error is text)."""
+
+
+def _portable_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in config.items() if isinstance(v, _PORTABLE)}
+
+
+@contextmanager
+def _browser_page(options: Dict[str, Any], block_stats: BlockStats, metrics: Optional[Metrics]):
+    from apparator.core.browser import BrowserManager
+
+    with BrowserManager(
+        headless=options["headless"], engines=[options["engine"]],
+        block_stats=block_stats, metrics=metrics,
+    ) as bm:
+        yield bm.recycling_page(
+            options["engine"], block=options["block"], storage_state=options["storage_state"],
+            max_navigations=options["recycle_after"] or None,
+            max_memory_mb=options["recycle_mb"],
+        )
+
+
+def _shard_worker(
+    worker_id: int,
+    inbox: Any,
+    results: Any,
+    handler_class: Callable[[Any, Dict[str, Any]], Any],
+    config: Dict[str, Any],
+    options: Dict[str, Any],
+    page_opener: Optional[Callable[..., ContextManager[Any]]],
+) -> None:
+    """
+    Worker process body: open one page with the shared session, then fetch
+    every shard the parent sends until it sends None.
+    """
+    metrics = Metrics() if options["metrics"] else None
+    block_stats = BlockStats()
+    config = dict(config)
+    if metrics is not None:
+        config["METRICS"] = metrics
+    if options.get("snapshots"):
+        config["SNAPSHOTS"] = SnapshotArchive(options["snapshots"])
+    if options["rate"]:
+        config["RATE_LIMITER"] = RateLimiter(rate=options["rate"], max_rate=options["max_rate"])
+    opener = page_opener or _browser_page
+    try:
+        with opener(options, block_stats, metrics) as page:
+            handler = handler_class(page, config)
+            results.put(("ready", worker_id))
+            while True:
+                shard = inbox.get()
+                if shard is None:
+                    break
+                shard_id, entries, dirs = shard
+                download_dir = (lambda e: dirs.get(e["url"], "")) if dirs is not None else None
+                for result in fetch_submissions(
+                    handler, entries,
+                    concurrency=options["concurrency"],
+                    download_dir=download_dir,
+                    headless=options["headless"],
+                    engine=options["engine"],
+                    block=options["block"],
+                    block_stats=block_stats,
+                    recycle_after=options["recycle_after"],
+                    recycle_mb=options["recycle_mb"],
+                ):
+                    error = None
+                    if not result.ok:
+                        error = f"{type(result.error).__name__}: {result.error}"
+                    results.put(("result", shard_id, result.entry["url"], result.details, error))
+                results.put(("done", worker_id, shard_id))
+    finally:
+        results.put((
+            "exit", worker_id,
+            metrics.summary() if metrics is not None else None,
+            block_stats.as_dict(),
+        ))
+
+
+class _Shard:
+    def __init__(self, shard_id: int, entries: List[Dict[str, Any]], attempt: int):
+        self.id = shard_id
+        self.entries = entries
+        self.attempt = attempt
+        self.remaining = {e["url"] for e in entries}
+
+
+def fetch_sharded(
+    handler: Any,
+    entries: List[Dict[str, Any]],
+    processes: int = 2,
+    shard_size: Optional[int] = None,
+    concurrency: int = 1,
+    download_dir: Optional[Callable[[Dict[str, Any]], str]] = None,
+    handler_class: Optional[Callable[[Any, Dict[str, Any]], Any]] = None,
+    headless: bool = True,
+    engine: str = "chromium",
+    block: Optional[ResourcePolicy] = None,
+    block_stats: Optional[BlockStats] = None,
+    max_reassign: int = MAX_REASSIGN,
+    recycle_after: Optional[int] = RECYCLE_AFTER,
+    recycle_mb: Optional[float] = None,
+    page_opener: Optional[Callable[..., ContextManager[Any]]] = None,
+    mp_context: Optional[Any] = None,
+) -> Iterator[FetchResult]:
+    """
+    Split ``entries`` into shards and fetch them in up to ``processes``
+    worker processes, yielding a :class:`FetchResult` per entry as results
+    arrive. Callers keep all state and git work in this process.
+
+    Each worker runs its own :class:`BrowserManager` with a context opened
+    from ``handler``'s storage state (so the session is shared) and a
+    ``handler_class(page, config)`` built from the plain values of
+    ``handler.config``. A configured rate limiter is split evenly between
+    the workers; their metrics and blocking stats are merged back. Within a
+    worker, ``concurrency`` pages fetch in parallel as in
+    :func:`~apparator.core.fetch_pool.fetch_submissions`.
+
+    If a worker dies, the unfinished entries of its shard go to a fresh
+    worker, up to ``max_reassign`` times per shard; after that they are
+    reported as failed. ``download_dir`` is resolved here, when sharding.
+    Worker pages are recycled per ``recycle_after`` / ``recycle_mb``, and
+    replaced when they crash, as in ``fetch_submissions``.
+
+    :param page_opener: ``(options, block_stats, metrics) -> context
+        manager yielding a page``; replaces the browser, e.g. in tests
+    """
+    pending = list(entries)
+    if not pending:
+        return
+    processes = max(1, min(processes, len(pending)))
+    shard_size = shard_size or ceil(len(pending) / (processes * SHARDS_PER_WORKER))
+    by_url = {e["url"]: e for e in pending}
+    dirs = {e["url"]: download_dir(e) for e in pending} if download_dir is not None else None
+
+    metrics: Optional[Metrics] = getattr(handler, "metrics", None)
+    limiter: Optional[RateLimiter] = getattr(handler, "limiter", None)
+    page = getattr(handler, "page", None)
+    options = {
+        "headless": headless,
+        "engine": engine,
+        "block": block,
+        "concurrency": concurrency,
+        "storage_state": page.context.storage_state() if page is not None else None,
+        "metrics": bool(metrics is not None and metrics.enabled),
+        "rate": limiter.rate / processes if limiter is not None else None,
+        "max_rate": limiter.max_rate / processes if limiter is not None else None,
+        "recycle_after": recycle_after,
+        "recycle_mb": recycle_mb,
+    }
+    snapshots = getattr(handler, "snapshots", None)
+    if snapshots is not None:
+        # Workers archive into the same directory through their own instance
+        options["snapshots"] = str(snapshots.root)
+    config = _portable_config(getattr(handler, "config", {}) or {})
+    handler_class = handler_class or type(handler)
+    ctx = mp_context or multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+
+    next_id = 0
+    queued: Deque[_Shard] = deque()
+    for i in range(0, len(pending), shard_size):
+        queued.append(_Shard(next_id, pending[i:i + shard_size], attempt=0))
+        next_id += 1
+    active: Dict[int, _Shard] = {}
+    workers: Dict[int, Any] = {}
+    inboxes: Dict[int, Any] = {}
+    assigned: Dict[int, Optional[int]] = {}
+    spawned = 0
+    max_spawns = processes * (1 + max_reassign)
+    outstanding = len(pending)
+
+    def spawn() -> None:
+        nonlocal spawned
+        wid = spawned
+        spawned += 1
+        inboxes[wid] = ctx.Queue()
+        proc = ctx.Process(
+            target=_shard_worker,
+            args=(wid, inboxes[wid], results, handler_class, config, options, page_opener),
+            name=f"shard-worker-{wid}",
+            daemon=True,
+        )
+        proc.start()
+        workers[wid] = proc
+        assigned[wid] = None
+
+    def dispatch(wid: int) -> None:
+        if queued:
+            shard = queued.popleft()
+            active[shard.id] = shard
+            assigned[wid] = shard.id
+            shard_dirs = {u: dirs[u] for u in shard.remaining} if dirs is not None else None
+            inboxes[wid].put((shard.id, shard.entries, shard_dirs))
+        else:
+            assigned[wid] = None
+            inboxes[wid].put(None)
+
+    def handle(msg: Any) -> Iterator[FetchResult]:
+        nonlocal outstanding
+        kind = msg[0]
+        if kind == "ready":
+            dispatch(msg[1])
+        elif kind == "result":
+            _, shard_id, url, details, error = msg
+            shard = active.get(shard_id)
+            if shard is None or url not in shard.remaining:
+                return
+            shard.remaining.discard(url)
+            outstanding -= 1
+            yield FetchResult(by_url[url], details=details,
+                              error=ShardError(error) if error is not None else None)
+        elif kind == "done":
+            _, wid, shard_id = msg
+            active.pop(shard_id, None)
+            if wid in workers:
+                dispatch(wid)
+        elif kind == "exit":
+            _, wid, summary, stats = msg
+            if summary is not None and metrics is not None:
+                metrics.merge(summary)
+            if block_stats is not None:
+                block_stats.merge(stats)
+
+    def reap() -> Iterator[FetchResult]:
+        """Reassign the shards of workers that died; fail what cannot be retried."""
+        nonlocal outstanding, next_id
+        for wid, proc in list(workers.items()):
+            if proc.is_alive():
+                continue
+            proc.join()
+            del workers[wid]
+            shard = active.pop(assigned.pop(wid, None), None)
+            if shard is not None and shard.remaining:
+                left = [e for e in shard.entries if e["url"] in shard.remaining]
+                if shard.attempt < max_reassign:
+                    queued.appendleft(_Shard(next_id, left, shard.attempt + 1))
+                    next_id += 1
+                else:
+                    for entry in left:
+                        outstanding -= 1
+                        yield FetchResult(entry, error=ShardError(
+                            f"worker crashed {shard.attempt + 1} times on this shard"))
+        while queued and len(workers) < processes and spawned < max_spawns:
+            spawn()
+        if not workers:
+            # Nobody left to run the queued shards
+            while queued:
+                for entry in queued.popleft().entries:
+                    outstanding -= 1
+                    yield FetchResult(entry, error=ShardError("no shard worker available"))
+
+    try:
+        for _ in range(processes):
+            spawn()
+        while outstanding > 0:
+            try:
+                msg = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                yield from reap()
+                continue
+            yield from handle(msg)
+            if msg[0] == "exit":
+                yield from reap()
+    finally:
+        for wid in list(workers):
+            inboxes[wid].put(None)
+        # Drain until every worker has reported its stats and exited
+        while any(proc.is_alive() for proc in workers.values()):
+            try:
+                msg = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if msg[0] == "exit":
+                for _ in handle(msg):
+                    pass
+        for proc in workers.values():
+            proc.join()
+        while True:
+            try:
+                msg = results.get_nowait()
+            except queue.Empty:
+                break
+            if msg[0] == "exit":
+                for _ in handle(msg):
+                    pass
@@ -0,0 +1,334 @@
+# apparator/core/sync.py
+"""Checkpointed list → fetch → commit pipeline shared by the sync scripts."""
+
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from apparator.core.fetch_pool import (
+    FetchResult,
+    fetch_submissions,
+    fetch_submissions_async,
+    fetch_submissions_http,
+)
+from apparator.core.handler_base import KNOWN_RUN
+from apparator.core.metrics import NULL_METRICS, Metrics
+from apparator.core.shards import fetch_sharded
+from apparator.utils.artifacts import ArtifactStore, digest
+from apparator.utils.github_sync import (
+    BackgroundPusher,
+    BatchCommitError,
+    BatchCommitter,
+    commit_files,
+    has_uncommitted,
+)
+from apparator.utils.state_store import FETCHED, SubmissionStore
+
+# How many times a failing entry is attempted before it is reported as
+# exhausted and skipped by later runs
+MAX_ATTEMPTS = 3
+
+
+class SyncReport:
+    """What one :meth:`SyncRunner.run` did."""
+
+    def __init__(self):
+        self.listed = 0
+        self.resumed = 0
+        self.fetched = 0
+        self.committed = 0
+        # Fetched submissions whose code was already stored for the problem
+        self.unchanged = 0
+        self.failed: List[Dict[str, Any]] = []
+        self.exhausted: List[Dict[str, Any]] = []
+
+    def __str__(self) -> str:
+        return (
+            f"listed {self.listed} new, fetched {self.fetched}, "
+            f"committed {self.committed} (resumed {self.resumed}), "
+            f"unchanged {self.unchanged}, "
+            f"failed {len(self.failed)}, gave up on {len(self.exhausted)}"
+        )
+
+
+class _Checkpointing:
+    """
+    What :class:`SyncRunner` and :class:`AsyncSyncRunner` share: the store,
+    the artifacts and the commits. Only listing and fetching differ
+    between them, as ``handler`` is a
+    :class:`~apparator.core.handler_base.SiteHandler` for one and an
+    :class:`~apparator.core.async_handler_base.AsyncSiteHandler` for the
+    other.
+    """
+
+    def __init__(
+        self,
+        handler: Any,
+        store: SubmissionStore,
+        repo: Path,
+        problems_dir: Optional[Path] = None,
+        max_attempts: int = MAX_ATTEMPTS,
+        committer: Optional[BatchCommitter] = None,
+        pusher: Optional[BackgroundPusher] = None,
+        label: Optional[str] = None,
+    ):
+        self.handler = handler
+        self.store = store
+        self.repo = Path(repo)
+        self.problems_dir = Path(problems_dir) if problems_dir else self.repo / "problems"
+        self.max_attempts = max_attempts
+        # With a BatchCommitter entries stay 'fetched' until their batch is
+        # written; otherwise each entry is committed on its own.
+        self.committer = committer
+        # Told about new commits; pushes them off the fetch loop's thread
+        self.pusher = pusher
+        # Appended to commit messages, e.g. the account a sync runs for
+        self.label = label
+        self.artifacts = ArtifactStore(self.problems_dir)
+        # Problems whose statement a fetch worker is already downloading
+        self._statements_claimed = set()
+        self._claim_lock = threading.Lock()
+
+    def entry_folder(self, entry: Dict[str, Any]) -> Path:
+        return self.artifacts.folder(self.handler.challenge_key(entry))
+
+    def _statement_dir(self, entry: Dict[str, Any]) -> str:
+        """
+        Where the handler should save ``entry``'s statement PDF, or "" to
+        skip the download because the problem already has one (or another
+        worker is fetching it). Called from fetch worker threads.
+        """
+        challenge = self.handler.challenge_key(entry)
+        with self._claim_lock:
+            if challenge in self._statements_claimed or self.artifacts.has_statement(challenge):
+                return ""
+            self._statements_claimed.add(challenge)
+        folder = self.artifacts.folder(challenge)
+        folder.mkdir(parents=True, exist_ok=True)
+        return str(folder)
+
+    def _release_statement(self, challenge: str) -> None:
+        with self._claim_lock:
+            self._statements_claimed.discard(challenge)
+
+    @property
+    def metrics(self) -> Metrics:
+        return getattr(self.handler, "metrics", None) or NULL_METRICS
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Entries still to fetch: new ones plus failures with retries left."""
+        return self.store.new_entries() + self.store.failed_entries(self.max_attempts)
+
+    def _uncommitted(self, folder: Path) -> bool:
+        try:
+            return has_uncommitted(self.repo, [folder])
+        except RuntimeError:
+            # Not a git checkout we can inspect; let the commit report it
+            return True
+
+    def _commit(self, entry: Dict[str, Any], folder: Path, report: SyncReport) -> bool:
+        message = f"Add {entry['title']}"
+        if self.label:
+            message += f" ({self.label})"
+        if self.committer is not None:
+            try:
+                with self.metrics.timer("git"):
+                    written = self.committer.add([folder], message, key=entry)
+            except BatchCommitError as exc:
+                self._batch_failed(exc, report)
+                return False
+            self._mark_committed(written, report)
+            return True
+        try:
+            with self.metrics.timer("git"):
+                commit_files(self.repo, [folder], message)
+        except RuntimeError as exc:
+            self._fail(entry, f"commit failed: {exc}", report)
+            return False
+        self._mark_committed([entry], report)
+        return True
+
+    def _mark_committed(self, entries: List[Dict[str, Any]], report: SyncReport) -> None:
+        with self.store.transaction():
+            for entry in entries:
+                self.store.mark_committed(entry["url"])
+        report.committed += len(entries)
+        self.metrics.count("committed", len(entries))
+        if entries and self.pusher is not None:
+            self.pusher.request()
+
+    def _batch_failed(self, exc: BatchCommitError, report: SyncReport) -> None:
+        for entry in exc.keys:
+            self._fail(entry, f"commit failed: {exc}", report)
+
+    def flush(self, report: SyncReport) -> None:
+        """Write any entries still queued in the batch committer."""
+        if self.committer is None:
+            return
+        try:
+            with self.metrics.timer("git"):
+                written = self.committer.flush()
+            self._mark_committed(written, report)
+        except BatchCommitError as exc:
+            self._batch_failed(exc, report)
+
+    def _fail(self, entry: Dict[str, Any], error: str, report: SyncReport) -> None:
+        self.store.mark_failed(entry["url"], error)
+        report.failed.append({"url": entry["url"], "title": entry.get("title"), "error": error})
+        print(f"Failed {entry['url']}: {error}", file=sys.stderr)
+
+    def resume(self, report: SyncReport) -> None:
+        """Commit entries a previous run fetched but did not get to commit."""
+        for entry in self.store.entries(FETCHED):
+            folder = Path(entry["folder"]) if entry.get("folder") else self.entry_folder(entry)
+            if not folder.exists():
+                self._fail(entry, "fetched files are missing", report)
+                continue
+            if self._commit(entry, folder, report):
+                report.resumed += 1
+
+    def checkpoint(self, result: FetchResult, report: SyncReport) -> None:
+        """Store one fetch result and commit it unless nothing changed."""
+        entry = result.entry
+        challenge = self.handler.challenge_key(entry)
+        if not result.ok:
+            self._release_statement(challenge)
+            self._fail(entry, str(result.error), report)
+            return
+        code = result.details["solution"] or ""
+        _, wrote_solution = self.artifacts.add_solution(challenge, entry, code)
+        wrote_statement = self.artifacts.add_statement(challenge, result.details.get("pdf"))
+        if not wrote_statement:
+            # No PDF came back (or it was unchanged): let a later submission
+            # of the same challenge try again
+            self._release_statement(challenge)
+        folder = self.artifacts.folder(challenge)
+        self.store.mark_fetched(
+            entry["url"], folder=str(folder),
+            challenge=challenge, digest=digest(code.encode("utf-8")),
+        )
+        report.fetched += 1
+        # Identical files may still be uncommitted, e.g. written by a run
+        # that was interrupted before committing them
+        if not (wrote_solution or wrote_statement) and not self._uncommitted(folder):
+            self.store.mark_committed(entry["url"])
+            report.unchanged += 1
+            self.metrics.count("unchanged")
+            return
+        self._commit(entry, folder, report)
+
+
+class SyncRunner(_Checkpointing):
+    """
+    Move submissions through the state store one entry at a time.
+
+    Every entry is checkpointed as soon as it changes state (listed,
+    fetched, committed or failed), so an interrupted run resumes where it
+    stopped: entries already fetched are committed without re-fetching and
+    failed entries are retried until they reach ``max_attempts``.
+
+    Files are kept per problem in an :class:`ArtifactStore`: a submission
+    whose code is already stored is recorded without writing or committing
+    anything, and a problem's statement PDF is only downloaded once.
+    """
+
+    def list_new(self, full: bool = False) -> int:
+        """Record newly listed submissions; returns how many were new."""
+        with self.metrics.timer("listing"):
+            listed = list(self.handler.iter_submissions(
+                known=self.store.known_urls(),
+                known_run=None if full else KNOWN_RUN,
+            ))
+        return self.store.record_listed(listed)
+
+    def fetch_and_commit(
+        self,
+        entries: List[Dict[str, Any]],
+        report: SyncReport,
+        processes: int = 1,
+        http_workers: int = 0,
+        **fetch_kwargs,
+    ) -> None:
+        """
+        Fetch ``entries`` and checkpoint each one as soon as it completes.
+        With ``processes`` > 1 the fetching is sharded across worker
+        processes; with ``http_workers`` it goes over plain HTTP first (see
+        :func:`~apparator.core.fetch_pool.fetch_submissions_http`) if the
+        handler ``supports_http``. The store and commits stay in this process
+        and thread either way.
+        """
+        fetch = fetch_submissions
+        if processes > 1:
+            fetch = fetch_sharded
+            fetch_kwargs["processes"] = processes
+        elif http_workers > 0 and getattr(self.handler, "supports_http", False):
+            fetch = fetch_submissions_http
+            fetch_kwargs["workers"] = http_workers
+        results = fetch(
+            self.handler, entries, download_dir=self._statement_dir, **fetch_kwargs
+        )
+        for result in results:
+            self.checkpoint(result, report)
+
+    def run(self, full: bool = False, **fetch_kwargs) -> SyncReport:
+        """
+        Resume unfinished work, list new submissions, then fetch and commit
+        everything pending. ``fetch_kwargs`` go to
+        :func:`~apparator.core.fetch_pool.fetch_submissions`, or to
+        :func:`~apparator.core.shards.fetch_sharded` when they include
+        ``processes`` > 1, or to
+        :func:`~apparator.core.fetch_pool.fetch_submissions_http` with
+        ``http_workers``.
+        """
+        report = SyncReport()
+        self.resume(report)
+        report.listed = self.list_new(full=full)
+        try:
+            self.fetch_and_commit(self.pending(), report, **fetch_kwargs)
+        finally:
+            # Even when interrupted, write what was fetched so far
+            self.flush(report)
+        report.exhausted = self.store.exhausted_entries(self.max_attempts)
+        return report
+
+
+class AsyncSyncRunner(_Checkpointing):
+    """
+    Counterpart of :class:`SyncRunner` for an
+    :class:`~apparator.core.async_handler_base.AsyncSiteHandler`, so several
+    runs can share one event loop (see :mod:`apparator.core.accounts`).
+
+    Listing and fetching are awaited; the store and git work stay
+    synchronous and run on the loop's thread, which keeps concurrent runs
+    committing into one repository one at a time.
+    """
+
+    async def list_new(self, full: bool = False) -> int:
+        with self.metrics.timer("listing"):
+            listed = [entry async for entry in self.handler.iter_submissions(
+                known=self.store.known_urls(),
+                known_run=None if full else KNOWN_RUN,
+            )]
+        return self.store.record_listed(listed)
+
+    async def fetch_and_commit(
+        self, entries: List[Dict[str, Any]], report: SyncReport, **fetch_kwargs
+    ) -> None:
+        """``fetch_kwargs`` go to :func:`~apparator.core.fetch_pool.fetch_submissions_async`."""
+        results = fetch_submissions_async(
+            self.handler, entries, download_dir=self._statement_dir, **fetch_kwargs
+        )
+        async for result in results:
+            self.checkpoint(result, report)
+
+    async def run(self, full: bool = False, **fetch_kwargs) -> SyncReport:
+        report = SyncReport()
+        self.resume(report)
+        report.listed = await self.list_new(full=full)
+        try:
+            await self.fetch_and_commit(self.pending(), report, **fetch_kwargs)
+        finally:
+            self.flush(report)
+        report.exhausted = self.store.exhausted_entries(self.max_attempts)
+        return report
@@ -0,0 +1,110 @@
+# apparator/core/watch.py
+"""Keep a sync runner alive and only sync when new submissions appear."""
+
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from apparator.core.handler_base import SessionExpired
+from apparator.core.sync import SyncReport, SyncRunner
+
+# Seconds between polls while submissions keep arriving
+POLL_INTERVAL = 60.0
+# Polling slows down to at most this many seconds while nothing changes
+MAX_POLL_INTERVAL = 900.0
+# Factor the delay grows by after every idle poll
+IDLE_BACKOFF = 2.0
+
+
+class Watcher:
+    """
+    Poll a site for new submissions with the warm browser and session of
+    ``runner`` and run a sync pass only when something new shows up.
+
+    Each poll asks the handler for its newest submission (one small
+    request for HackerRank). While nothing changes the delay between polls
+    grows by ``backoff`` up to ``max_interval``; a new submission resets it
+    to ``interval``. A rejected or lapsed session is reloaded through
+    ``ensure_login(storage_path)`` and the poll retried.
+    """
+
+    def __init__(
+        self,
+        runner: SyncRunner,
+        interval: float = POLL_INTERVAL,
+        max_interval: float = MAX_POLL_INTERVAL,
+        backoff: float = IDLE_BACKOFF,
+        storage_path: Optional[Union[str, Path]] = None,
+        on_sync: Optional[Callable[[SyncReport], None]] = None,
+        **run_kwargs: Any,
+    ):
+        self.runner = runner
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.backoff = backoff
+        self.storage_path = storage_path
+        self.on_sync = on_sync
+        # Passed to every SyncRunner.run(), e.g. concurrency
+        self.run_kwargs = run_kwargs
+        self.polls = 0
+        self.syncs = 0
+        self.session_reloads = 0
+        self._stop = threading.Event()
+
+    @property
+    def handler(self) -> Any:
+        return self.runner.handler
+
+    def stop(self) -> None:
+        """Make :meth:`run` return after the current poll or sync."""
+        self._stop.set()
+
+    def reload_session(self) -> bool:
+        """Log in again if the session lapsed; True when it did."""
+        if not self.handler.ensure_login(self.storage_path):
+            return False
+        self.session_reloads += 1
+        self.runner.metrics.count("session_reloads")
+        return True
+
+    def changed(self) -> bool:
+        """Poll once: is the newest submission one the store has not seen?"""
+        self.polls += 1
+        self.runner.metrics.count("polls")
+        try:
+            newest = self.handler.newest_submission()
+        except SessionExpired:
+            self.reload_session()
+            newest = self.handler.newest_submission()
+        if newest is None and self.reload_session():
+            # An empty listing is usually a login page in disguise
+            newest = self.handler.newest_submission()
+        return newest is not None and newest["url"] not in self.runner.store
+
+    def sync(self, full: bool = False) -> SyncReport:
+        report = self.runner.run(full=full, **self.run_kwargs)
+        self.syncs += 1
+        if self.on_sync is not None:
+            self.on_sync(report)
+        return report
+
+    def run(self, full: bool = False, max_polls: Optional[int] = None) -> None:
+        """
+        Sync once (crawling everything with ``full``), then poll until
+        :meth:`stop` is called or ``max_polls`` polls have been made.
+        Errors in a poll or sync are reported and treated as an idle poll.
+        """
+        self.sync(full=full)
+        delay = self.interval
+        while not self._stop.wait(delay):
+            changed = False
+            try:
+                changed = self.changed()
+                if changed:
+                    self.sync()
+            except Exception as exc:
+                print(f"Watch: {type(exc).__name__}: {exc}", file=sys.stderr)
+            delay = self.interval if changed else min(self.max_interval, delay * self.backoff)
+            if max_polls is not None and self.polls >= max_polls:
+                return
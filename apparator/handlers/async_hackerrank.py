@@ -0,0 +1,225 @@
+# apparator/handlers/async_hackerrank.py
+
+from apparator.core.async_handler_base import AsyncSiteHandler, atake_new
+from apparator.core.handler_base import KNOWN_RUN
+from apparator.handlers.hackerrank import (
+    API_PAGE_SIZE,
+    BASE_URL,
+    CODE_INPUT_SELECTOR,
+    DASHBOARD_URL,
+    LISTING_SCRIPT,
+    LISTING_SELECTORS,
+    LOGIN_URL,
+    PDF_LINK_SELECTOR,
+    PROFILE_API_URL,
+    RESOURCE_POLICY,
+    SUBMISSION_SCRIPT,
+    SUBMISSION_SELECTORS,
+    SUBMISSIONS_API_URL,
+    SUBMISSIONS_URL,
+    api_listing_page,
+    challenge_slug,
+    entries_from_listing,
+    pdf_cache_lookup,
+    rebase,
+    record_pdf,
+    statement_pdf_path,
+    submission_title,
+)
+from apparator.utils.pdf_cache import PdfCache
+from playwright.async_api import Page
+from typing import List, Dict, Any, AsyncIterator, Container, Optional
+from urllib.parse import urljoin
+from pathlib import Path
+
+
+class AsyncHackerRankHandler(AsyncSiteHandler):
+    """asyncio version of :class:`~apparator.handlers.hackerrank.HackerRankHandler`."""
+
+    use_api = True
+    api_page_size = API_PAGE_SIZE
+    resource_policy = RESOURCE_POLICY
+
+    def __init__(self, page: Page, config: Dict[str, Any]):
+        super().__init__(page, config)
+        self.username = config.get("HR_USER")
+        self.password = config.get("HR_PASS")
+        self.base_url = (config.get("HR_BASE_URL") or BASE_URL).rstrip("/")
+        self.pdf_cache: Optional[PdfCache] = config.get("PDF_CACHE")
+
+    def site_url(self, url: str) -> str:
+        return rebase(url, self.base_url)
+
+    def challenge_key(self, entry: Dict[str, Any]) -> str:
+        return challenge_slug(entry["url"]) or super().challenge_key(entry)
+
+    async def is_logged_in(self) -> bool:
+        """Ask the profile endpoint whether the context's cookies are still valid."""
+        try:
+            resp = await self.request_get(self.site_url(PROFILE_API_URL))
+            if not resp.ok:
+                return False
+            model = (await resp.json()).get("model") or {}
+        except Exception:
+            return False
+        return bool(model.get("username"))
+
+    async def login(self) -> None:
+        """
+        Navigate to the login page and authenticate the user.
+        """
+        await self.goto(self.site_url(LOGIN_URL), wait_until="domcontentloaded")
+        await self.page.fill("input[name='username']", self.username)
+        await self.page.fill("input[name='password']", self.password)
+        await self.page.click("button[type=submit]")
+        await self.page.wait_for_url(self.site_url(DASHBOARD_URL), timeout=self.retry.timeout)
+
+    async def list_submissions(self) -> List[Dict[str, Any]]:
+        """Return a list of all submissions across every page."""
+        return [entry async for entry in self.iter_submissions()]
+
+    async def iter_submissions(
+        self,
+        known: Optional[Container[str]] = None,
+        known_run: Optional[int] = KNOWN_RUN,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield submissions newest first, loading listing pages lazily and
+        stopping early on a run of ``known`` URLs.
+        """
+        async for entry in atake_new(self._iter_listing(), known, known_run):
+            yield entry
+
+    async def _iter_listing(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every submission, preferring the REST listing over the table."""
+        seen = set()
+        if self.use_api:
+            try:
+                async for entry in self._iter_api_listing():
+                    seen.add(entry["url"])
+                    yield entry
+                return
+            except Exception:
+                pass
+        async for entry in self._iter_dom_listing():
+            if entry["url"] not in seen:
+                yield entry
+
+    async def _iter_api_listing(self) -> AsyncIterator[Dict[str, Any]]:
+        """Page through the submissions REST endpoint with the page's session."""
+        offset: Optional[int] = 0
+        while offset is not None:
+            url = self.site_url(SUBMISSIONS_API_URL.format(offset=offset, limit=self.api_page_size))
+            resp = await self.request_get(url)
+            if not resp.ok:
+                raise RuntimeError(f"submissions API returned HTTP {resp.status}")
+            data = await resp.json()
+            if self.snapshots is not None:
+                await self.snapshot(
+                    "listing_api", url, await resp.text(), content_type="application/json"
+                )
+            entries, offset = api_listing_page(data, offset, self.api_page_size, self.base_url)
+            self.metrics.count("listing_pages")
+            self.metrics.count("listing_rows", len(entries))
+            for entry in entries:
+                yield entry
+
+    async def _iter_dom_listing(self) -> AsyncIterator[Dict[str, Any]]:
+        """Walk ``/submissions/all`` page by page."""
+
+        page_num = 1
+
+        while True:
+            url = self.site_url(SUBMISSIONS_URL.format(page=page_num))
+            await self.goto(url, wait_until="domcontentloaded")
+            await self.snapshot("listing", url)
+
+            with self.metrics.timer("extract"):
+                data = await self.page.evaluate(LISTING_SCRIPT, LISTING_SELECTORS)
+            self.metrics.count("selector_calls")
+            self.metrics.count("listing_pages")
+            self.metrics.count("listing_rows", data["count"])
+            if not data["count"]:
+                break
+
+            for entry in entries_from_listing(data, self.base_url):
+                yield entry
+
+            if not data["hasNext"]:
+                break
+            page_num += 1
+
+    async def fetch_submission(self, entry: Dict[str, Any], download_dir: str = "") -> Dict[str, Any]:
+        """Download the submission details and problem statement PDF."""
+
+        target = urljoin(self.base_url, entry["url"])
+        await self.goto(target, wait_until="domcontentloaded")
+        await self.snapshot("submission", target, entry=entry)
+
+        with self.metrics.timer("extract"):
+            fields = await self.page.evaluate(SUBMISSION_SCRIPT, SUBMISSION_SELECTORS)
+        self.metrics.count("selector_calls")
+        title = submission_title(fields, entry)
+        statement = fields["statement"] or ""
+
+        code = fields["code"]
+        if code is None:
+            await self.page.wait_for_selector(CODE_INPUT_SELECTOR)
+            code = await self.page.input_value(CODE_INPUT_SELECTOR)
+            self.metrics.count("selector_calls", 2)
+
+        pdf_path = None
+        if download_dir:
+            pdf_path = statement_pdf_path(download_dir, title)
+            with self.metrics.timer("pdf"):
+                if await self._cached_pdf(entry, fields, pdf_path):
+                    self.metrics.count("pdf_cache_hits")
+                else:
+                    pdf_path = await self._download_pdf(entry, fields, pdf_path)
+        self.metrics.count("submissions_fetched")
+
+        return {
+            "title": title,
+            "statement": statement,
+            "solution": code,
+            "pdf": pdf_path,
+        }
+
+    async def _cached_pdf(self, entry: Dict[str, Any], fields: Dict[str, Any], pdf_path: str) -> bool:
+        cache = self.pdf_cache
+        if cache is None:
+            return False
+        key = self.challenge_key(entry)
+        hit, pdf_url = pdf_cache_lookup(cache, key, pdf_path, fields["pdfHref"], self.base_url)
+        if pdf_url is None:
+            return hit
+        try:
+            resp = await self.request_get(pdf_url, headers=cache.validators(key))
+        except Exception:
+            # A network error, or a HarMiss when replaying a recording
+            return False
+        body = await resp.body() if resp.ok else None
+        return cache.update(key, pdf_path, pdf_url, resp.status, resp.headers, body)
+
+    async def _download_pdf(
+        self, entry: Dict[str, Any], fields: Dict[str, Any], pdf_path: str
+    ) -> Optional[str]:
+        await self.page.wait_for_selector(PDF_LINK_SELECTOR)
+        href = fields["pdfHref"]
+        headers: Dict[str, str] = {}
+        try:
+            async with self.page.expect_download() as dl_info:
+                await self.page.click(PDF_LINK_SELECTOR)
+            download = await dl_info.value
+            await download.save_as(pdf_path)
+        except Exception:
+            href = href or await self.page.get_attribute(PDF_LINK_SELECTOR, "href")
+            if not href:
+                return None
+            resp = await self.request_get(urljoin(self.base_url, href))
+            if not getattr(resp, "ok", False):
+                return None
+            Path(pdf_path).write_bytes(await resp.body())
+            headers = getattr(resp, "headers", None) or {}
+        record_pdf(self, entry, pdf_path, urljoin(self.base_url, href) if href else "", headers)
+        return pdf_path
@@ -1,30 +1,328 @@
 # apparator/handlers/hackerrank.py
 
-from apparator.core.handler_base import SiteHandler
+from apparator.core.blocking import DEFAULT_BLOCKED_TYPES, ResourcePolicy
+from apparator.core.handler_base import KNOWN_RUN, SessionExpired, SiteHandler, take_new
+from apparator.utils.html_dom import Element, parse_html
+from apparator.utils.pdf_cache import PdfCache
 from playwright.sync_api import Page
-from typing import List, Dict, Any
-from urllib.parse import urljoin
+from typing import List, Dict, Any, Callable, Container, Iterator, Optional, Tuple
+from urllib.parse import urljoin, urlparse
 from pathlib import Path
+import json
+import re
 
 BASE_URL = "https://www.hackerrank.com"
+LOGIN_URL = f"{BASE_URL}/auth/login"
+DASHBOARD_URL = f"{BASE_URL}/dashboard"
+SUBMISSIONS_URL = f"{BASE_URL}/submissions/all?page={{page}}"
+# Small authenticated endpoint used to check whether a saved session still works
+PROFILE_API_URL = f"{BASE_URL}/rest/contests/master/hackers/me"
+SUBMISSIONS_API_URL = f"{BASE_URL}/rest/contests/master/submissions/?offset={{offset}}&limit={{limit}}"
+# The REST endpoint accepts far larger pages than the 20-row HTML table
+API_PAGE_SIZE = 100
+# Used by the HTTP fetch path instead of rendering the submission page
+SUBMISSION_API_URL = f"{BASE_URL}/rest/contests/{{contest}}/submissions/{{id}}"
+STATEMENT_PDF_URL = (
+    f"{BASE_URL}/rest/contests/{{contest}}/challenges/{{slug}}/download_pdf?language=English"
+)
+
+ROWS_SELECTOR = "table[aria-label='Submissions Table'] tbody tr"
+TIME_CELL_SELECTOR = "td[aria-label*='Time'], td.submission-time"
+NEXT_SELECTORS = (
+    "li.pagination-next:not(.disabled) a",
+    "a[rel='next']",
+    "a[aria-label='Next']",
+)
+TITLE_SELECTORS = (".challenge-heading", "h1")
+STATEMENT_SELECTORS = (
+    ".challenge_problem_statement .hackdown-content",
+    ".challenge-description",
+)
+CODE_SELECTOR = ".editor-content"
+CODE_INPUT_SELECTOR = "textarea.inputarea"
+PDF_LINK_SELECTOR = "#pdf-link"
+
+# Extraction runs inside the page so each listing page or submission costs a
+# single round trip; the selector fallback chains are passed in as arguments.
+LISTING_SELECTORS = {
+    "rows": ROWS_SELECTOR,
+    "time": TIME_CELL_SELECTOR,
+    "next": list(NEXT_SELECTORS),
+}
+LISTING_SCRIPT = """
+(sel) => {
+  const rowEls = document.querySelectorAll(sel.rows);
+  const rows = [];
+  for (const row of rowEls) {
+    const link = row.querySelector("a");
+    if (!link) continue;
+    const time = row.querySelector(sel.time);
+    rows.push({
+      href: link.getAttribute("href"),
+      title: link.innerText.trim(),
+      timestamp: time ? time.innerText.trim() : "",
+    });
+  }
+  let next = null;
+  for (const s of sel.next) {
+    next = document.querySelector(s);
+    if (next) break;
+  }
+  let hasNext = next !== null;
+  if (next) {
+    const disabled = next.getAttribute("disabled") || next.getAttribute("aria-disabled");
+    if (disabled && disabled !== "false") hasNext = false;
+  }
+  return {count: rowEls.length, rows: rows, hasNext: hasNext};
+}
+"""
+SUBMISSION_SELECTORS = {
+    "title": list(TITLE_SELECTORS),
+    "statement": list(STATEMENT_SELECTORS),
+    "code": CODE_SELECTOR,
+    "pdf": PDF_LINK_SELECTOR,
+}
+SUBMISSION_SCRIPT = """
+(sel) => {
+  const first = (selectors) => {
+    for (const s of selectors) {
+      const el = document.querySelector(s);
+      if (el) return el;
+    }
+    return null;
+  };
+  const title = first(sel.title);
+  const statement = first(sel.statement);
+  const code = document.querySelector(sel.code);
+  const pdf = document.querySelector(sel.pdf);
+  return {
+    title: title ? title.innerText.trim() : null,
+    statement: statement ? statement.innerText : null,
+    code: code ? code.innerText : null,
+    pdfHref: pdf ? pdf.getAttribute("href") : null,
+  };
+}
+"""
+
+
+def listing_from_dom(doc: Element) -> Dict[str, Any]:
+    """LISTING_SCRIPT run over a parsed page instead of in the browser."""
+    row_els = doc.select(ROWS_SELECTOR)
+    rows = []
+    for row in row_els:
+        link = row.select_one("a")
+        if link is None:
+            continue
+        time = row.select_one(TIME_CELL_SELECTOR)
+        rows.append({
+            "href": link.get("href"),
+            "title": link.inner_text().strip(),
+            "timestamp": time.inner_text().strip() if time is not None else "",
+        })
+    nxt = next((el for el in map(doc.select_one, NEXT_SELECTORS) if el is not None), None)
+    has_next = nxt is not None
+    if nxt is not None:
+        disabled = nxt.get("disabled") or nxt.get("aria-disabled")
+        if disabled and disabled != "false":
+            has_next = False
+    return {"count": len(row_els), "rows": rows, "hasNext": has_next}
+
+
+def submission_from_dom(doc: Element) -> Dict[str, Any]:
+    """SUBMISSION_SCRIPT run over a parsed page instead of in the browser."""
+    def first(selectors: List[str]) -> Optional[Element]:
+        return next((el for el in map(doc.select_one, selectors) if el is not None), None)
+
+    title = first(TITLE_SELECTORS)
+    statement = first(STATEMENT_SELECTORS)
+    code = doc.select_one(CODE_SELECTOR)
+    pdf = doc.select_one(PDF_LINK_SELECTOR)
+    return {
+        "title": title.inner_text().strip() if title is not None else None,
+        "statement": statement.inner_text() if statement is not None else None,
+        "code": code.inner_text() if code is not None else None,
+        "pdfHref": pdf.get("href") if pdf is not None else None,
+    }
+
+
+# Only text is read from HackerRank pages, so drop media, fonts and trackers.
+# Statement PDFs are always let through.
+RESOURCE_POLICY = ResourcePolicy(
+    block_types=DEFAULT_BLOCKED_TYPES,
+    block_patterns=(
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*doubleclick.net*",
+        "*facebook.net*",
+        "*hotjar.com*",
+        "*segment.io*",
+        "*segment.com*",
+        "*intercom.io*",
+        "*optimizely.com*",
+        "*newrelic.com*",
+        "*nr-data.net*",
+    ),
+    allow_patterns=("*.pdf", "*.pdf?*"),
+)
+
+
+def rebase(url: str, base_url: str) -> str:
+    """Point one of the URLs above at ``base_url``, e.g. a local test server."""
+    if base_url == BASE_URL or not url.startswith(BASE_URL):
+        return url
+    return base_url + url[len(BASE_URL):]
+
+
+def entries_from_listing(data: Dict[str, Any], base_url: str = BASE_URL) -> List[Dict[str, Any]]:
+    """Turn the result of LISTING_SCRIPT into submission entries."""
+    return [
+        {
+            "title": row["title"],
+            "url": urljoin(base_url, row["href"]) if row.get("href") else row.get("href"),
+            "timestamp": row.get("timestamp") or "",
+        }
+        for row in data["rows"]
+    ]
+
+
+# Submission URLs look like /[contests/<c>/]challenges/<slug>/submissions/code/<id>
+CHALLENGE_PATH_RE = re.compile(r"/challenges/([^/?#]+)")
+
+
+def challenge_slug(url: str) -> Optional[str]:
+    """The challenge slug in a submission or challenge URL, if it has one."""
+    match = CHALLENGE_PATH_RE.search(urlparse(url).path)
+    return match.group(1) if match else None
+
+
+SUBMISSION_PATH_RE = re.compile(
+    r"^(?:/contests/(?P<contest>[^/]+))?/challenges/(?P<slug>[^/]+)/submissions/code/(?P<id>\d+)"
+)
+
+
+def submission_ids(url: str) -> Optional[Dict[str, str]]:
+    """``contest``, ``slug`` and ``id`` of a submission URL, or None."""
+    match = SUBMISSION_PATH_RE.match(urlparse(url).path)
+    if not match:
+        return None
+    return {
+        "contest": match.group("contest") or "master",
+        "slug": match.group("slug"),
+        "id": match.group("id"),
+    }
+
+
+def entry_from_api_model(model: Dict[str, Any], base_url: str = BASE_URL) -> Dict[str, Any]:
+    """Convert one submission model from the REST listing into an entry."""
+    challenge = model.get("challenge") or {}
+    slug = challenge.get("slug") or model["challenge_slug"]
+    contest = (model.get("contest") or {}).get("slug") or model.get("contest_slug") or "master"
+    path = f"/challenges/{slug}/submissions/code/{model['id']}"
+    if contest != "master":
+        path = f"/contests/{contest}{path}"
+    return {
+        "title": (challenge.get("name") or slug).strip(),
+        "url": urljoin(base_url, path),
+        "timestamp": str(model.get("created_at") or model.get("time_ago") or ""),
+    }
+
+
+def api_listing_page(
+    data: Dict[str, Any], offset: int, page_size: int, base_url: str = BASE_URL
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    The entries of one REST listing page requested at ``offset``, and the
+    offset of the next page (None after the last one).
+    """
+    models = data["models"]
+    entries = [entry_from_api_model(model, base_url) for model in models]
+    offset += len(models)
+    total = data.get("total")
+    if len(models) < page_size or (total is not None and offset >= total):
+        return entries, None
+    return entries, offset
+
+
+def submission_title(fields: Dict[str, Any], entry: Dict[str, Any]) -> str:
+    """The title SUBMISSION_SCRIPT found, or the one from the listing."""
+    return fields["title"] or entry.get("title", "")
+
+
+def statement_pdf_path(download_dir: str, title: str) -> str:
+    """Where a submission's statement PDF is saved in ``download_dir``."""
+    return f"{download_dir}/{title}.pdf"
+
+
+def pdf_cache_lookup(
+    cache: PdfCache, key: str, pdf_path: str, href: Optional[str], base_url: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Copy ``key``'s statement from ``cache`` to ``pdf_path`` if it is fresh.
+    Returns ``(True, None)`` when it was, ``(False, url)`` when a stale copy
+    should be revalidated with a conditional GET of ``url`` (its response
+    goes to ``cache.update``) and ``(False, None)`` on a miss.
+    """
+    if cache.get(key, pdf_path):
+        return True, None
+    if not href or key not in cache:
+        return False, None
+    return False, urljoin(base_url, href)
+
+
+def record_pdf(
+    handler: Any, entry: Dict[str, Any], pdf_path: str, url: str, headers: Dict[str, str]
+) -> None:
+    """
+    Count a statement ``handler`` just downloaded for ``entry`` and add it
+    to the handler's PDF cache.
+    """
+    if handler.metrics.enabled:
+        handler.metrics.count("bytes_downloaded", Path(pdf_path).stat().st_size)
+    if handler.pdf_cache is not None:
+        handler.pdf_cache.put(handler.challenge_key(entry), pdf_path, url, headers)
 
 
 class HackerRankHandler(SiteHandler):
+    # List through the JSON REST endpoint first, scraping the table only if it fails
+    use_api = True
+    api_page_size = API_PAGE_SIZE
+    resource_policy = RESOURCE_POLICY
+    supports_http = True
+    supports_snapshots = True
+
     def __init__(self, page: Page, config: Dict[str, Any]):
         super().__init__(page, config)
         self.username = config.get("HR_USER")
         self.password = config.get("HR_PASS")
+        self.base_url = (config.get("HR_BASE_URL") or BASE_URL).rstrip("/")
+        # Shared by every handler built from the same config, including
+        # the fetch pool's workers
+        self.pdf_cache: Optional[PdfCache] = config.get("PDF_CACHE")
+
+    def site_url(self, url: str) -> str:
+        return rebase(url, self.base_url)
+
+    def challenge_key(self, entry: Dict[str, Any]) -> str:
+        """Key problems by challenge slug so renamed titles still match."""
+        return challenge_slug(entry["url"]) or super().challenge_key(entry)
+
+    def is_logged_in(self) -> bool:
+        """Ask the profile endpoint whether the context's cookies are still valid."""
+        try:
+            resp = self.request_get(self.site_url(PROFILE_API_URL))
+            if not resp.ok:
+                return False
+            model = resp.json().get("model") or {}
+        except Exception:
+            return False
+        return bool(model.get("username"))
 
     def login(self) -> None:
         """
         Navigate to the login page and authenticate the user.
         """
         # Load login page (wait for DOM content)
-        self.page.goto(
-            "https://www.hackerrank.com/auth/login",
-            wait_until="domcontentloaded",
-            timeout=60000
-        )
+        self.goto(self.site_url(LOGIN_URL), wait_until="domcontentloaded")
         # Fill credentials
         self.page.fill("input[name='username']", self.username)
         self.page.fill("input[name='password']", self.password)
@@ -32,113 +330,129 @@ class HackerRankHandler(SiteHandler):
         self.page.click("button[type=submit]")
         # Wait until redirected to dashboard
         # allow more time here in case the redirect takes a while
-        self.page.wait_for_url(
-            "https://www.hackerrank.com/dashboard", timeout=60000)
+        self.page.wait_for_url(self.site_url(DASHBOARD_URL), timeout=self.retry.timeout)
 
     def list_submissions(self) -> List[Dict[str, Any]]:
         """Return a list of all submissions across every page."""
+        return list(self.iter_submissions())
+
+    def iter_submissions(
+        self,
+        known: Optional[Container[str]] = None,
+        known_run: Optional[int] = KNOWN_RUN,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield submissions newest first, loading each listing page only when
+        the previous one has been consumed. With ``known``, already-known
+        URLs are skipped and pagination stops after ``known_run`` of them in
+        a row.
+        """
+        return take_new(self._iter_listing(), known, known_run)
+
+    def newest_submission(self) -> Optional[Dict[str, Any]]:
+        """
+        The latest submission from a one-row REST request, or from the first
+        table page when the API is off or unavailable.
+        """
+        if self.use_api:
+            resp = self.request_get(
+                self.site_url(SUBMISSIONS_API_URL.format(offset=0, limit=1))
+            )
+            if resp.status in (401, 403):
+                raise SessionExpired(f"submissions API returned HTTP {resp.status}")
+            if resp.ok:
+                models = resp.json().get("models") or []
+                self.metrics.count("listing_pages")
+                return entry_from_api_model(models[0], self.base_url) if models else None
+        return next(self._iter_dom_listing(), None)
+
+    def _iter_listing(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every submission, preferring the REST listing. If it fails at
+        any point the HTML table is walked instead, skipping entries that
+        were already yielded.
+        """
+        seen = set()
+        if self.use_api:
+            try:
+                for entry in self._iter_api_listing():
+                    seen.add(entry["url"])
+                    yield entry
+                return
+            except Exception:
+                pass
+        for entry in self._iter_dom_listing():
+            if entry["url"] not in seen:
+                yield entry
+
+    def _iter_api_listing(self) -> Iterator[Dict[str, Any]]:
+        """Page through the submissions REST endpoint with the page's session."""
+        offset: Optional[int] = 0
+        while offset is not None:
+            url = self.site_url(SUBMISSIONS_API_URL.format(offset=offset, limit=self.api_page_size))
+            resp = self.request_get(url)
+            if not resp.ok:
+                raise RuntimeError(f"submissions API returned HTTP {resp.status}")
+            data = resp.json()
+            if self.snapshots is not None:
+                self.snapshot("listing_api", url, resp.text(), content_type="application/json")
+            entries, offset = api_listing_page(data, offset, self.api_page_size, self.base_url)
+            self.metrics.count("listing_pages")
+            self.metrics.count("listing_rows", len(entries))
+            yield from entries
+
+    def _iter_dom_listing(self) -> Iterator[Dict[str, Any]]:
+        """Walk ``/submissions/all`` page by page."""
 
         page_num = 1
-        results: List[Dict[str, Any]] = []
 
         while True:
-            self.page.goto(
-                f"https://www.hackerrank.com/submissions/all?page={page_num}",
-                wait_until="domcontentloaded",
-                timeout=60000,
-            )
+            url = self.site_url(SUBMISSIONS_URL.format(page=page_num))
+            self.goto(url, wait_until="domcontentloaded")
+            self.snapshot("listing", url)
 
-            rows = self.page.query_selector_all(
-                "table[aria-label='Submissions Table'] tbody tr"
-            )
-            if not rows:
+            with self.metrics.timer("extract"):
+                data = self.page.evaluate(LISTING_SCRIPT, LISTING_SELECTORS)
+            self.metrics.count("selector_calls")
+            self.metrics.count("listing_pages")
+            self.metrics.count("listing_rows", data["count"])
+            if not data["count"]:
                 break
 
-            for row in rows:
-                link_el = row.query_selector("a")
-                if not link_el:
-                    continue
-                link = link_el.get_attribute("href")
-                if link:
-                    link = urljoin(BASE_URL, link)
-                title = link_el.inner_text().strip()
-                time_el = row.query_selector(
-                    "td[aria-label*='Time'], td.submission-time"
-                )
-                timestamp = time_el.inner_text().strip() if time_el else ""
-                results.append({
-                    "title": title,
-                    "url": link,
-                    "timestamp": timestamp,
-                })
-
-            next_btn = self.page.query_selector(
-                "li.pagination-next:not(.disabled) a"
-            )
-            if not next_btn:
-                next_btn = self.page.query_selector("a[rel='next']")
-            if not next_btn:
-                next_btn = self.page.query_selector("a[aria-label='Next']")
-            if not next_btn:
-                break
-            disabled = next_btn.get_attribute("disabled") or next_btn.get_attribute(
-                "aria-disabled"
-            )
-            if disabled and disabled != "false":
+            yield from entries_from_listing(data, self.base_url)
+
+            if not data["hasNext"]:
                 break
             page_num += 1
 
-        return results
-
     def fetch_submission(self, entry: Dict[str, Any], download_dir: str = "") -> Dict[str, Any]:
         """Download the submission details and problem statement PDF."""
 
-        target = urljoin(BASE_URL, entry["url"])
-        self.page.goto(
-            target,
-            wait_until="domcontentloaded",
-            timeout=60000,
-        )
+        target = urljoin(self.base_url, entry["url"])
+        self.goto(target, wait_until="domcontentloaded")
+        self.snapshot("submission", target, entry=entry)
 
-        title_el = self.page.query_selector(".challenge-heading")
-        if not title_el:
-            title_el = self.page.query_selector("h1")
-        title = title_el.inner_text().strip() if title_el else entry.get("title", "")
+        with self.metrics.timer("extract"):
+            fields = self.page.evaluate(SUBMISSION_SCRIPT, SUBMISSION_SELECTORS)
+        self.metrics.count("selector_calls")
+        title = submission_title(fields, entry)
+        statement = fields["statement"] or ""
 
-        statement_el = self.page.query_selector(
-            ".challenge_problem_statement .hackdown-content"
-        )
-        if not statement_el:
-            statement_el = self.page.query_selector(".challenge-description")
-        statement = statement_el.inner_text() if statement_el else ""
-
-        code_el = self.page.query_selector(".editor-content")
-        if code_el:
-            code = code_el.inner_text()
-        else:
-            self.page.wait_for_selector("textarea.inputarea")
-            code = self.page.input_value("textarea.inputarea")
+        code = fields["code"]
+        if code is None:
+            self.page.wait_for_selector(CODE_INPUT_SELECTOR)
+            code = self.page.input_value(CODE_INPUT_SELECTOR)
+            self.metrics.count("selector_calls", 2)
 
         pdf_path = None
         if download_dir:
-            self.page.wait_for_selector("#pdf-link")
-            pdf_path = f"{download_dir}/{title}.pdf"
-            try:
-                with self.page.expect_download() as dl_info:
-                    self.page.click("#pdf-link")
-                download = dl_info.value
-                download.save_as(pdf_path)
-            except Exception:
-                href = self.page.get_attribute("#pdf-link", "href")
-                if href:
-                    pdf_url = urljoin(BASE_URL, href)
-                    resp = self.page.context.request.get(pdf_url)
-                    if getattr(resp, "ok", False):
-                        Path(pdf_path).write_bytes(resp.body())
-                    else:
-                        pdf_path = None
+            pdf_path = statement_pdf_path(download_dir, title)
+            with self.metrics.timer("pdf"):
+                if self._cached_pdf(entry, fields, pdf_path):
+                    self.metrics.count("pdf_cache_hits")
                 else:
-                    pdf_path = None
+                    pdf_path = self._download_pdf(entry, fields, pdf_path)
+        self.metrics.count("submissions_fetched")
 
         return {
             "title": title,
@@ -146,3 +460,150 @@ class HackerRankHandler(SiteHandler):
             "solution": code,
             "pdf": pdf_path,
         }
+
+    def fetch_submission_http(
+        self, entry: Dict[str, Any], session: Any, download_dir: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Read the submission from the REST API and download the statement PDF
+        directly, with ``session`` carrying the page's cookies. The
+        statement text is not available this way and is left empty.
+        """
+        ids = submission_ids(entry["url"])
+        if ids is None:
+            raise ValueError(f"not a submission URL: {entry['url']}")
+        api_url = self.site_url(SUBMISSION_API_URL.format(**ids))
+        resp = self.http_get(session, api_url)
+        if resp.status in (401, 403):
+            raise SessionExpired(f"submission API returned HTTP {resp.status}")
+        if not resp.ok:
+            raise RuntimeError(f"submission API returned HTTP {resp.status}")
+        self.snapshot(
+            "submission_api", api_url, resp.text(), entry=entry, content_type="application/json"
+        )
+        model = resp.json().get("model") or {}
+        code = model.get("code")
+        if code is None:
+            raise RuntimeError("submission API response has no code")
+        title = (model.get("challenge") or {}).get("name") or entry.get("title", "")
+
+        pdf_path = None
+        if download_dir:
+            pdf_path = statement_pdf_path(download_dir, title)
+            pdf_url = self.site_url(STATEMENT_PDF_URL.format(**ids))
+
+            def get(url: str, **kwargs: Any) -> Any:
+                return self.http_get(session, url, **kwargs)
+
+            with self.metrics.timer("pdf"):
+                if self._cached_pdf(entry, {"pdfHref": pdf_url}, pdf_path, get=get):
+                    self.metrics.count("pdf_cache_hits")
+                else:
+                    pdf_path = self._download_pdf_http(entry, pdf_url, pdf_path, get)
+        self.metrics.count("submissions_fetched")
+        return {"title": title, "statement": "", "solution": code, "pdf": pdf_path}
+
+    def extract_snapshot(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Parse an archived listing page, REST listing, submission page or REST
+        submission with the same selectors the browser path uses. Returns
+        ``entries`` for listings and ``title`` / ``solution`` (plus
+        ``statement`` and ``pdf_href`` for pages) for submissions.
+        """
+        kind = snapshot["kind"]
+        entry = snapshot.get("entry") or {}
+        if kind == "listing":
+            data = listing_from_dom(parse_html(snapshot["body"]))
+            return {"entries": entries_from_listing(data, self.base_url)}
+        if kind == "listing_api":
+            models = json.loads(snapshot["body"]).get("models") or []
+            return {"entries": [entry_from_api_model(m, self.base_url) for m in models]}
+        if kind == "submission":
+            doc = parse_html(snapshot["body"])
+            fields = submission_from_dom(doc)
+            code = fields["code"]
+            if code is None:
+                textarea = doc.select_one(CODE_INPUT_SELECTOR)
+                code = textarea.text_content() if textarea is not None else None
+            return {
+                "title": submission_title(fields, entry),
+                "statement": fields["statement"] or "",
+                "solution": code,
+                "pdf_href": fields["pdfHref"],
+            }
+        if kind == "submission_api":
+            model = json.loads(snapshot["body"]).get("model") or {}
+            return {
+                "title": (model.get("challenge") or {}).get("name") or entry.get("title", ""),
+                "solution": model.get("code"),
+            }
+        raise ValueError(f"unknown snapshot kind {kind!r}")
+
+    def _download_pdf_http(
+        self, entry: Dict[str, Any], pdf_url: str, pdf_path: str, get: Callable[..., Any]
+    ) -> str:
+        """
+        Save the statement at ``pdf_url`` to ``pdf_path``. Raises instead of
+        skipping the PDF, so the entry is fetched again through its page.
+        """
+        resp = get(pdf_url)
+        if not resp.ok:
+            raise RuntimeError(f"statement PDF returned HTTP {resp.status}")
+        body = resp.body()
+        if not body.startswith(b"%PDF"):
+            # e.g. a login page served in place of the file
+            raise RuntimeError("statement download is not a PDF")
+        Path(pdf_path).write_bytes(body)
+        record_pdf(self, entry, pdf_path, pdf_url, resp.headers)
+        return pdf_path
+
+    def _cached_pdf(
+        self,
+        entry: Dict[str, Any],
+        fields: Dict[str, Any],
+        pdf_path: str,
+        get: Optional[Callable[..., Any]] = None,
+    ) -> bool:
+        """
+        Serve the statement from ``pdf_cache``: fresh copies without any
+        request, stale ones after a conditional GET (through ``get``,
+        request_get() by default). False on a miss, or when the
+        revalidation request fails, so the caller downloads it instead.
+        """
+        cache = self.pdf_cache
+        if cache is None:
+            return False
+        key = self.challenge_key(entry)
+        hit, pdf_url = pdf_cache_lookup(cache, key, pdf_path, fields["pdfHref"], self.base_url)
+        if pdf_url is None:
+            return hit
+        try:
+            resp = (get or self.request_get)(pdf_url, headers=cache.validators(key))
+        except Exception:
+            # A network error, or a HarMiss when replaying a recording
+            return False
+        body = resp.body() if resp.ok else None
+        return cache.update(key, pdf_path, pdf_url, resp.status, resp.headers, body)
+
+    def _download_pdf(
+        self, entry: Dict[str, Any], fields: Dict[str, Any], pdf_path: str
+    ) -> Optional[str]:
+        self.page.wait_for_selector(PDF_LINK_SELECTOR)
+        href = fields["pdfHref"]
+        headers: Dict[str, str] = {}
+        try:
+            with self.page.expect_download() as dl_info:
+                self.page.click(PDF_LINK_SELECTOR)
+            download = dl_info.value
+            download.save_as(pdf_path)
+        except Exception:
+            href = href or self.page.get_attribute(PDF_LINK_SELECTOR, "href")
+            if not href:
+                return None
+            resp = self.request_get(urljoin(self.base_url, href))
+            if not getattr(resp, "ok", False):
+                return None
+            Path(pdf_path).write_bytes(resp.body())
+            headers = getattr(resp, "headers", None) or {}
+        record_pdf(self, entry, pdf_path, urljoin(self.base_url, href) if href else "", headers)
+        return pdf_path
@@ -0,0 +1,106 @@
+"""Content-addressed storage of fetched solutions and statement PDFs."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+INDEX_FILE = "index.json"
+STATEMENT_FILE = "statement.pdf"
+# Hex digits of the content hash used in solution file names
+NAME_DIGITS = 12
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def solution_name(sha: str) -> str:
+    """File name of the solution whose code hashes to ``sha``."""
+    return f"solution-{sha[:NAME_DIGITS]}.txt"
+
+
+class ArtifactStore:
+    """
+    One folder per challenge holding each distinct solution once, named by
+    the hash of its code, plus the challenge's statement PDF::
+
+        <root>/<challenge>/index.json
+        <root>/<challenge>/solution-<hash>.txt
+        <root>/<challenge>/statement.pdf
+
+    ``index.json`` records which submission first produced each solution.
+    Resubmitting identical code changes nothing on disk, so there is
+    nothing to commit either.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def folder(self, challenge: str) -> Path:
+        return self.root / challenge
+
+    def load_index(self, challenge: str) -> Dict[str, Any]:
+        path = self.folder(challenge) / INDEX_FILE
+        if not path.exists():
+            return {"solutions": [], "statement": None}
+        return json.loads(path.read_text())
+
+    def _save_index(self, challenge: str, index: Dict[str, Any]) -> None:
+        path = self.folder(challenge) / INDEX_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(index, indent=2, sort_keys=True) + "\n")
+        os.replace(tmp, path)
+
+    def has_statement(self, challenge: str) -> bool:
+        return (self.folder(challenge) / STATEMENT_FILE).exists()
+
+    def add_solution(
+        self, challenge: str, entry: Dict[str, Any], code: str
+    ) -> Tuple[Path, bool]:
+        """
+        Store ``code`` for the submission ``entry``. Returns the solution's
+        path and whether anything was written (False if the same code was
+        already stored for this challenge).
+        """
+        data = code.encode("utf-8")
+        sha = digest(data)
+        path = self.folder(challenge) / solution_name(sha)
+        index = self.load_index(challenge)
+        if any(s["sha256"] == sha for s in index["solutions"]) and path.exists():
+            return path, False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        index["solutions"] = [s for s in index["solutions"] if s["sha256"] != sha]
+        index["solutions"].append({
+            "sha256": sha,
+            "file": path.name,
+            "url": entry["url"],
+            "timestamp": entry.get("timestamp") or "",
+        })
+        self._save_index(challenge, index)
+        return path, True
+
+    def add_statement(self, challenge: str, pdf: Optional[Union[str, Path]]) -> bool:
+        """
+        Move a downloaded statement PDF into place. Returns False (and
+        discards the download) when the stored statement has the same bytes.
+        """
+        if not pdf or not Path(pdf).exists():
+            return False
+        source = Path(pdf)
+        target = self.folder(challenge) / STATEMENT_FILE
+        sha = digest(source.read_bytes())
+        index = self.load_index(challenge)
+        current = index.get("statement")
+        if current and current["sha256"] == sha and target.exists():
+            if source.resolve() != target.resolve():
+                source.unlink()
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+        index["statement"] = {"sha256": sha, "file": target.name}
+        self._save_index(challenge, index)
+        return True
@@ -1,9 +1,10 @@
 from __future__ import annotations
 import os
 from pathlib import Path
-from typing import Dict
-from dotenv import load_dotenv
-from playwright.sync_api import Browser, BrowserContext
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, BrowserContext
 
 # Paths
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -14,6 +15,7 @@ SESSION_FILE = PROJECT_ROOT / "playwright_state.json"
 def load_credentials(env_path: Path = ENV_FILE) -> Dict[str, str]:
     """Load credentials from environment or a ``.env`` file."""
     if env_path.exists():
+        from dotenv import load_dotenv
         load_dotenv(dotenv_path=env_path)
     return {
         "HR_USER": os.getenv("HR_USER", ""),
@@ -0,0 +1,355 @@
+# apparator/utils/html_dom.py
+"""
+A small DOM built with the standard library's HTML parser, and a CSS
+selector matcher covering what the handlers' selectors use, so archived
+pages can be re-extracted without a browser.
+
+Supported selectors: type, ``*``, ``#id``, ``.class``, attribute tests
+(``[a]``, ``=``, ``~=``, ``|=``, ``^=``, ``$=``, ``*=``), ``:not(...)``,
+``:first-child`` / ``:last-child``, the descendant and child (``>``)
+combinators and comma-separated groups.
+"""
+
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+DOCUMENT = "#document"
+VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+})
+# Elements whose start implicitly closes an open element of the same group
+_AUTO_CLOSE = {
+    "li": {"li"}, "tr": {"tr", "td", "th"}, "td": {"td", "th"}, "th": {"td", "th"},
+    "p": {"p"}, "option": {"option"}, "dt": {"dt", "dd"}, "dd": {"dt", "dd"},
+}
+BLOCK_ELEMENTS = frozenset({
+    "address", "article", "aside", "blockquote", "dd", "details", "div", "dl",
+    "dt", "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3",
+    "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre",
+    "section", "table", "tbody", "thead", "tfoot", "tr", "ul",
+})
+HIDDEN_ELEMENTS = frozenset({"head", "script", "style", "template", "noscript"})
+PREFORMATTED = frozenset({"pre", "textarea", "listing", "plaintext"})
+
+Node = Union["Element", str]
+
+
+class Element:
+    """An element with its attributes, children (elements and text) and parent."""
+
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: Optional[Dict[str, str]] = None,
+                 parent: Optional["Element"] = None):
+        self.tag = tag
+        self.attrs: Dict[str, str] = attrs or {}
+        self.children: List[Node] = []
+        self.parent = parent
+
+    def __repr__(self) -> str:
+        return f"<Element {self.tag} {self.attrs}>"
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.attrs.get(name, default)
+
+    @property
+    def classes(self) -> List[str]:
+        return (self.attrs.get("class") or "").split()
+
+    def elements(self) -> List["Element"]:
+        return [c for c in self.children if isinstance(c, Element)]
+
+    def iter(self) -> Iterator["Element"]:
+        """Every descendant element, in document order."""
+        stack = list(reversed(self.elements()))
+        while stack:
+            el = stack.pop()
+            yield el
+            stack.extend(reversed(el.elements()))
+
+    def select(self, selector: str) -> List["Element"]:
+        """Descendants matching ``selector``, like ``querySelectorAll``."""
+        match = compile_selector(selector)
+        return [el for el in self.iter() if match(el)]
+
+    def select_one(self, selector: str) -> Optional["Element"]:
+        """The first descendant matching ``selector``, like ``querySelector``."""
+        match = compile_selector(selector)
+        return next((el for el in self.iter() if match(el)), None)
+
+    def text_content(self) -> str:
+        return "".join(
+            c if isinstance(c, str) else c.text_content() for c in self.children
+        )
+
+    def inner_text(self) -> str:
+        """
+        An approximation of the browser's ``innerText``: hidden elements are
+        skipped, whitespace collapses outside preformatted elements and block
+        elements and ``<br>`` start new lines.
+        """
+        out: List[Union[str, int]] = []
+        _render_text(self, out, self.tag in PREFORMATTED)
+        text: List[str] = []
+        pending_break = 0
+        for part in out:
+            if isinstance(part, int):
+                if text:
+                    pending_break = max(pending_break, part)
+                continue
+            if pending_break:
+                text[-1] = text[-1].rstrip(" ")
+                text.append("\n" * pending_break)
+                pending_break = 0
+                part = part.lstrip(" ")
+            elif text and text[-1].endswith((" ", "\n")) and part.startswith(" "):
+                part = part.lstrip(" ")
+            if part:
+                text.append(part)
+        return "".join(text).strip(" ") if text else ""
+
+
+def _render_text(el: Element, out: List[Union[str, int]], pre: bool) -> None:
+    for child in el.children:
+        if isinstance(child, str):
+            text = child if pre else re.sub(r"[ \t\r\n\f]+", " ", child)
+            if not pre and not out:
+                text = text.lstrip(" ")
+            if text:
+                out.append(text)
+            continue
+        if child.tag in HIDDEN_ELEMENTS:
+            continue
+        if child.tag == "br":
+            out.append("\n")
+            continue
+        block = child.tag in BLOCK_ELEMENTS
+        if block:
+            out.append(1)
+        _render_text(child, out, pre or child.tag in PREFORMATTED)
+        if block:
+            out.append(1)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = Element(DOCUMENT)
+        self.stack: List[Element] = [self.root]
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        closes = _AUTO_CLOSE.get(tag)
+        if closes and self.stack[-1].tag in closes:
+            self.stack.pop()
+        parent = self.stack[-1]
+        el = Element(tag, {k: v if v is not None else "" for k, v in attrs}, parent)
+        parent.children.append(el)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(el)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        parent = self.stack[-1]
+        parent.children.append(
+            Element(tag, {k: v if v is not None else "" for k, v in attrs}, parent)
+        )
+
+    def handle_endtag(self, tag: str) -> None:
+        # Close up to the matching open element; stray end tags are ignored
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data: str) -> None:
+        parent = self.stack[-1]
+        if parent.tag in PREFORMATTED and not parent.children and data.startswith("\n"):
+            # As in browsers, a newline right after <pre> is not content
+            data = data[1:]
+        if data:
+            parent.children.append(data)
+
+
+def parse_html(markup: str) -> Element:
+    """Parse ``markup`` into a document element."""
+    builder = _TreeBuilder()
+    builder.feed(markup)
+    builder.close()
+    return builder.root
+
+
+# ---- selectors -------------------------------------------------------------
+
+Matcher = Callable[[Element], bool]
+
+_ATTR_RE = re.compile(
+    r"""\[\s*([\w:-]+)\s*(?:([~|^$*]?=)\s*(?:"([^"]*)"|'([^']*)'|([^\]\s]+))\s*(i)?\s*)?\]"""
+)
+_NAME_RE = re.compile(r"-?[_a-zA-Z][\w-]*")
+
+
+def _split_top_level(text: str, sep: str) -> List[str]:
+    parts, depth, quote, start = [], 0, "", 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = ""
+        elif ch in "'\"":
+            quote = ch
+        elif ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _closing_paren(text: str, start: int) -> int:
+    depth = 1
+    for i in range(start, len(text)):
+        if text[i] == "(":
+            depth += 1
+        elif text[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError(f"unbalanced parentheses in {text!r}")
+
+
+def _attr_test(name: str, op: Optional[str], value: str, nocase: bool) -> Matcher:
+    def test(el: Element) -> bool:
+        actual = el.attrs.get(name)
+        if actual is None:
+            return False
+        if op is None:
+            return True
+        a, v = (actual.lower(), value.lower()) if nocase else (actual, value)
+        if op == "=":
+            return a == v
+        if op == "~=":
+            return v in a.split()
+        if op == "|=":
+            return a == v or a.startswith(v + "-")
+        if op == "^=":
+            return bool(v) and a.startswith(v)
+        if op == "$=":
+            return bool(v) and a.endswith(v)
+        return bool(v) and v in a
+
+    return test
+
+
+def _parse_compound(text: str, pos: int) -> Tuple[Matcher, int]:
+    """Parse the compound selector at ``pos``; return its matcher and end."""
+    tests: List[Matcher] = []
+    start = pos
+    if text.startswith("*", pos):
+        pos += 1
+    else:
+        m = _NAME_RE.match(text, pos)
+        if m:
+            tag = m.group().lower()
+            tests.append(lambda el, tag=tag: el.tag == tag)
+            pos = m.end()
+    while pos < len(text):
+        ch = text[pos]
+        if ch in "#.":
+            m = _NAME_RE.match(text, pos + 1)
+            if not m:
+                raise ValueError(f"bad selector {text!r} at {pos}")
+            name = m.group()
+            if ch == "#":
+                tests.append(lambda el, name=name: el.attrs.get("id") == name)
+            else:
+                tests.append(lambda el, name=name: name in el.classes)
+            pos = m.end()
+        elif ch == "[":
+            m = _ATTR_RE.match(text, pos)
+            if not m:
+                raise ValueError(f"bad attribute selector in {text!r} at {pos}")
+            name, op, dq, sq, bare, nocase = m.groups()
+            value = next((v for v in (dq, sq, bare) if v is not None), "")
+            tests.append(_attr_test(name.lower(), op, value, bool(nocase)))
+            pos = m.end()
+        elif text.startswith(":not(", pos):
+            inner_start = pos + len(":not(")
+            end = _closing_paren(text, inner_start)
+            inner = text[inner_start:end]
+            negated = compile_selector(inner)
+            tests.append(lambda el, negated=negated: not negated(el))
+            pos = end + 1
+        elif text.startswith(":first-child", pos):
+            tests.append(lambda el: el.parent is None or el.parent.elements()[0] is el)
+            pos += len(":first-child")
+        elif text.startswith(":last-child", pos):
+            tests.append(lambda el: el.parent is None or el.parent.elements()[-1] is el)
+            pos += len(":last-child")
+        elif ch == ":":
+            raise ValueError(f"unsupported pseudo-class in {text!r} at {pos}")
+        else:
+            break
+    if pos == start:
+        raise ValueError(f"bad selector {text!r} at {pos}")
+
+    def compound(el: Element) -> bool:
+        return el.tag != DOCUMENT and all(test(el) for test in tests)
+
+    return compound, pos
+
+
+def _compile_complex(text: str) -> Matcher:
+    """One selector of a group: compounds joined by descendant or ``>`` combinators."""
+    parts: List[Tuple[str, Matcher]] = []
+    combinator = ""
+    pos = 0
+    text = text.strip()
+    if not text:
+        raise ValueError("empty selector")
+    while pos < len(text):
+        if text[pos].isspace():
+            combinator = combinator or " "
+            pos += 1
+            continue
+        if text[pos] == ">":
+            combinator = ">"
+            pos += 1
+            continue
+        if text[pos] in "+~":
+            raise ValueError(f"unsupported combinator {text[pos]!r} in {text!r}")
+        if parts and not combinator:
+            raise ValueError(f"bad selector {text!r} at {pos}")
+        compound, pos = _parse_compound(text, pos)
+        parts.append((combinator, compound))
+        combinator = ""
+
+    def matches(el: Element, i: int) -> bool:
+        comb, compound = parts[i]
+        if not compound(el):
+            return False
+        if i == 0:
+            return True
+        parent = el.parent
+        if comb == ">":
+            return parent is not None and matches(parent, i - 1)
+        while parent is not None:
+            if matches(parent, i - 1):
+                return True
+            parent = parent.parent
+        return False
+
+    last = len(parts) - 1
+    return lambda el: matches(el, last)
+
+
+@lru_cache(maxsize=256)
+def compile_selector(selector: str) -> Matcher:
+    """A predicate testing an element against a comma-separated selector group."""
+    matchers = [_compile_complex(part) for part in _split_top_level(selector, ",")]
+    if len(matchers) == 1:
+        return matchers[0]
+    return lambda el: any(m(el) for m in matchers)
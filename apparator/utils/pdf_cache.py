@@ -0,0 +1,186 @@
+"""On-disk cache of problem statement PDFs, keyed by challenge."""
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Union
+
+INDEX_FILE = "index.json"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# Statements rarely change; older entries are revalidated before reuse
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+
+class CacheStats:
+    """Hit/miss counters for one :class:`PdfCache`."""
+
+    def __init__(self):
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hits, {self.revalidated} revalidated, {self.misses} misses, "
+            f"{self.bytes_downloaded} bytes downloaded, {self.bytes_saved} bytes saved"
+        )
+
+
+class PdfCache:
+    """
+    Size-bounded LRU cache of statement PDFs.
+
+    Each entry keeps the ETag / Last-Modified headers it was served with.
+    Entries younger than ``max_age`` seconds are used without any request;
+    older ones are revalidated with a conditional request, so an unchanged
+    statement costs a 304 and no body. When the cache grows past
+    ``max_bytes`` the least recently used entries are evicted.
+
+    Safe to share between fetch worker threads.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: Optional[float] = DEFAULT_MAX_AGE,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        index = self.root / INDEX_FILE
+        self._index: Dict[str, Dict[str, Any]] = (
+            json.loads(index.read_text()) if index.exists() else {}
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.pdf"
+
+    def _save(self) -> None:
+        tmp = self.root / (INDEX_FILE + ".tmp")
+        tmp.write_text(json.dumps(self._index, indent=2, sort_keys=True))
+        os.replace(tmp, self.root / INDEX_FILE)
+
+    def _entry(self, key: str) -> Optional[Dict[str, Any]]:
+        meta = self._index.get(key)
+        if meta is not None and not self._path(key).exists():
+            del self._index[key]
+            return None
+        return meta
+
+    def _serve(self, key: str, meta: Dict[str, Any], dest: Union[str, Path]) -> None:
+        shutil.copyfile(self._path(key), dest)
+        meta["used_at"] = time.time()
+        self.stats.bytes_saved += meta["size"]
+        self._save()
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return isinstance(key, str) and self._entry(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def total_bytes(self) -> int:
+        return sum(meta["size"] for meta in self._index.values())
+
+    def get(self, key: str, dest: Union[str, Path]) -> bool:
+        """
+        Copy ``key``'s PDF to ``dest`` if it is cached and fresh. Returns
+        False when it is missing or due for revalidation.
+        """
+        with self._lock:
+            meta = self._entry(key)
+            if meta is None:
+                return False
+            if self.max_age is not None and time.time() - meta["fetched_at"] > self.max_age:
+                return False
+            self._serve(key, meta, dest)
+            self.stats.hits += 1
+            return True
+
+    def validators(self, key: str) -> Dict[str, str]:
+        """Conditional request headers for a stale entry ({} if uncached)."""
+        with self._lock:
+            meta = self._entry(key) or {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def update(
+        self,
+        key: str,
+        dest: Union[str, Path],
+        url: str,
+        status: int,
+        headers: Mapping[str, str],
+        body: Optional[bytes] = None,
+    ) -> bool:
+        """
+        Apply the response to a request made with :meth:`validators` and
+        copy the PDF to ``dest``. A 304 reuses the cached copy, a 2xx stores
+        ``body``; anything else returns False so the caller can fall back.
+        """
+        headers = {k.lower(): v for k, v in headers.items()}
+        with self._lock:
+            meta = self._entry(key)
+            if status == 304 and meta is not None:
+                meta["fetched_at"] = time.time()
+                self._serve(key, meta, dest)
+                self.stats.revalidated += 1
+                return True
+        if not 200 <= status < 300 or body is None:
+            return False
+        Path(dest).write_bytes(body)
+        self.put(key, dest, url, headers)
+        return True
+
+    def put(
+        self,
+        key: str,
+        source: Union[str, Path],
+        url: str = "",
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """Cache the freshly downloaded PDF at ``source`` under ``key``."""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        size = Path(source).stat().st_size
+        with self._lock:
+            shutil.copyfile(source, self._path(key))
+            now = time.time()
+            self._index[key] = {
+                "url": url,
+                "size": size,
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "fetched_at": now,
+                "used_at": now,
+            }
+            self.stats.misses += 1
+            self.stats.bytes_downloaded += size
+            self._evict()
+            self._save()
+
+    def _evict(self) -> None:
+        total = self.total_bytes()
+        for key in sorted(self._index, key=lambda k: self._index[k]["used_at"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index.pop(key)["size"]
+            self._path(key).unlink(missing_ok=True)
+            self.stats.evictions += 1
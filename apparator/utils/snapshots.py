@@ -0,0 +1,98 @@
+"""Compressed archive of the raw pages and API responses a sync run parsed."""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+SNAPSHOT_DIR = Path("snapshots")
+SNAPSHOT_SUFFIX = ".json.gz"
+
+
+class SnapshotStats:
+    """Counters for one :class:`SnapshotArchive`."""
+
+    def __init__(self):
+        self.pages = 0
+        self.bytes_raw = 0
+        self.bytes_stored = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+    def __str__(self) -> str:
+        ratio = self.bytes_raw / self.bytes_stored if self.bytes_stored else 0
+        return f"{self.pages} pages, {self.bytes_stored} bytes stored ({ratio:.1f}x compression)"
+
+
+class SnapshotArchive:
+    """
+    Raw page bodies as the handler saw them, so parsing can be re-run
+    offline after a selector fix.
+
+    Every snapshot is a gzip-compressed JSON record (kind, URL, content
+    type, entry, body) at ``<root>/<kind>/<xx>/<sha256 of url>.json.gz``;
+    fetching a URL again replaces its snapshot. Files are written
+    atomically, so the archive is safe to share between fetch worker
+    threads and processes.
+    """
+
+    def __init__(self, root: Union[str, Path] = SNAPSHOT_DIR, level: int = 6):
+        self.root = Path(root)
+        self.level = level
+        self.stats = SnapshotStats()
+        self._lock = threading.Lock()
+
+    def path_for(self, kind: str, url: str) -> Path:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.root / kind / key[:2] / f"{key}{SNAPSHOT_SUFFIX}"
+
+    def add(
+        self,
+        kind: str,
+        url: str,
+        body: str,
+        content_type: str = "text/html",
+        entry: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        """Store ``body`` as the snapshot of ``url``; returns its path."""
+        record = {
+            "kind": kind,
+            "url": url,
+            "content_type": content_type,
+            "saved_at": time.time(),
+            "entry": entry,
+            "body": body,
+        }
+        raw = json.dumps(record).encode()
+        data = gzip.compress(raw, compresslevel=self.level, mtime=0)
+        path = self.path_for(kind, url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self.stats.pages += 1
+            self.stats.bytes_raw += len(raw)
+            self.stats.bytes_stored += len(data)
+        return path
+
+    def paths(self, kinds: Optional[Iterable[str]] = None) -> List[Path]:
+        """Snapshot files, optionally only of ``kinds``, in a stable order."""
+        if not self.root.exists():
+            return []
+        dirs = [self.root / k for k in kinds] if kinds is not None else [self.root]
+        return sorted(p for d in dirs for p in d.rglob(f"*{SNAPSHOT_SUFFIX}"))
+
+    def __len__(self) -> int:
+        return len(self.paths())
+
+
+def load_snapshot(path: Union[str, Path]) -> Dict[str, Any]:
+    """Read one snapshot record written by :meth:`SnapshotArchive.add`."""
+    with gzip.open(path, "rb") as f:
+        return json.loads(f.read())
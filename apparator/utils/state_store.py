@@ -0,0 +1,239 @@
+"""SQLite-backed record of every submission seen by a sync run."""
+
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Union
+
+# Lifecycle of a submission: listed -> fetched -> committed, or failed
+LISTED = "listed"
+FETCHED = "fetched"
+COMMITTED = "committed"
+FAILED = "failed"
+STATUSES = (LISTED, FETCHED, COMMITTED, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    url TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    timestamp TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    folder TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    challenge TEXT,
+    digest TEXT,
+    listed_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS submissions_status_updated
+    ON submissions (status, updated_at);
+CREATE INDEX IF NOT EXISTS submissions_timestamp
+    ON submissions (timestamp);
+"""
+# Created after _migrate, since older databases lack the column
+CHALLENGE_INDEX = """
+CREATE INDEX IF NOT EXISTS submissions_challenge
+    ON submissions (challenge);
+"""
+
+# Columns added after the first release, with their definitions
+MIGRATIONS = (
+    ("attempts", "INTEGER NOT NULL DEFAULT 0"),
+    ("challenge", "TEXT"),
+    ("digest", "TEXT"),
+)
+
+
+class SubmissionStore:
+    """
+    Persistent per-submission state keyed by URL.
+
+    Every update is its own transaction, so a crash loses at most the entry
+    that was in flight. Use :meth:`transaction` to group several updates.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._conn.executescript(CHALLENGE_INDEX)
+        self._depth = 0
+
+    def _migrate(self) -> None:
+        """Add columns introduced after a database was first created."""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(submissions)")}
+        for name, definition in MIGRATIONS:
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE submissions ADD COLUMN {name} {definition}")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "SubmissionStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator["SubmissionStore"]:
+        """Group several updates into one atomic transaction."""
+        if self._depth:
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._depth = 1
+        try:
+            yield self
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        else:
+            self._conn.execute("COMMIT")
+        finally:
+            self._depth = 0
+
+    # -- writes ---------------------------------------------------------
+
+    def record_listed(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """Insert newly listed entries; already-known URLs are left alone."""
+        now = time.time()
+        added = 0
+        with self.transaction():
+            for entry in entries:
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO submissions "
+                    "(url, title, timestamp, status, listed_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (entry["url"], entry.get("title") or "", entry.get("timestamp") or "",
+                     LISTED, now, now),
+                )
+                added += cur.rowcount
+        return added
+
+    def _set_status(self, url: str, status: str, *extra: str, **fields: Any) -> None:
+        assignments = ["status = ?", "updated_at = ?", *extra]
+        values: List[Any] = [status, time.time()]
+        for name, value in fields.items():
+            assignments.append(f"{name} = ?")
+            values.append(value)
+        values.append(url)
+        cur = self._conn.execute(
+            f"UPDATE submissions SET {', '.join(assignments)} WHERE url = ?", values
+        )
+        if cur.rowcount == 0:
+            raise KeyError(url)
+
+    def mark_fetched(
+        self,
+        url: str,
+        folder: Optional[str] = None,
+        challenge: Optional[str] = None,
+        digest: Optional[str] = None,
+    ) -> None:
+        """``challenge`` and ``digest`` identify the problem and solution content."""
+        self._set_status(
+            url, FETCHED, folder=folder, challenge=challenge, digest=digest, error=None
+        )
+
+    def mark_committed(self, url: str) -> None:
+        self._set_status(url, COMMITTED, error=None)
+
+    def mark_failed(self, url: str, error: str) -> None:
+        """Record a failed attempt; ``attempts`` counts them for retry caps."""
+        self._set_status(url, FAILED, "attempts = attempts + 1", error=error)
+
+    def import_json(self, path: Union[str, Path], status: str = COMMITTED) -> int:
+        """
+        Load a legacy ``submissions.json`` list. Its entries were already
+        processed, so they are recorded as ``status`` (committed by default).
+        """
+        entries = json.loads(Path(path).read_text())
+        now = time.time()
+        added = 0
+        with self.transaction():
+            for entry in entries:
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO submissions "
+                    "(url, title, timestamp, status, listed_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (entry["url"], entry.get("title") or "", entry.get("timestamp") or "",
+                     status, now, now),
+                )
+                added += cur.rowcount
+        return added
+
+    # -- queries --------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+
+    def __contains__(self, url: object) -> bool:
+        row = self._conn.execute("SELECT 1 FROM submissions WHERE url = ?", (url,)).fetchone()
+        return row is not None
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT * FROM submissions WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def status(self, url: str) -> Optional[str]:
+        row = self.get(url)
+        return row["status"] if row else None
+
+    def known_urls(self) -> Set[str]:
+        return {row[0] for row in self._conn.execute("SELECT url FROM submissions")}
+
+    def entries(self, *statuses: str) -> List[Dict[str, Any]]:
+        """Entries with any of ``statuses`` (all if none), in listing order."""
+        sql = "SELECT * FROM submissions"
+        if statuses:
+            sql += f" WHERE status IN ({', '.join('?' * len(statuses))})"
+        sql += " ORDER BY rowid"
+        return [dict(row) for row in self._conn.execute(sql, statuses)]
+
+    def new_entries(self) -> List[Dict[str, Any]]:
+        """Listed entries that have not been fetched yet."""
+        return self.entries(LISTED)
+
+    def failed_entries(self, max_attempts: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Failed entries, limited to those tried fewer than ``max_attempts`` times."""
+        if max_attempts is None:
+            return self.entries(FAILED)
+        return [dict(row) for row in self._conn.execute(
+            "SELECT * FROM submissions WHERE status = ? AND attempts < ? ORDER BY rowid",
+            (FAILED, max_attempts),
+        )]
+
+    def exhausted_entries(self, max_attempts: int) -> List[Dict[str, Any]]:
+        """Failed entries that used up their ``max_attempts`` retries."""
+        return [dict(row) for row in self._conn.execute(
+            "SELECT * FROM submissions WHERE status = ? AND attempts >= ? ORDER BY rowid",
+            (FAILED, max_attempts),
+        )]
+
+    def challenge_entries(self, challenge: str) -> List[Dict[str, Any]]:
+        """Every fetched submission to ``challenge``, in listing order."""
+        return [dict(row) for row in self._conn.execute(
+            "SELECT * FROM submissions WHERE challenge = ? ORDER BY rowid", (challenge,)
+        )]
+
+    def counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in STATUSES}
+        for status, n in self._conn.execute(
+            "SELECT status, COUNT(*) FROM submissions GROUP BY status"
+        ):
+            counts[status] = n
+        return counts
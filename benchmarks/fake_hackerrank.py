@@ -0,0 +1,311 @@
+"""
+Local stand-in for the parts of HackerRank the handlers use.
+
+Serves synthetic data shaped like the real site: the login form, the
+paginated submissions table and REST listing, submission pages and their
+REST models, and statement PDFs (with ETags). Point a handler at it with
+``config["HR_BASE_URL"] = server.base_url``.
+"""
+
+import hashlib
+import html
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+SESSION_COOKIE = "hrsession"
+USERNAME = "bench"
+SUBMISSION_API_RE = re.compile(r"^/rest/contests/master/submissions/(\d+)$")
+PDF_API_RE = re.compile(r"^/rest/contests/master/challenges/([^/]+)/download_pdf$")
+
+
+class FakeHackerRank:
+    """
+    Synthetic HackerRank on ``127.0.0.1``. ``submissions`` are spread over
+    ``challenges`` problems, newest first; every ``distinct_solutions``-th
+    submission to a challenge repeats earlier code, so deduplication has
+    something to find. ``latency`` (seconds) is added to every response and
+    every ``throttle_every``-th request is answered with HTTP 429.
+    """
+
+    def __init__(
+        self,
+        submissions: int = 200,
+        challenges: int = 40,
+        page_size: int = 20,
+        latency: float = 0.0,
+        pdf_bytes: int = 64 * 1024,
+        distinct_solutions: int = 3,
+        api: bool = True,
+        throttle_every: int = 0,
+    ):
+        self.submissions = submissions
+        self.challenges = max(1, challenges)
+        self.page_size = page_size
+        self.latency = latency
+        self.pdf_bytes = pdf_bytes
+        self.distinct_solutions = max(1, distinct_solutions)
+        self.api = api
+        self.throttle_every = throttle_every
+        # Requests served, by kind ("listing", "api", "submission", "pdf", ...)
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # -- synthetic data -------------------------------------------------
+
+    def submission(self, index: int) -> Dict[str, Any]:
+        """The ``index``-th newest submission."""
+        sub_id = self.submissions - index
+        n = sub_id % self.challenges
+        return {
+            "id": sub_id,
+            "slug": f"challenge-{n}",
+            "name": f"Challenge {n}",
+            "created_at": f"2024-01-01T00:00:{sub_id % 60:02d}Z",
+            "code": f"// challenge {n}\nint solve() {{ return {sub_id % self.distinct_solutions}; }}\n",
+        }
+
+    def submission_path(self, sub: Dict[str, Any]) -> str:
+        return f"/challenges/{sub['slug']}/submissions/code/{sub['id']}"
+
+    def pdf(self, slug: str) -> bytes:
+        header = f"%PDF-1.4\n% statement for {slug}\n".encode()
+        return header + b"0" * max(0, self.pdf_bytes - len(header))
+
+    # -- server lifecycle -----------------------------------------------
+
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("server is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeHackerRank":
+        site = self
+
+        class Handler(_Handler):
+            fake = site
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05},
+            name="fake-hackerrank", daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self) -> "FakeHackerRank":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def round_trips(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def _count(self, kind: str) -> int:
+        with self._lock:
+            self.requests[kind] += 1
+            return sum(self.requests.values())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakeHackerRank
+    # Every response has a Content-Length, so connections can be kept alive
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    # -- helpers --------------------------------------------------------
+
+    def _logged_in(self) -> bool:
+        return f"{SESSION_COOKIE}=ok" in (self.headers.get("Cookie") or "")
+
+    def _send(
+        self,
+        status: int,
+        body: bytes = b"",
+        content_type: str = "text/html; charset=utf-8",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _html(self, title: str, body: str) -> None:
+        page = f"<!doctype html><html><head><title>{html.escape(title)}</title></head><body>{body}</body></html>"
+        self._send(200, page.encode())
+
+    def _json(self, payload: Any, status: int = 200) -> None:
+        self._send(status, json.dumps(payload).encode(), "application/json")
+
+    def _kind(self, path: str) -> str:
+        if SUBMISSION_API_RE.match(path):
+            return "submission_api"
+        if path.endswith("/download_pdf"):
+            return "pdf"
+        if path.startswith("/rest/contests/master/submissions"):
+            return "api"
+        if path.startswith("/rest/"):
+            return "profile"
+        if path.startswith("/submissions/all"):
+            return "listing"
+        if path.startswith("/static/"):
+            return "pdf"
+        if "/submissions/code/" in path:
+            return "submission"
+        return "other"
+
+    # -- routes ---------------------------------------------------------
+
+    def do_POST(self):
+        fake = self.fake
+        fake._count("login")
+        if fake.latency:
+            time.sleep(fake.latency)
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if urlparse(self.path).path != "/auth/login":
+            return self._send(404)
+        self._send(302, headers={
+            "Location": "/dashboard",
+            "Set-Cookie": f"{SESSION_COOKIE}=ok; Path=/",
+        })
+
+    def do_GET(self):
+        fake = self.fake
+        url = urlparse(self.path)
+        path, query = url.path, parse_qs(url.query)
+        kind = self._kind(path)
+        served = fake._count(kind)
+        if fake.latency:
+            time.sleep(fake.latency)
+        if fake.throttle_every and served % fake.throttle_every == 0:
+            return self._send(429, headers={"Retry-After": "0"})
+
+        if path == "/auth/login":
+            return self._html("Login", (
+                '<form method="post" action="/auth/login">'
+                '<input name="username"><input name="password" type="password">'
+                '<button type="submit">Log in</button></form>'
+            ))
+        if path == "/dashboard":
+            return self._html("Dashboard", "<h1>Dashboard</h1>")
+        if path == "/rest/contests/master/hackers/me":
+            if not self._logged_in():
+                return self._json({"model": None}, 401)
+            return self._json({"model": {"username": USERNAME}})
+        if kind == "submission_api":
+            if not self._logged_in():
+                return self._json({"model": None}, 401)
+            return self._submission_model(int(SUBMISSION_API_RE.match(path).group(1)))
+        if kind == "api":
+            if not fake.api or not self._logged_in():
+                return self._json({"error": "unavailable"}, 404 if not fake.api else 401)
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", ["20"])[0])
+            return self._json({"models": self._api_models(offset, limit), "total": fake.submissions})
+        if kind == "listing":
+            return self._listing(int(query.get("page", ["1"])[0]))
+        if kind == "submission":
+            return self._submission(path)
+        if kind == "pdf":
+            return self._pdf(path)
+        self._send(404)
+
+    def _api_models(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        fake = self.fake
+        models = []
+        for i in range(offset, min(offset + limit, fake.submissions)):
+            sub = fake.submission(i)
+            models.append({
+                "id": sub["id"],
+                "challenge": {"slug": sub["slug"], "name": sub["name"]},
+                "contest": {"slug": "master"},
+                "created_at": sub["created_at"],
+            })
+        return models
+
+    def _listing(self, page: int) -> None:
+        fake = self.fake
+        start = (page - 1) * fake.page_size
+        rows = []
+        for i in range(start, min(start + fake.page_size, fake.submissions)):
+            sub = fake.submission(i)
+            rows.append(
+                f'<tr><td><a href="{fake.submission_path(sub)}">{html.escape(sub["name"])}</a></td>'
+                f'<td class="submission-time">{sub["created_at"]}</td></tr>'
+            )
+        last = start + fake.page_size >= fake.submissions
+        nav = (
+            '<ul><li class="pagination-next disabled"><a>Next</a></li></ul>' if last else
+            f'<ul><li class="pagination-next"><a href="/submissions/all?page={page + 1}">Next</a></li></ul>'
+        )
+        self._html("Submissions", (
+            '<table aria-label="Submissions Table"><tbody>' + "".join(rows) + "</tbody></table>" + nav
+        ))
+
+    def _submission(self, path: str) -> None:
+        fake = self.fake
+        try:
+            sub_id = int(path.rstrip("/").rsplit("/", 1)[1])
+        except ValueError:
+            return self._send(404)
+        if not 1 <= sub_id <= fake.submissions:
+            return self._send(404)
+        sub = fake.submission(fake.submissions - sub_id)
+        self._html(sub["name"], (
+            f'<h2 class="challenge-heading">{html.escape(sub["name"])}</h2>'
+            '<div class="challenge_problem_statement"><div class="hackdown-content">'
+            f'<p>Solve {html.escape(sub["name"])}.</p></div></div>'
+            f'<pre class="editor-content">{html.escape(sub["code"])}</pre>'
+            f'<a id="pdf-link" href="/static/{sub["slug"]}.pdf">Download PDF</a>'
+        ))
+
+    def _submission_model(self, sub_id: int) -> None:
+        fake = self.fake
+        if not 1 <= sub_id <= fake.submissions:
+            return self._json({"model": None}, 404)
+        sub = fake.submission(fake.submissions - sub_id)
+        self._json({"model": {
+            "id": sub["id"],
+            "challenge": {"slug": sub["slug"], "name": sub["name"]},
+            "created_at": sub["created_at"],
+            "language": "cpp",
+            "code": sub["code"],
+        }})
+
+    def _pdf(self, path: str) -> None:
+        match = PDF_API_RE.match(path)
+        slug = match.group(1) if match else path[len("/static/"):].rsplit(".", 1)[0]
+        body = self.fake.pdf(slug)
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, content_type="application/pdf", headers={"ETag": etag})
+        self._send(200, body, "application/pdf", headers={
+            "ETag": etag,
+            "Content-Disposition": f'attachment; filename="{slug}.pdf"',
+        })
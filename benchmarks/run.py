@@ -0,0 +1,258 @@
+"""
+Benchmark the scraping hot paths against a local fake HackerRank.
+
+    python -m benchmarks.run --submissions 500 --latency 20 --concurrency 4
+    python -m benchmarks.run fetch --latency 20 --http 16
+
+Each scenario reports wall time, pages per second, HTTP round trips seen
+by the fake server and peak memory (Python heap via tracemalloc, plus the
+maximum RSS of this process; browser processes are not included).
+"""
+
+import argparse
+import importlib.util
+import json
+import resource
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from benchmarks.fake_hackerrank import FakeHackerRank
+
+ROOT = Path(__file__).resolve().parent.parent
+SCENARIOS = ("list", "fetch", "sync")
+
+
+class Measurement:
+    def __init__(self, scenario: str):
+        self.scenario = scenario
+        self.wall = 0.0
+        self.items = 0
+        self.round_trips = 0
+        self.by_kind: Dict[str, int] = {}
+        self.peak_heap = 0
+        self.max_rss = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "scenario": self.scenario,
+            "wall_s": round(self.wall, 3),
+            "items": self.items,
+            "pages_per_s": round(self.round_trips / self.wall, 2) if self.wall else 0.0,
+            "round_trips": self.round_trips,
+            "by_kind": self.by_kind,
+            "peak_heap_kb": self.peak_heap // 1024,
+            "max_rss_kb": self.max_rss,
+        }
+
+    def __str__(self) -> str:
+        d = self.as_dict()
+        return (
+            f"{d['scenario']:<6} {d['wall_s']:>8.3f}s  {d['items']:>5} items  "
+            f"{d['round_trips']:>5} round trips  {d['pages_per_s']:>8.2f} pages/s  "
+            f"heap {d['peak_heap_kb']} KiB  rss {d['max_rss_kb']} KiB"
+        )
+
+
+@contextmanager
+def measure(scenario: str, server: FakeHackerRank) -> Iterator[Measurement]:
+    m = Measurement(scenario)
+    before = dict(server.requests)
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield m
+    finally:
+        m.wall = time.perf_counter() - start
+        m.peak_heap = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        m.max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        m.by_kind = {k: v - before.get(k, 0) for k, v in server.requests.items() if v - before.get(k, 0)}
+        m.round_trips = sum(m.by_kind.values())
+
+
+# Requests/second used when --rate is not given: high enough that the
+# limiter never paces the benchmark
+UNTHROTTLED = 1e6
+
+
+def handler_config(server: FakeHackerRank, args: argparse.Namespace) -> Dict[str, Any]:
+    from apparator.core.rate_limit import RateLimiter
+
+    rate = args.rate or UNTHROTTLED
+    return {
+        "HR_USER": "bench",
+        "HR_PASS": "bench",
+        "HR_BASE_URL": server.base_url,
+        "RATE_LIMITER": RateLimiter(rate=rate, max_rate=rate, burst=max(4.0, rate)),
+    }
+
+
+def bench_list(server: FakeHackerRank, args: argparse.Namespace) -> Measurement:
+    from apparator.core.browser import with_browsers
+    from apparator.handlers.hackerrank import HackerRankHandler
+
+    with with_browsers(headless=True) as bm:
+        page = bm.new_page(block=HackerRankHandler.resource_policy)
+        handler = HackerRankHandler(page, handler_config(server, args))
+        handler.use_api = not args.no_api
+        handler.ensure_login()
+        with measure("list", server) as m:
+            m.items = len(handler.list_submissions())
+    return m
+
+
+def bench_fetch(server: FakeHackerRank, args: argparse.Namespace) -> Measurement:
+    from apparator.core.browser import with_browsers
+    from apparator.core.fetch_pool import fetch_submissions, fetch_submissions_http
+    from apparator.handlers.hackerrank import HackerRankHandler
+
+    with with_browsers(headless=True) as bm, tempfile.TemporaryDirectory() as tmp:
+        block = HackerRankHandler.resource_policy
+        page = bm.new_page(block=block)
+        handler = HackerRankHandler(page, handler_config(server, args))
+        handler.ensure_login()
+        entries = handler.list_submissions()[: args.fetch]
+        with measure("fetch", server) as m:
+            if args.http:
+                results = fetch_submissions_http(
+                    handler, entries,
+                    workers=args.http,
+                    download_dir=(lambda entry: tmp) if args.pdfs else None,
+                    concurrency=args.concurrency,
+                    block=block,
+                )
+            else:
+                results = fetch_submissions(
+                    handler, entries,
+                    concurrency=args.concurrency,
+                    download_dir=(lambda entry: tmp) if args.pdfs else None,
+                    block=block,
+                )
+            m.items = sum(1 for r in results if r.ok)
+    return m
+
+
+def _load_script() -> Any:
+    spec = importlib.util.spec_from_file_location(
+        "process_submissions", ROOT / "scripts" / "process_submissions.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bench_sync(server: FakeHackerRank, args: argparse.Namespace) -> Measurement:
+    """Run scripts/process_submissions.py end to end into a scratch repository."""
+    import apparator.config as config
+    from apparator.core.har import HarReplay
+
+    config.HR_USER = config.HR_PASS = "bench"
+    config.HR_BASE_URL = server.base_url
+    if args.replay_har:
+        # The recording's server has gone; point the handler at its address
+        # so the URLs match (nothing is sent there)
+        origins = [o for o in HarReplay.from_recording(args.replay_har).origins()
+                   if o.startswith("http://127.0.0.1")]
+        config.HR_BASE_URL = origins[0] if origins else server.base_url
+    script = _load_script()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        for cmd in (
+            ["init", "-q"],
+            ["config", "user.email", "bench@example.com"],
+            ["config", "user.name", "Bench"],
+        ):
+            subprocess.run(["git", "-C", str(repo), *cmd], check=True)
+        argv = [
+            "--repo", str(repo), "--headless", "--full",
+            "--concurrency", str(args.concurrency),
+            "--http", str(args.http),
+            "--state", str(tmp_path / "state.db"),
+            "--session", str(tmp_path / "session.json"),
+            "--pdf-cache", str(tmp_path / "pdf_cache"),
+            "--batch-size", "0",
+            "--rate", str(args.rate or UNTHROTTLED),
+            "--max-rate", str(args.rate or UNTHROTTLED),
+        ]
+        if args.record_har:
+            argv += ["--record-har", str(args.record_har)]
+        if args.replay_har:
+            argv += ["--replay-har", str(args.replay_har)]
+        with measure("sync", server) as m:
+            script.main(argv)
+        m.items = int(subprocess.run(
+            ["git", "-C", str(repo), "rev-list", "--count", "HEAD"],
+            capture_output=True, text=True,
+        ).stdout.strip() or 0)
+    return m
+
+
+BENCHMARKS: Dict[str, Callable[[FakeHackerRank, argparse.Namespace], Measurement]] = {
+    "list": bench_list,
+    "fetch": bench_fetch,
+    "sync": bench_sync,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--challenges", type=int, default=40)
+    parser.add_argument("--page-size", type=int, default=20, help="Rows per HTML listing page")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added per response, in ms")
+    parser.add_argument("--pdf-kb", type=int, default=64)
+    parser.add_argument("--no-api", action="store_true", help="Serve only the HTML listing")
+    parser.add_argument("--fetch", type=int, default=50, help="Submissions fetched by 'fetch'")
+    parser.add_argument("--pdfs", action="store_true", help="Download PDFs in 'fetch'")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--http", type=int, default=0, metavar="N",
+        help="Fetch over plain HTTP with N requests in flight in 'fetch' and 'sync'",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=None,
+        help="Pin the handlers' rate limiter to N requests/s (default: unthrottled)",
+    )
+    har = parser.add_mutually_exclusive_group()
+    har.add_argument(
+        "--record-har", type=Path, default=None, metavar="FILE",
+        help="Record the 'sync' run's traffic to a HAR file",
+    )
+    har.add_argument(
+        "--replay-har", type=Path, default=None, metavar="FILE",
+        help="Replay 'sync' from a --record-har recording instead of the fake server",
+    )
+    parser.add_argument("--json", type=Path, help="Append results as JSON lines")
+    args = parser.parse_args(argv)
+
+    results = []
+    with FakeHackerRank(
+        submissions=args.submissions,
+        challenges=args.challenges,
+        page_size=args.page_size,
+        latency=args.latency / 1000,
+        pdf_bytes=args.pdf_kb * 1024,
+        api=not args.no_api,
+    ) as server:
+        for name in args.scenarios or SCENARIOS:
+            m = BENCHMARKS[name](server, args)
+            results.append(m)
+            print(m)
+    if args.json:
+        with args.json.open("a") as fh:
+            for m in results:
+                fh.write(json.dumps({**m.as_dict(), "args": {
+                    k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()
+                }}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,16 @@ pytest.importorskip("playwright")
 from apparator.core.browser import with_browsers
 from apparator.handlers.hackerrank import HackerRankHandler
 from apparator.config import get_config
+from apparator.utils.auth import SESSION_FILE
 
 
 def main():
     cfg = get_config()
     with with_browsers(headless=False) as bm:
-        page = bm.new_page()
+        page = bm.new_page(storage_path=SESSION_FILE, block=HackerRankHandler.resource_policy)
         print("→ Logging in…")
         hr = HackerRankHandler(page, cfg)
-        hr.login()
+        hr.ensure_login(SESSION_FILE)
         print("→ Listing submissions…")
         subs = hr.list_submissions()
         print(f"→ Found {len(subs)} submissions:")
@@ -1,55 +1,361 @@
 """Example script to process new HackerRank submissions."""
 
 import argparse
-import json
+import asyncio
 from pathlib import Path
 
-from apparator.core.browser import with_browsers
+from apparator.core.accounts import ACCOUNT_LIMIT, SESSION_DIR, STATE_DIR, load_accounts, sync_accounts
+from apparator.core.async_browser import with_async_browsers
+from apparator.core.browser import RECYCLE_AFTER, with_browsers
+from apparator.core.har import HarReplay
+from apparator.core.metrics import Metrics
+from apparator.core.rate_limit import RateLimiter
+from apparator.core.sync import MAX_ATTEMPTS, SyncReport, SyncRunner
+from apparator.core.watch import MAX_POLL_INTERVAL, POLL_INTERVAL, Watcher
+from apparator.handlers.async_hackerrank import AsyncHackerRankHandler
 from apparator.handlers.hackerrank import HackerRankHandler
 from apparator.config import get_config
-from apparator.utils.github_sync import commit_files
+from apparator.utils.auth import SESSION_FILE
+from apparator.utils.github_sync import BackgroundPusher, BatchCommitter
+from apparator.utils.pdf_cache import DEFAULT_MAX_BYTES, PdfCache
+from apparator.utils.snapshots import SnapshotArchive
+from apparator.utils.state_store import SubmissionStore
 
 
+STATE_DB = Path("submissions.db")
+# Legacy JSON state, imported the first time the database is created
 STATE_FILE = Path("submissions.json")
-PROBLEMS_DIR = Path("problems")
+PDF_CACHE_DIR = Path("pdf_cache")
 
 
-def load_state() -> list:
-    if STATE_FILE.exists():
-        return json.loads(STATE_FILE.read_text())
-    return []
+def open_store(path: Path) -> SubmissionStore:
+    fresh = not path.exists()
+    store = SubmissionStore(path)
+    if fresh and STATE_FILE.exists():
+        imported = store.import_json(STATE_FILE)
+        print(f"Imported {imported} entries from {STATE_FILE}")
+    return store
 
 
-def save_state(data: list) -> None:
-    STATE_FILE.write_text(json.dumps(data, indent=2))
+def report_metrics(metrics: Metrics, args: argparse.Namespace, block_stats, pdf_cache) -> None:
+    """Fold the run's other statistics into ``metrics`` and emit them."""
+    if block_stats is not None:
+        stats = block_stats.as_dict()
+        metrics.count("requests_blocked", stats["requests_blocked"])
+        metrics.count("bytes_received", stats["bytes_received"])
+    if pdf_cache is not None:
+        for name, value in pdf_cache.stats.as_dict().items():
+            metrics.count(f"pdf_cache_{name}", value)
+    metrics.event("summary", **metrics.summary())
+    print(f"Metrics: {metrics}")
+    if args.metrics_prom:
+        args.metrics_prom.write_text(metrics.prometheus())
+    metrics.close()
+
+
+def print_report(report: SyncReport, store: SubmissionStore) -> None:
+    print(f"Sync: {report}")
+    for entry in report.exhausted:
+        print(f"  gave up after {entry['attempts']} attempts: "
+              f"{entry['url']} ({entry['error']})")
+    print("State:", ", ".join(f"{k}={v}" for k, v in store.counts().items()))
+
+
+def start_pusher(args: argparse.Namespace, cfg: dict) -> BackgroundPusher | None:
+    if not args.push:
+        return None
+    return BackgroundPusher(
+        Path(args.repo), remote=args.remote,
+        token=cfg.get("GH_TOKEN"), interval=args.push_interval,
+    ).start()
+
+
+def stop_pusher(pusher: BackgroundPusher | None) -> None:
+    if pusher is not None:
+        error = pusher.stop()
+        if error:
+            print(f"Push failed: {error}")
+
+
+async def run_accounts(path: Path, args: argparse.Namespace, cfg: dict) -> None:
+    """Sync every account listed in ``path`` through one shared browser."""
+    accounts = load_accounts(path, base=cfg)
+    pusher = start_pusher(args, cfg)
+    try:
+        async with with_async_browsers(headless=args.headless) as bm:
+            block = None if args.load_all else AsyncHackerRankHandler.resource_policy
+            reports = await sync_accounts(
+                accounts, bm, AsyncHackerRankHandler, Path(args.repo),
+                state_dir=args.state_dir,
+                session_dir=args.session_dir,
+                limit=args.account_limit,
+                block=block,
+                max_attempts=args.max_attempts,
+                pusher=pusher,
+                full=args.full,
+                concurrency=args.concurrency,
+            )
+    finally:
+        stop_pusher(pusher)
+
+    for name, report in reports.items():
+        if isinstance(report, Exception):
+            print(f"{name}: failed ({report})")
+            continue
+        print(f"{name}: {report}")
+        for entry in report.exhausted:
+            print(f"  gave up after {entry['attempts']} attempts: "
+                  f"{entry['url']} ({entry['error']})")
+    if block is not None:
+        print(f"Resource blocking: {bm.block_stats}")
+    print(f"Request rate: {cfg['RATE_LIMITER']}")
+    if cfg.get("PDF_CACHE") is not None:
+        print(f"PDF cache: {cfg['PDF_CACHE'].stats}")
+    if cfg.get("METRICS") is not None:
+        report_metrics(cfg["METRICS"], args, bm.block_stats if block is not None else None,
+                       cfg.get("PDF_CACHE"))
 
 
 def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(description="Process new HackerRank submissions")
     parser.add_argument("--repo", default=".", help="Path to git repository for commits")
     parser.add_argument("--headless", action="store_true", help="Run browser headless")
+    parser.add_argument(
+        "--concurrency", type=int, default=1,
+        help="Number of browser pages fetching submissions in parallel",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1,
+        help="Shard pending submissions across N worker processes, each with its own "
+             "browser and --concurrency pages",
+    )
+    parser.add_argument(
+        "--http", type=int, default=0, metavar="N",
+        help="Fetch code and statements over plain HTTP with the session cookies, "
+             "N requests in flight, rendering pages only for entries that fail",
+    )
+    parser.add_argument(
+        "--full", action="store_true",
+        help="Crawl every submissions page instead of stopping at known entries",
+    )
+    parser.add_argument(
+        "--session", type=Path, default=SESSION_FILE,
+        help="Saved login session to reuse and refresh",
+    )
+    parser.add_argument(
+        "--load-all", action="store_true",
+        help="Load images, fonts and trackers instead of blocking them",
+    )
+    parser.add_argument(
+        "--state", type=Path, default=STATE_DB,
+        help="SQLite database recording the state of every submission",
+    )
+    parser.add_argument(
+        "--max-attempts", type=int, default=MAX_ATTEMPTS,
+        help="Give up on a submission after this many failed attempts",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=None,
+        help="Write commits through git fast-import every N submissions "
+             "(0 = once at the end of the run) instead of one git add/commit each",
+    )
+    parser.add_argument(
+        "--squash", action="store_true",
+        help="With --batch-size, make each batch a single commit listing its submissions",
+    )
+    parser.add_argument(
+        "--push", action="store_true",
+        help="Push new commits with GH_TOKEN from a background worker",
+    )
+    parser.add_argument("--remote", default="origin", help="Remote to push to")
+    parser.add_argument(
+        "--push-interval", type=float, default=None,
+        help="Push every N seconds while syncing instead of once at the end",
+    )
+    parser.add_argument(
+        "--pdf-cache", type=Path, default=PDF_CACHE_DIR,
+        help="Directory caching statement PDFs between runs",
+    )
+    parser.add_argument(
+        "--pdf-cache-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Evict least recently used PDFs beyond this size",
+    )
+    parser.add_argument(
+        "--no-pdf-cache", action="store_true", help="Always download statement PDFs",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=2.0,
+        help="Starting requests per second per host; adapts to throttling",
+    )
+    parser.add_argument(
+        "--max-rate", type=float, default=20.0,
+        help="Never send more than this many requests per second per host",
+    )
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="Time each phase and print a summary of timers and counters",
+    )
+    parser.add_argument(
+        "--metrics-log", type=Path, default=None,
+        help="Append timing events as JSON lines (implies --metrics)",
+    )
+    parser.add_argument(
+        "--metrics-prom", type=Path, default=None,
+        help="Write the final metrics in Prometheus text format (implies --metrics)",
+    )
+    parser.add_argument(
+        "--accounts", type=Path, default=None,
+        help="JSON file of accounts to sync in one run (default: HR_ACCOUNTS); "
+             "each is committed under <repo>/<name>/",
+    )
+    parser.add_argument(
+        "--account-limit", type=int, default=ACCOUNT_LIMIT,
+        help="With --accounts, how many accounts to sync at the same time",
+    )
+    parser.add_argument(
+        "--state-dir", type=Path, default=STATE_DIR,
+        help="With --accounts, directory of per-account state databases",
+    )
+    parser.add_argument(
+        "--session-dir", type=Path, default=SESSION_DIR,
+        help="With --accounts, directory of per-account saved sessions",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Keep running: poll for new submissions and sync only when some appear",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=POLL_INTERVAL,
+        help="With --watch, seconds between polls while submissions keep arriving",
+    )
+    parser.add_argument(
+        "--max-interval", type=float, default=MAX_POLL_INTERVAL,
+        help="With --watch, slow polling down to this many seconds while idle",
+    )
+    parser.add_argument(
+        "--recycle-after", type=int, default=RECYCLE_AFTER,
+        help="Replace the browser context after this many navigations to bound "
+             "its memory, keeping the session (0 = never)",
+    )
+    parser.add_argument(
+        "--recycle-mb", type=float, default=None,
+        help="Also replace it once the page's JS heap exceeds this many MB (Chromium)",
+    )
+    parser.add_argument(
+        "--snapshots", type=Path, default=None, metavar="DIR",
+        help="Archive the raw HTML/JSON of every parsed page, gzip-compressed, so "
+             "`python -m apparator.cli reextract` can re-run parsing offline",
+    )
+    har = parser.add_mutually_exclusive_group()
+    har.add_argument(
+        "--record-har", type=Path, default=None, metavar="FILE",
+        help="Record the run's browser traffic to a HAR file for --replay-har",
+    )
+    har.add_argument(
+        "--replay-har", type=Path, default=None, metavar="FILE",
+        help="Serve the whole run from a --record-har recording instead of the network, "
+             "without rate limiting",
+    )
     args = parser.parse_args(argv)
 
     cfg = get_config()
-    known = load_state()
-    known_urls = {e["url"] for e in known}
+    if args.record_har or args.replay_har:
+        if args.concurrency > 1 or args.processes > 1 or args.accounts or cfg.get("HR_ACCOUNTS"):
+            parser.error("--record-har and --replay-har need a single page: "
+                         "drop --concurrency, --processes and --accounts")
+        if args.record_har and args.http:
+            parser.error("--http requests bypass the browser and cannot be recorded")
+    if args.replay_har:
+        cfg["HAR_REPLAY"] = HarReplay.from_recording(args.replay_har)
+    else:
+        cfg["RATE_LIMITER"] = RateLimiter(rate=args.rate, max_rate=args.max_rate)
+    metrics = None
+    if args.metrics or args.metrics_log or args.metrics_prom:
+        metrics = cfg["METRICS"] = Metrics(log=args.metrics_log)
+    if not args.no_pdf_cache:
+        cfg["PDF_CACHE"] = PdfCache(args.pdf_cache, max_bytes=args.pdf_cache_mb * 1024 * 1024)
+    if args.snapshots is not None:
+        cfg["SNAPSHOTS"] = SnapshotArchive(args.snapshots)
+    if args.http and args.processes > 1:
+        parser.error("--http cannot be combined with --processes")
+    accounts = args.accounts or cfg.get("HR_ACCOUNTS")
+    if accounts:
+        if args.batch_size is not None or args.processes > 1:
+            parser.error("--batch-size and --processes cannot be combined with --accounts")
+        if args.watch:
+            parser.error("--watch cannot be combined with --accounts")
+        asyncio.run(run_accounts(Path(accounts), args, cfg))
+        return
+    store = open_store(args.state)
 
-    with with_browsers(headless=args.headless) as bm:
-        page = bm.new_page()
+    with store, with_browsers(
+        headless=args.headless, metrics=metrics,
+        record_har_path=args.record_har, route_from_har=args.replay_har,
+    ) as bm:
+        block = None if args.load_all else HackerRankHandler.resource_policy
+        page = bm.recycling_page(
+            storage_path=args.session, block=block,
+            max_navigations=args.recycle_after or None, max_memory_mb=args.recycle_mb,
+        )
         hr = HackerRankHandler(page, cfg)
-        hr.login()
-        submissions = hr.list_submissions()
-
-        new_entries = [s for s in submissions if s["url"] not in known_urls]
-        for entry in new_entries:
-            folder = PROBLEMS_DIR / entry["title"].replace(" ", "_")
-            folder.mkdir(parents=True, exist_ok=True)
-            details = hr.fetch_submission(entry, download_dir=str(folder))
-            (folder / "solution.txt").write_text(details["solution"])
-            if details.get("pdf"):
-                commit_files(Path(args.repo), [folder], f"Add {entry['title']}")
-
-        save_state(submissions)
+        hr.ensure_login(args.session)
+        committer = None
+        if args.batch_size is not None:
+            committer = BatchCommitter(
+                Path(args.repo), batch_size=args.batch_size or None, squash=args.squash
+            )
+        if args.watch and args.push_interval is None:
+            # Otherwise nothing would be pushed until the daemon stops
+            args.push_interval = args.interval
+        pusher = start_pusher(args, cfg)
+        runner = SyncRunner(
+            hr, store, Path(args.repo),
+            max_attempts=args.max_attempts,
+            committer=committer,
+            pusher=pusher,
+        )
+        run_kwargs = dict(
+            concurrency=args.concurrency,
+            processes=args.processes,
+            http_workers=args.http,
+            headless=args.headless,
+            block=block,
+            block_stats=bm.block_stats,
+            recycle_after=args.recycle_after,
+            recycle_mb=args.recycle_mb,
+        )
+        try:
+            if args.watch:
+                watcher = Watcher(
+                    runner,
+                    interval=args.interval,
+                    max_interval=args.max_interval,
+                    storage_path=args.session,
+                    on_sync=lambda report: print_report(report, store),
+                    **run_kwargs,
+                )
+                try:
+                    watcher.run(full=args.full)
+                except KeyboardInterrupt:
+                    print(f"Stopped after {watcher.polls} polls and {watcher.syncs} syncs")
+            else:
+                print_report(runner.run(full=args.full, **run_kwargs), store)
+        finally:
+            stop_pusher(pusher)
+
+        if block is not None:
+            print(f"Resource blocking: {bm.block_stats}")
+        if cfg.get("RATE_LIMITER") is not None:
+            print(f"Request rate: {cfg['RATE_LIMITER']}")
+        if cfg.get("HAR_REPLAY") is not None:
+            print(f"HAR replay: {cfg['HAR_REPLAY']}")
+        if cfg.get("PDF_CACHE") is not None:
+            print(f"PDF cache: {cfg['PDF_CACHE'].stats}")
+        if cfg.get("SNAPSHOTS") is not None:
+            print(f"Snapshots: {cfg['SNAPSHOTS'].stats}")
+        if metrics is not None:
+            report_metrics(metrics, args, bm.block_stats if block is not None else None,
+                           cfg.get("PDF_CACHE"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+import subprocess
+
+import pytest
+
+
+def git(repo, *args):
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """An empty git repository with a committer identity configured."""
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-q")
+    git(path, "config", "user.email", "sync@example.com")
+    git(path, "config", "user.name", "Sync")
+    return path
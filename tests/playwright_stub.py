@@ -0,0 +1,40 @@
+"""Minimal stand-in for Playwright so unit tests run without it installed."""
+
+import importlib.util
+import sys
+import types
+
+SYNC_NAMES = ("Page", "Playwright", "Browser", "BrowserContext")
+
+
+def install() -> None:
+    """Register stub ``playwright`` modules unless the real package exists."""
+    try:
+        spec = importlib.util.find_spec("playwright")
+    except ValueError:
+        spec = None
+    if spec is not None:
+        return
+    root = sys.modules.setdefault("playwright", types.ModuleType("playwright"))
+    sync_api = sys.modules.setdefault(
+        "playwright.sync_api", types.ModuleType("playwright.sync_api")
+    )
+    async_api = sys.modules.setdefault(
+        "playwright.async_api", types.ModuleType("playwright.async_api")
+    )
+    root.sync_api = sync_api
+    root.async_api = async_api
+    for module in (sync_api, async_api):
+        for name in SYNC_NAMES:
+            if not hasattr(module, name):
+                setattr(module, name, object)
+    if not hasattr(sync_api, "sync_playwright"):
+        sync_api.sync_playwright = _missing("sync_playwright")
+    if not hasattr(async_api, "async_playwright"):
+        async_api.async_playwright = _missing("async_playwright")
+
+
+def _missing(name):
+    def fn(*args, **kwargs):
+        raise RuntimeError(f"playwright is not installed ({name})")
+    return fn
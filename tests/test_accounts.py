@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+import pytest
+
+from tests import playwright_stub
+from tests.conftest import git
+
+
+def load_accounts():
+    playwright_stub.install()
+    from apparator.core import accounts
+    return accounts
+
+
+class FakeContext:
+    def __init__(self, manager, storage_path):
+        self.manager = manager
+        self.storage_path = storage_path
+        self.closed = False
+
+    async def new_page(self):
+        return self
+
+    async def close(self):
+        self.closed = True
+        self.manager.open -= 1
+
+
+class FakeManager:
+    """Counts how many account contexts are open at once."""
+
+    def __init__(self):
+        self.contexts = []
+        self.open = 0
+        self.peak = 0
+
+    async def new_context(self, storage_path=None, block=None):
+        ctx = FakeContext(self, storage_path)
+        self.contexts.append(ctx)
+        self.open += 1
+        self.peak = max(self.peak, self.open)
+        return ctx
+
+
+class FakeAsyncHandler:
+    """Lists two submissions per account; ``FAIL_LOGIN`` makes login raise."""
+
+    def __init__(self, page, config):
+        self.page = page
+        self.config = config
+        self.logins = []
+
+    def challenge_key(self, entry):
+        return entry["title"].replace(" ", "_")
+
+    async def ensure_login(self, storage_path=None):
+        await asyncio.sleep(0.01)
+        if self.config.get("FAIL_LOGIN"):
+            raise RuntimeError("bad password")
+        self.logins.append(storage_path)
+        return True
+
+    async def iter_submissions(self, known=None, known_run=None):
+        user = self.config["HR_USER"]
+        for i in range(2):
+            url = f"https://example.com/{user}/{i}"
+            if known is None or url not in known:
+                yield {"title": f"Problem {i}", "url": url, "timestamp": ""}
+
+    async def fetch_submission(self, entry, download_dir=""):
+        await asyncio.sleep(0)
+        return {"title": entry["title"], "solution": f"code {entry['url']}", "pdf": None}
+
+
+def test_load_accounts_reads_passwords_from_the_environment(tmp_path, monkeypatch):
+    accounts = load_accounts()
+    monkeypatch.setenv("ALICE_PASS", "secret")
+    path = tmp_path / "accounts.json"
+    path.write_text(json.dumps({"accounts": [
+        {"name": "alice", "HR_USER": "alice@example.com", "HR_PASS_ENV": "ALICE_PASS"},
+        {"HR_USER": "bob", "HR_PASS": "pw"},
+    ]}))
+    shared = object()
+    loaded = accounts.load_accounts(path, base={"RATE_LIMITER": shared, "HR_USER": "default"})
+    assert [a.name for a in loaded] == ["alice", "bob"]
+    assert loaded[0].config["HR_PASS"] == "secret"
+    assert loaded[0].config["HR_USER"] == "alice@example.com"
+    assert all(a.config["RATE_LIMITER"] is shared for a in loaded)
+
+
+@pytest.mark.parametrize("items", [
+    [{"name": "a", "HR_USER": "x"}, {"name": "a", "HR_USER": "y"}],
+    [{"name": "../escape", "HR_USER": "x"}],
+    [{"HR_PASS": "pw"}],
+])
+def test_load_accounts_rejects_bad_names(tmp_path, items):
+    accounts = load_accounts()
+    path = tmp_path / "accounts.json"
+    path.write_text(json.dumps(items))
+    with pytest.raises(ValueError):
+        accounts.load_accounts(path)
+
+
+def test_accounts_sync_into_their_own_namespaces(repo, tmp_path):
+    accounts = load_accounts()
+    team = [accounts.Account(name, {"HR_USER": name}) for name in ("alice", "bob", "carol")]
+    team.append(accounts.Account("dave", {"HR_USER": "dave", "FAIL_LOGIN": True}))
+    bm = FakeManager()
+    reports = asyncio.run(accounts.sync_accounts(
+        team, bm, FakeAsyncHandler, repo,
+        state_dir=tmp_path / "state", session_dir=tmp_path / "sessions", limit=2,
+    ))
+
+    assert bm.peak == 2
+    assert all(ctx.closed for ctx in bm.contexts)
+    assert {c.storage_path.name for c in bm.contexts} == {
+        "alice.json", "bob.json", "carol.json", "dave.json",
+    }
+    for name in ("alice", "bob", "carol"):
+        assert reports[name].committed == 2
+        assert (repo / name / "problems" / "Problem_0").is_dir()
+        assert (tmp_path / "state" / f"{name}.db").exists()
+    assert isinstance(reports["dave"], RuntimeError)
+    subjects = git(repo, "log", "--format=%s").splitlines()
+    assert len(subjects) == 6
+    assert "Add Problem 1 (bob)" in subjects
+
+    again = asyncio.run(accounts.sync_accounts(
+        team[:1], FakeManager(), FakeAsyncHandler, repo,
+        state_dir=tmp_path / "state", session_dir=tmp_path / "sessions",
+    ))
+    assert again["alice"].listed == 0
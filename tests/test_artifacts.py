@@ -0,0 +1,30 @@
+from apparator.utils.artifacts import ArtifactStore
+
+
+def test_solutions_are_stored_once_per_content(tmp_path):
+    store = ArtifactStore(tmp_path)
+    path, written = store.add_solution("two-sum", {"url": "u1"}, "print(1)")
+    assert written
+    again, written = store.add_solution("two-sum", {"url": "u2"}, "print(1)")
+    assert (again, written) == (path, False)
+    _, written = store.add_solution("two-sum", {"url": "u3"}, "print(2)")
+    assert written
+    index = store.load_index("two-sum")
+    assert [s["url"] for s in index["solutions"]] == ["u1", "u3"]
+
+
+def test_statement_is_replaced_only_when_bytes_change(tmp_path):
+    store = ArtifactStore(tmp_path / "problems")
+    download = tmp_path / "dl.pdf"
+    download.write_bytes(b"one")
+    assert store.add_statement("p", download)
+    assert store.has_statement("p")
+
+    download.write_bytes(b"one")
+    assert not store.add_statement("p", download)
+    assert not download.exists()
+
+    download.write_bytes(b"two")
+    assert store.add_statement("p", download)
+    assert (store.folder("p") / "statement.pdf").read_bytes() == b"two"
+    assert not store.add_statement("p", None)
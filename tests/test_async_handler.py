@@ -0,0 +1,242 @@
+import asyncio
+import re
+import types
+
+from tests import playwright_stub
+
+
+def load_async():
+    playwright_stub.install()
+    from apparator.core import async_browser, fetch_pool
+    from apparator.handlers.async_hackerrank import AsyncHackerRankHandler
+    return async_browser, fetch_pool, AsyncHackerRankHandler
+
+
+class AsyncListPage:
+    def __init__(self, pages=2):
+        self.pages = pages
+        self.current_page = 0
+        self.gotos = []
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        m = re.search(r"page=(\d+)", url)
+        self.current_page = int(m.group(1)) if m else 1
+        self.gotos.append(self.current_page)
+
+    async def evaluate(self, script, arg=None):
+        n = self.current_page
+        if n > self.pages:
+            return {"count": 0, "rows": [], "hasNext": False}
+        return {
+            "count": 1,
+            "rows": [{"href": f"/url-{n}", "title": f"title-{n}", "timestamp": ""}],
+            "hasNext": n < self.pages,
+        }
+
+
+def test_async_list_submissions_pagination():
+    _, _, AsyncHackerRankHandler = load_async()
+    page = AsyncListPage()
+    hr = AsyncHackerRankHandler(page, {})
+    results = asyncio.run(hr.list_submissions())
+    assert [r["title"] for r in results] == ["title-1", "title-2"]
+    assert results[0]["url"] == "https://www.hackerrank.com/url-1"
+    assert page.gotos == [1, 2]
+
+
+class AsyncApiResponse:
+    def __init__(self, payload):
+        self.status = 200
+        self.ok = True
+        self._payload = payload
+
+    async def json(self):
+        return self._payload
+
+
+def test_async_list_submissions_pages_through_the_api():
+    _, _, AsyncHackerRankHandler = load_async()
+    urls = []
+
+    async def request_get(url, **kwargs):
+        urls.append(url)
+        offset = int(re.search(r"offset=(\d+)", url).group(1))
+        models = [
+            {"id": i, "challenge": {"name": f"Challenge {i}", "slug": f"c-{i}"}}
+            for i in range(offset, min(offset + 2, 5))
+        ]
+        return AsyncApiResponse({"models": models, "total": 5})
+
+    page = types.SimpleNamespace(
+        context=types.SimpleNamespace(request=types.SimpleNamespace(get=request_get))
+    )
+    hr = AsyncHackerRankHandler(page, {})
+    hr.api_page_size = 2
+    results = asyncio.run(hr.list_submissions())
+    assert [r["title"] for r in results] == [f"Challenge {i}" for i in range(5)]
+    assert results[4]["url"] == "https://www.hackerrank.com/challenges/c-4/submissions/code/4"
+    assert len(urls) == 3
+
+
+class FakeAsyncContext:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self):
+        page = FakeAsyncPage(self)
+        self.pages.append(page)
+        return page
+
+
+class FakeAsyncPage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class SlowHandler:
+    def __init__(self, page, config):
+        self.page = page
+        self.config = config
+        self.fetched = []
+
+    async def fetch_submission(self, entry):
+        await asyncio.sleep(0.01)
+        if entry["url"] == "bad":
+            raise RuntimeError("boom")
+        self.fetched.append(entry["url"])
+        return {"solution": entry["url"]}
+
+
+def test_fetch_submissions_async_runs_pages_concurrently():
+    _, fetch_pool, _ = load_async()
+    ctx = FakeAsyncContext()
+
+    async def run():
+        handler = SlowHandler(await ctx.new_page(), {})
+        entries = [{"url": f"u{i}"} for i in range(8)] + [{"url": "bad"}]
+        return handler, [r async for r in fetch_pool.fetch_submissions_async(
+            handler, entries, concurrency=3)]
+
+    handler, results = asyncio.run(run())
+    assert len(results) == 9
+    assert [r.entry["url"] for r in results if not r.ok] == ["bad"]
+    assert len(ctx.pages) == 3
+    assert not ctx.pages[0].closed
+    assert all(p.closed for p in ctx.pages[1:])
+    assert handler.fetched
+
+
+class FakeAsyncLauncher:
+    def __init__(self, engine, launched):
+        self.engine = engine
+        self.launched = launched
+
+    async def launch(self, headless=True):
+        self.launched.append(self.engine)
+        return FakeAsyncBrowser()
+
+
+class FakeAsyncBrowser:
+    async def new_context(self, **kwargs):
+        return FakeAsyncContext()
+
+    async def close(self):
+        pass
+
+
+class FakeAsyncPlaywright:
+    def __init__(self):
+        self.launched = []
+        for engine in ("chromium", "firefox", "webkit"):
+            setattr(self, engine, FakeAsyncLauncher(engine, self.launched))
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        pass
+
+
+def test_async_browser_manager_launches_lazily(monkeypatch):
+    async_browser, _, _ = load_async()
+    pw = FakeAsyncPlaywright()
+    monkeypatch.setattr(async_browser, "async_playwright", lambda: pw)
+
+    async def run():
+        async with async_browser.AsyncBrowserManager() as bm:
+            assert pw.launched == []
+            await bm.new_page()
+            await bm.new_page()
+        return pw.launched
+
+    assert asyncio.run(run()) == ["chromium"]
+
+
+class AsyncFetchPage:
+    """A submission page whose PDF link downloads ``pdf`` when clicked."""
+
+    def __init__(self, request_get, pdf=b"%PDF new"):
+        self.context = types.SimpleNamespace(request=types.SimpleNamespace(get=request_get))
+        self.pdf = pdf
+        self.clicked = []
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        pass
+
+    async def evaluate(self, script, arg=None):
+        return {"title": "Challenge", "statement": "", "code": "code", "pdfHref": "/x.pdf"}
+
+    async def wait_for_selector(self, selector):
+        pass
+
+    async def click(self, selector):
+        self.clicked.append(selector)
+
+    def expect_download(self):
+        page = self
+
+        class Download:
+            async def save_as(self, path):
+                with open(path, "wb") as fh:
+                    fh.write(page.pdf)
+
+        class Info:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                pass
+
+            @property
+            def value(self):
+                future = asyncio.get_running_loop().create_future()
+                future.set_result(Download())
+                return future
+
+        return Info()
+
+
+def test_async_failed_pdf_revalidation_falls_back_to_a_download(tmp_path):
+    _, _, AsyncHackerRankHandler = load_async()
+    from apparator.core.har import HarMiss
+    from apparator.utils.pdf_cache import PdfCache
+
+    cache = PdfCache(tmp_path / "cache", max_age=0)
+    source = tmp_path / "old.pdf"
+    source.write_bytes(b"%PDF old")
+    cache.put("two-sum", str(source), "https://www.hackerrank.com/x.pdf", {"ETag": '"v1"'})
+
+    async def request_get(url, **kwargs):
+        raise HarMiss(f"GET {url} is not in the HAR recording")
+
+    page = AsyncFetchPage(request_get)
+    hr = AsyncHackerRankHandler(page, {"PDF_CACHE": cache})
+    entry = {"url": "https://www.hackerrank.com/challenges/two-sum/submissions/code/1"}
+    result = asyncio.run(hr.fetch_submission(entry, download_dir=str(tmp_path)))
+    assert result["pdf"] == str(tmp_path / "Challenge.pdf")
+    assert (tmp_path / "Challenge.pdf").read_bytes() == b"%PDF new"
+    assert page.clicked == ["#pdf-link"]
@@ -0,0 +1,80 @@
+import types
+
+from tests import playwright_stub
+
+
+def load_blocking():
+    playwright_stub.install()
+    from apparator.core import blocking
+    from apparator.handlers.hackerrank import RESOURCE_POLICY
+    return blocking, RESOURCE_POLICY
+
+
+class FakeRoute:
+    def __init__(self):
+        self.action = None
+
+    def abort(self):
+        self.action = "abort"
+
+    def continue_(self):
+        self.action = "continue"
+
+
+class FakeContext:
+    def __init__(self):
+        self.route_handler = None
+        self.listeners = {}
+
+    def route(self, pattern, handler):
+        self.route_handler = handler
+
+    def on(self, event, callback):
+        self.listeners[event] = callback
+
+    def request(self, resource_type, url):
+        route = FakeRoute()
+        self.route_handler(route, types.SimpleNamespace(resource_type=resource_type, url=url))
+        return route.action
+
+
+def test_policy_blocks_by_type_and_pattern_with_allowlist():
+    blocking, _ = load_blocking()
+    policy = blocking.ResourcePolicy(
+        block_types=("image",),
+        block_patterns=("*tracker.example*",),
+        allow_patterns=("*/keep.png",),
+    )
+    assert policy.should_block("image", "https://a.example/x.png")
+    assert not policy.should_block("image", "https://a.example/keep.png")
+    assert policy.should_block("script", "https://tracker.example/t.js")
+    assert not policy.should_block("script", "https://a.example/app.js")
+
+
+def test_hackerrank_policy_keeps_pages_and_pdfs():
+    _, policy = load_blocking()
+    assert not policy.should_block("document", "https://www.hackerrank.com/submissions/all")
+    assert not policy.should_block("fetch", "https://www.hackerrank.com/rest/contests/master/submissions/")
+    assert not policy.should_block("document", "https://hrcdn.net/s3_pub/problem.pdf?sig=1")
+    assert policy.should_block("font", "https://hrcdn.net/fonts/a.woff2")
+    assert policy.should_block("script", "https://www.google-analytics.com/analytics.js")
+
+
+def test_apply_policy_routes_and_counts():
+    blocking, _ = load_blocking()
+    ctx = FakeContext()
+    stats = blocking.BlockStats()
+    blocking.apply_policy(ctx, blocking.ResourcePolicy(), stats)
+
+    assert ctx.request("image", "https://a.example/x.png") == "abort"
+    assert ctx.request("font", "https://a.example/x.woff") == "abort"
+    assert ctx.request("document", "https://a.example/") == "continue"
+    ctx.listeners["response"](types.SimpleNamespace(headers={"content-length": "120"}))
+    ctx.listeners["response"](types.SimpleNamespace(headers={}))
+
+    assert stats.as_dict() == {
+        "requests_allowed": 1,
+        "requests_blocked": 2,
+        "bytes_received": 120,
+        "blocked_by_type": {"image": 1, "font": 1},
+    }
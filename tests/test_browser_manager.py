@@ -0,0 +1,281 @@
+import pytest
+
+from tests import playwright_stub
+
+
+def load_browser_module():
+    playwright_stub.install()
+    from apparator.core import browser
+    return browser
+
+
+class FakeBrowser:
+    def __init__(self, engine):
+        self.engine = engine
+        self.closed = False
+        self.contexts = []
+
+    def new_context(self, **kwargs):
+        self.contexts.append(kwargs)
+        return kwargs
+
+    def close(self):
+        self.closed = True
+
+
+class FakeLauncher:
+    def __init__(self, engine, launched):
+        self.engine = engine
+        self.launched = launched
+
+    def launch(self, headless=True):
+        browser = FakeBrowser(self.engine)
+        self.launched.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.launched = []
+        self.stopped = False
+        for engine in ("chromium", "firefox", "webkit"):
+            setattr(self, engine, FakeLauncher(engine, self.launched))
+
+    def start(self):
+        return self
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch):
+    browser = load_browser_module()
+    pw = FakePlaywright()
+    monkeypatch.setattr(browser, "sync_playwright", lambda: pw)
+    return browser, pw
+
+
+def test_engines_launch_on_first_use(fake_playwright):
+    browser, pw = fake_playwright
+    with browser.BrowserManager() as bm:
+        assert pw.launched == []
+        bm.new_context(viewport={"width": 1, "height": 1})
+        bm.new_context()
+        assert [b.engine for b in pw.launched] == ["chromium"]
+        bm.new_context("firefox")
+        assert [b.engine for b in pw.launched] == ["chromium", "firefox"]
+    assert all(b.closed for b in pw.launched)
+    assert pw.stopped
+
+
+def test_preload_launches_up_front(fake_playwright):
+    browser, pw = fake_playwright
+    with browser.BrowserManager(preload=["webkit"]):
+        assert [b.engine for b in pw.launched] == ["webkit"]
+
+
+def test_preload_outside_allowed_engines_is_rejected_before_starting(fake_playwright):
+    browser, pw = fake_playwright
+    with pytest.raises(ValueError):
+        browser.BrowserManager(engines=["chromium"], preload=["webkit"])
+    assert not pw.stopped and pw.launched == []
+
+
+def test_failed_preload_stops_playwright(fake_playwright, monkeypatch):
+    browser, pw = fake_playwright
+
+    def broken_launch(headless=True):
+        raise RuntimeError("executable missing")
+
+    monkeypatch.setattr(pw.firefox, "launch", broken_launch)
+    with pytest.raises(RuntimeError):
+        with browser.BrowserManager(preload=["chromium", "firefox"]):
+            pass
+    assert [b.closed for b in pw.launched] == [True]
+    assert pw.stopped
+
+
+def test_engine_outside_allowed_list_is_rejected(fake_playwright):
+    browser, pw = fake_playwright
+    with browser.BrowserManager(engines=["chromium"]) as bm:
+        with pytest.raises(ValueError):
+            bm.new_context("firefox")
+    assert pw.launched == []
+
+
+def test_unknown_engine_name_is_rejected():
+    browser = load_browser_module()
+    with pytest.raises(ValueError):
+        browser.BrowserManager(engines=["opera"])
+
+
+def test_storage_path_is_used_only_when_present(fake_playwright, tmp_path):
+    browser, pw = fake_playwright
+    state = tmp_path / "state.json"
+    with browser.BrowserManager() as bm:
+        bm.new_context(storage_path=state)
+        state.write_text("{}")
+        bm.new_context(storage_path=state)
+    assert pw.launched[0].contexts == [{}, {"storage_state": str(state)}]
+
+
+class FakePage:
+    def __init__(self, context, heap=0):
+        self.context = context
+        self.heap = heap
+        self.visited = []
+        self.handlers = {}
+        self.closed = False
+        self.crash_on_goto = False
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def goto(self, url, **kwargs):
+        if self.crash_on_goto:
+            raise RuntimeError("Page.goto: Target crashed")
+        self.visited.append(url)
+        return url
+
+    def evaluate(self, script):
+        return self.heap
+
+    def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, kwargs):
+        self.kwargs = kwargs
+        self.pages = []
+        self.closed = False
+
+    def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    def storage_state(self):
+        return {"cookies": [{"name": "session", "context": len(self.pages)}]}
+
+    def close(self):
+        self.closed = True
+
+
+class RecyclingManager:
+    def __init__(self):
+        from apparator.core.metrics import Metrics
+
+        self.contexts = []
+        self.metrics = Metrics()
+
+    def new_context(self, engine="chromium", block=None, **kwargs):
+        ctx = FakeContext(kwargs)
+        self.contexts.append(ctx)
+        return ctx
+
+
+def test_recycling_page_replaces_the_context_and_keeps_the_session():
+    browser = load_browser_module()
+    bm = RecyclingManager()
+    page = browser.RecyclingPage(bm, storage_path="session.json", max_navigations=2)
+    for i in range(5):
+        page.goto(f"u{i}")
+    assert [c.pages[0].visited for c in bm.contexts] == [["u0", "u1"], ["u2", "u3"], ["u4"]]
+    assert bm.contexts[0].kwargs == {"storage_path": "session.json"}
+    assert bm.contexts[1].kwargs == {"storage_state": bm.contexts[0].storage_state()}
+    assert [c.closed for c in bm.contexts] == [True, True, False]
+    assert page.recycles == 2 and bm.metrics.summary()["counters"]["pages_recycled"] == 2
+    # Everything else is forwarded to the current page
+    assert page.visited == ["u4"]
+
+
+def test_recycling_page_scope_keeps_the_context():
+    browser = load_browser_module()
+    bm = RecyclingManager()
+    page = browser.RecyclingPage(bm, max_navigations=1, scope="page")
+    page.goto("a")
+    page.goto("b")
+    (ctx,) = bm.contexts
+    assert [p.visited for p in ctx.pages] == [["a"], ["b"]]
+    assert ctx.pages[0].closed and not ctx.pages[1].closed
+
+
+def test_recycling_page_checks_the_heap(monkeypatch):
+    browser = load_browser_module()
+    monkeypatch.setattr(browser, "MEMORY_CHECK_EVERY", 2)
+    bm = RecyclingManager()
+    page = browser.RecyclingPage(bm, max_navigations=None, max_memory_mb=100)
+    page.page.heap = 50 * 1024 * 1024
+    for i in range(4):
+        page.goto(f"u{i}")
+    assert len(bm.contexts) == 1
+    page.page.heap = 150 * 1024 * 1024
+    page.goto("big")
+    assert len(bm.contexts) == 2 and page.visited == ["big"]
+
+
+def test_crashed_page_is_replaced_and_the_navigation_retried():
+    browser = load_browser_module()
+    bm = RecyclingManager()
+    page = browser.RecyclingPage(bm, max_navigations=None)
+    page.goto("a")
+    page.page.handlers["crash"](page.page)
+    page.goto("b")
+    page.page.crash_on_goto = True
+    assert page.goto("c") == "c"
+    assert [c.pages[0].visited for c in bm.contexts] == [["a"], ["b"], ["c"]]
+    assert page.crashes == 2 and bm.metrics.summary()["counters"]["page_crashes"] == 2
+
+    page.page.goto = lambda url, **kw: (_ for _ in ()).throw(ValueError("bad selector"))
+    with pytest.raises(ValueError):
+        page.goto("d")
+    assert len(bm.contexts) == 3
+
+
+class RoutedContext:
+    def __init__(self, kwargs):
+        self.kwargs = kwargs
+        self.routes = []
+        self.closed = False
+
+    def route(self, pattern, handler):
+        self.routes.append(("route", pattern))
+
+    def route_from_har(self, har, not_found="abort"):
+        self.routes.append(("har", har, not_found))
+
+    def close(self):
+        self.closed = True
+
+
+class RoutedBrowser:
+    def new_context(self, **kwargs):
+        return RoutedContext(kwargs)
+
+
+def test_record_har_numbers_later_contexts_and_saves_them_on_exit(fake_playwright, tmp_path):
+    browser, pw = fake_playwright
+    with browser.BrowserManager(record_har_path=tmp_path / "hars" / "run.har") as bm:
+        bm.browsers["chromium"] = RoutedBrowser()
+        first, second = bm.new_context(), bm.new_context()
+    assert first.kwargs["record_har_path"] == str(tmp_path / "hars" / "run.har")
+    assert second.kwargs["record_har_path"] == str(tmp_path / "hars" / "run-1.har")
+    assert first.closed and second.closed
+
+
+def test_route_from_har_replays_every_file_and_aborts_the_rest(fake_playwright, tmp_path):
+    browser, pw = fake_playwright
+    for name in ("run.har", "run-1.har"):
+        (tmp_path / name).write_text('{"log": {"entries": []}}')
+    with browser.BrowserManager(route_from_har=tmp_path / "run.har") as bm:
+        bm.browsers["chromium"] = RoutedBrowser()
+        ctx = bm.new_context()
+    assert ctx.routes == [
+        ("route", "**/*"),
+        ("har", str(tmp_path / "run.har"), "fallback"),
+        ("har", str(tmp_path / "run-1.har"), "fallback"),
+    ]
+    with pytest.raises(ValueError):
+        browser.BrowserManager(record_har_path="a.har", route_from_har="b.har")
@@ -0,0 +1,108 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from apparator import cli
+from apparator.utils.artifacts import ArtifactStore, digest
+from apparator.utils.state_store import SubmissionStore
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def index(tmp_path):
+    """A state database with one synced and one merely listed submission."""
+    artifacts = ArtifactStore(tmp_path / "problems")
+    entries = [
+        {"title": "Two Sum", "url": "https://hr/challenges/two-sum/submissions/code/1", "timestamp": ""},
+        {"title": "Bit Flip", "url": "https://hr/challenges/bit-flip/submissions/code/2", "timestamp": ""},
+    ]
+    with SubmissionStore(tmp_path / "state.db") as store:
+        store.record_listed(entries)
+        code = "print('two sum')\n"
+        artifacts.add_solution("two-sum", entries[0], code)
+        (artifacts.folder("two-sum") / "statement.pdf").write_bytes(b"%PDF")
+        store.mark_fetched(
+            entries[0]["url"], folder=str(artifacts.folder("two-sum")),
+            challenge="two-sum", digest=digest(code.encode()),
+        )
+        store.mark_committed(entries[0]["url"])
+    return tmp_path / "state.db"
+
+
+def test_list_reads_the_local_index(index, capsys):
+    cli.main(["--state", str(index), "list"])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == [
+        "[0] Two Sum -> https://hr/challenges/two-sum/submissions/code/1 (committed)",
+        "[1] Bit Flip -> https://hr/challenges/bit-flip/submissions/code/2 (listed)",
+    ]
+
+
+def test_search_keeps_list_indices(index, capsys):
+    cli.main(["--state", str(index), "search", "FLIP"])
+    assert capsys.readouterr().out.startswith("[1] Bit Flip")
+
+
+def test_fetch_prints_the_synced_solution(index, capsys):
+    cli.main(["--state", str(index), "fetch", "0"])
+    out = capsys.readouterr().out
+    assert "print('two sum')" in out
+    assert "statement.pdf" in out
+
+
+def test_fetch_of_an_unsynced_entry_points_at_live(index, capsys):
+    with pytest.raises(SystemExit):
+        cli.main(["--state", str(index), "fetch", "1"])
+    assert "--live" in capsys.readouterr().err
+
+
+def test_offline_commands_do_not_import_playwright_or_dotenv(index):
+    code = (
+        "import sys; from apparator import cli; "
+        f"cli.main(['--state', {str(index)!r}, 'list']); "
+        "assert 'playwright' not in sys.modules and 'dotenv' not in sys.modules, sorted(sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Two Sum" in result.stdout
+
+
+def test_reextract_reports_empty_fields_and_records_listings(tmp_path, capsys):
+    from apparator.utils.snapshots import SnapshotArchive
+    from tests import playwright_stub
+
+    playwright_stub.install()
+    archive = SnapshotArchive(tmp_path / "snapshots")
+    archive.add("listing", "https://hr/submissions/all?page=1", (
+        '<table aria-label="Submissions Table"><tbody>'
+        '<tr><td><a href="/challenges/two-sum/submissions/code/1">Two Sum</a></td></tr>'
+        '<tr><td><a href="/challenges/new-one/submissions/code/3">New One</a></td></tr>'
+        "</tbody></table>"
+    ))
+    archive.add("submission", "https://hr/challenges/x/submissions/code/9", "<h1>X</h1>")
+    state = tmp_path / "state.db"
+    cli.main([
+        "--state", str(state), "reextract", "--snapshots", str(tmp_path / "snapshots"),
+        "--processes", "1", "--record", "--base-url", "https://hr",
+    ])
+    out = capsys.readouterr().out
+    assert "Re-extracted 2 snapshot(s)" in out and "1 with empty fields" in out
+    assert "submission https://hr/challenges/x/submissions/code/9: no statement, solution, pdf_href" in out
+    assert "2 new submission(s) recorded" in out
+
+
+def test_reextract_refuses_handlers_without_snapshot_support(tmp_path, monkeypatch, capsys):
+    from tests import playwright_stub
+
+    playwright_stub.install()
+    from apparator.handlers.hackerrank import HackerRankHandler
+
+    monkeypatch.setattr(HackerRankHandler, "supports_snapshots", False)
+    with pytest.raises(SystemExit):
+        cli.main(["reextract", "--snapshots", str(tmp_path / "snapshots")])
+    assert "cannot re-extract snapshots" in capsys.readouterr().err
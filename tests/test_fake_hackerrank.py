@@ -0,0 +1,59 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmarks.fake_hackerrank import FakeHackerRank
+from tests import playwright_stub
+
+
+def get(url, **headers):
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, dict(resp.headers), resp.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers), exc.read()
+
+
+@pytest.fixture
+def server():
+    with FakeHackerRank(submissions=45, challenges=4, page_size=20) as site:
+        yield site
+
+
+def test_listing_pages_and_api_agree(server):
+    playwright_stub.install()
+    from apparator.handlers.hackerrank import entry_from_api_model
+
+    _, _, page3 = get(f"{server.base_url}/submissions/all?page=3")
+    assert page3.count(b"<tr>") == 5
+    assert b"pagination-next disabled" in page3
+
+    status, _, _ = get(f"{server.base_url}/rest/contests/master/submissions/?offset=0&limit=100")
+    assert status == 401
+    cookie = {"Cookie": "hrsession=ok"}
+    _, _, body = get(f"{server.base_url}/rest/contests/master/submissions/?offset=40&limit=100", **cookie)
+    models = json.loads(body)["models"]
+    assert len(models) == 5
+    entry = entry_from_api_model(models[0], server.base_url)
+    status, _, html = get(entry["url"])
+    assert status == 200
+    assert b'class="editor-content"' in html and b'id="pdf-link"' in html
+
+
+def test_pdf_revalidation_and_request_counts(server):
+    status, headers, body = get(f"{server.base_url}/static/challenge-1.pdf")
+    assert status == 200 and body.startswith(b"%PDF")
+    status, _, body = get(f"{server.base_url}/static/challenge-1.pdf", **{"If-None-Match": headers["ETag"]})
+    assert (status, body) == (304, b"")
+    assert server.requests["pdf"] == 2
+    assert server.round_trips() == 2
+
+
+def test_throttling():
+    with FakeHackerRank(throttle_every=2) as site:
+        assert get(f"{site.base_url}/dashboard")[0] == 200
+        status, headers, _ = get(f"{site.base_url}/dashboard")
+        assert status == 429 and headers["Retry-After"] == "0"
@@ -0,0 +1,205 @@
+import threading
+
+import pytest
+
+from tests import playwright_stub
+
+
+def load_fetch_pool():
+    playwright_stub.install()
+    from apparator.core import fetch_pool
+    return fetch_pool
+
+
+class FakePage:
+    # URLs whose first visit crashes the renderer, shared by every page
+    crash_once = set()
+
+    def __init__(self, context):
+        self.context = context
+        self.crashed = False
+
+    def on(self, event, handler):
+        pass
+
+    def goto(self, url, **kwargs):
+        if self.crashed:
+            raise RuntimeError("Page.goto: Target closed")
+        if url in FakePage.crash_once:
+            FakePage.crash_once.discard(url)
+            self.crashed = True
+            raise RuntimeError("Page.goto: Target crashed")
+        return url
+
+    def close(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self, state=None):
+        self.state = state
+        self.pages = []
+
+    def storage_state(self):
+        return {"cookies": ["session"]}
+
+    def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    def close(self):
+        pass
+
+
+class FakeBrowserManager:
+    instances = []
+
+    def __init__(self, headless=True, engines=None, block_stats=None, metrics=None):
+        from apparator.core.metrics import Metrics
+
+        self.contexts = []
+        self.metrics = metrics or Metrics()
+        FakeBrowserManager.instances.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def new_context(self, engine="chromium", block=None, **kwargs):
+        ctx = FakeContext(kwargs.get("storage_state"))
+        self.contexts.append(ctx)
+        return ctx
+
+    def recycling_page(self, engine="chromium", block=None, **kwargs):
+        from apparator.core.browser import RecyclingPage
+
+        return RecyclingPage(self, engine, block=block, **kwargs)
+
+
+class FakeHandler:
+    def __init__(self, page, config):
+        self.page = page
+        self.config = config
+        self.fetched = []
+        self.threads = set()
+
+    def fetch_submission(self, entry, download_dir=""):
+        self.threads.add(threading.current_thread().name)
+        self.fetched.append((entry["url"], download_dir))
+        if entry["url"] == "bad":
+            raise RuntimeError("boom")
+        return {"solution": entry["url"].upper()}
+
+
+def make_entries(*urls):
+    return [{"url": u, "title": u} for u in urls]
+
+
+def test_sequential_uses_the_given_handler():
+    fetch_pool = load_fetch_pool()
+    hr = FakeHandler(FakeContext().new_page(), {})
+    results = list(fetch_pool.fetch_submissions(hr, make_entries("a", "bad", "c")))
+    assert [r.entry["url"] for r in results] == ["a", "bad", "c"]
+    assert [r.ok for r in results] == [True, False, True]
+    assert results[0].details == {"solution": "A"}
+    assert isinstance(results[1].error, RuntimeError)
+    assert [u for u, _ in hr.fetched] == ["a", "bad", "c"]
+
+
+def test_download_dir_is_resolved_per_entry():
+    fetch_pool = load_fetch_pool()
+    hr = FakeHandler(FakeContext().new_page(), {})
+    list(fetch_pool.fetch_submissions(
+        hr, make_entries("a"), download_dir=lambda e: f"out/{e['title']}"))
+    assert hr.fetched == [("a", "out/a")]
+
+
+@pytest.fixture
+def pooled(monkeypatch):
+    fetch_pool = load_fetch_pool()
+    FakeBrowserManager.instances = []
+    monkeypatch.setattr(fetch_pool, "BrowserManager", FakeBrowserManager)
+    return fetch_pool
+
+
+def test_concurrent_workers_share_session_and_isolate_failures(pooled):
+    hr = FakeHandler(FakeContext().new_page(), {"HR_USER": "me"})
+    workers = []
+
+    def factory(page):
+        h = FakeHandler(page, hr.config)
+        workers.append(h)
+        return h
+
+    entries = make_entries(*[f"u{i}" for i in range(10)], "bad")
+    results = list(pooled.fetch_submissions(
+        hr, entries, concurrency=3, handler_factory=factory))
+
+    assert sorted(r.entry["url"] for r in results) == sorted(e["url"] for e in entries)
+    failed = [r for r in results if not r.ok]
+    assert [r.entry["url"] for r in failed] == ["bad"]
+    assert len(FakeBrowserManager.instances) == 3
+    for bm in FakeBrowserManager.instances:
+        assert bm.contexts[0].state == {"cookies": ["session"]}
+    assert hr.fetched == []
+    assert sum(len(w.fetched) for w in workers) == len(entries)
+
+
+def test_entries_are_failed_when_no_worker_starts(pooled, monkeypatch):
+    class BrokenManager(FakeBrowserManager):
+        def __enter__(self):
+            raise RuntimeError("cannot launch")
+
+    monkeypatch.setattr(pooled, "BrowserManager", BrokenManager)
+    hr = FakeHandler(FakeContext().new_page(), {})
+    results = list(pooled.fetch_submissions(hr, make_entries("a", "b"), concurrency=2))
+    assert sorted(r.entry["url"] for r in results) == ["a", "b"]
+    assert not any(r.ok for r in results)
+
+
+class WorkerDied(BaseException):
+    """Escapes the per-entry error handling and takes its worker down."""
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_entries_held_by_dead_workers_do_not_break_the_batch(pooled):
+    class DyingHandler(FakeHandler):
+        def fetch_submission(self, entry, download_dir=""):
+            raise WorkerDied()
+
+    hr = FakeHandler(FakeContext().new_page(), {})
+    results = list(pooled.fetch_submissions(
+        hr, make_entries("a", "b", "c"), concurrency=2,
+        handler_factory=lambda page: DyingHandler(page, hr.config),
+    ))
+    # Each worker died holding one entry; only the one left queued is reported
+    assert [(r.entry["url"], r.ok) for r in results] == [("c", False)]
+
+
+class NavigatingHandler(FakeHandler):
+    def fetch_submission(self, entry, download_dir=""):
+        self.page.goto(entry["url"])
+        return super().fetch_submission(entry, download_dir)
+
+
+def test_crashed_worker_page_is_replaced_mid_batch(pooled):
+    hr = NavigatingHandler(FakeContext().new_page(), {})
+    FakePage.crash_once = {"u3"}
+    entries = make_entries(*[f"u{i}" for i in range(8)])
+    results = list(pooled.fetch_submissions(
+        hr, entries, concurrency=2, recycle_after=3,
+        handler_factory=lambda page: NavigatingHandler(page, hr.config),
+    ))
+    assert sorted(r.entry["url"] for r in results if r.ok) == [e["url"] for e in entries]
+    counters = {}
+    for bm in FakeBrowserManager.instances:
+        for name, value in bm.metrics.summary()["counters"].items():
+            counters[name] = counters.get(name, 0) + value
+        # Recycled contexts start from the worker's session, not a blank one
+        assert all(ctx.state for ctx in bm.contexts)
+    assert counters["page_crashes"] == 1
+    # The crash, plus at least one worker passing 3 navigations
+    assert counters["pages_recycled"] >= 2
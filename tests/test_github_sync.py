@@ -0,0 +1,162 @@
+import subprocess
+
+import pytest
+
+from apparator.utils.github_sync import (
+    BackgroundPusher,
+    BatchCommitError,
+    BatchCommitter,
+    push,
+    push_with_retry,
+)
+from tests.conftest import git
+
+
+def write(repo, rel, text):
+    path = repo / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path.parent
+
+
+def subjects(repo):
+    return git(repo, "log", "--format=%s").splitlines()
+
+
+def test_one_commit_per_entry_in_a_single_batch(repo):
+    committer = BatchCommitter(repo)
+    a = write(repo, "problems/A/solution.txt", "a")
+    assert committer.add([a], "Add A", key="a") == []
+    b = write(repo, "problems/B B/solution.txt", "b")
+    committer.add([b], "Add B B", key="b")
+    assert committer.flush() == ["a", "b"]
+
+    assert subjects(repo) == ["Add B B", "Add A"]
+    assert git(repo, "show", "HEAD:problems/B B/solution.txt") == "b"
+    # The index follows the new commits, so nothing shows as changed
+    assert git(repo, "status", "--porcelain") == ""
+
+
+def test_flush_leaves_unrelated_staged_changes_alone(repo):
+    write(repo, "README", "hi")
+    git(repo, "add", "README")
+    git(repo, "commit", "-q", "-m", "Initial")
+    write(repo, "README", "edited")
+    write(repo, "notes.txt", "draft")
+    git(repo, "add", "README", "notes.txt")
+
+    committer = BatchCommitter(repo)
+    committer.add([write(repo, "problems/A/solution.txt", "a")], "Add A")
+    committer.flush()
+
+    assert git(repo, "show", "--name-only", "--format=", "HEAD").split() == ["problems/A/solution.txt"]
+    assert git(repo, "diff", "--cached", "--name-only").split() == ["README", "notes.txt"]
+    assert git(repo, "status", "--porcelain", "--", "problems") == ""
+
+
+def test_batches_are_written_every_n_entries_on_top_of_history(repo):
+    write(repo, "README", "hi")
+    git(repo, "add", "README")
+    git(repo, "commit", "-q", "-m", "Initial")
+
+    committer = BatchCommitter(repo, batch_size=2)
+    written = []
+    for name in "abc":
+        folder = write(repo, f"problems/{name}/solution.txt", name)
+        written.append(committer.add([folder], f"Add {name}", key=name))
+    assert written == [[], ["a", "b"], []]
+    assert len(committer) == 1
+    committer.flush()
+    assert subjects(repo) == ["Add c", "Add b", "Add a", "Initial"]
+
+
+def test_squash_lists_entry_messages(repo):
+    committer = BatchCommitter(repo, squash=True)
+    for name in "ab":
+        committer.add([write(repo, f"problems/{name}/solution.txt", name)], f"Add {name}")
+    committer.flush()
+    assert subjects(repo) == ["Add 2 submissions"]
+    assert "- Add a\n- Add b" in git(repo, "log", "-1", "--format=%b")
+
+
+def test_unchanged_content_makes_no_commit(repo):
+    folder = write(repo, "problems/a/solution.txt", "a")
+    with BatchCommitter(repo) as committer:
+        committer.add([folder], "Add a")
+    with BatchCommitter(repo) as committer:
+        committer.add([folder], "Add a again")
+        committer.add([folder], "Add a a third time")
+    assert subjects(repo) == ["Add a"]
+
+
+def test_failed_batch_reports_its_keys(tmp_path):
+    not_a_repo = tmp_path / "plain"
+    folder = write(not_a_repo, "problems/a/solution.txt", "a")
+    committer = BatchCommitter(not_a_repo)
+    committer.add([folder], "Add a", key="a")
+    with pytest.raises(BatchCommitError) as info:
+        committer.flush()
+    assert info.value.keys == ["a"]
+
+
+@pytest.fixture
+def remote(tmp_path, repo):
+    bare = tmp_path / "remote.git"
+    subprocess.run(["git", "init", "-q", "--bare", str(bare)], check=True)
+    git(repo, "remote", "add", "origin", str(bare))
+    return bare
+
+
+def commit(repo, name):
+    folder = write(repo, f"problems/{name}/solution.txt", name)
+    with BatchCommitter(repo) as committer:
+        committer.add([folder], f"Add {name}")
+
+
+def test_push_with_token_to_bare_repository(repo, remote):
+    commit(repo, "a")
+    push(repo, token="secret-token")
+    assert git(remote, "log", "--format=%s", "--all").splitlines() == ["Add a"]
+
+
+def test_push_with_retry_backs_off_then_raises(repo):
+    git(repo, "remote", "add", "origin", str(repo.parent / "missing.git"))
+    commit(repo, "a")
+    delays = []
+    with pytest.raises(RuntimeError):
+        push_with_retry(repo, retries=2, backoff=1.0, sleep=delays.append)
+    assert len(delays) == 2
+    assert 0.5 <= delays[0] <= 1.5
+    assert 1.0 <= delays[1] <= 3.0
+
+
+def test_background_pusher_pushes_once_on_stop(repo, remote):
+    pusher = BackgroundPusher(repo).start()
+    commit(repo, "a")
+    pusher.request()
+    commit(repo, "b")
+    pusher.request()
+    assert pusher.stop() is None
+    assert pusher.pushes == 1
+    assert git(remote, "log", "--format=%s", "--all").splitlines() == ["Add b", "Add a"]
+
+
+def test_background_pusher_skips_push_without_request(repo, remote):
+    commit(repo, "a")
+    with BackgroundPusher(repo, interval=0.01) as pusher:
+        pass
+    assert pusher.pushes == 0
+    assert git(remote, "log", "--all", "--format=%s") == ""
+
+
+def test_background_pusher_pushes_on_interval(repo, remote):
+    import time
+
+    commit(repo, "a")
+    with BackgroundPusher(repo, interval=0.01) as pusher:
+        pusher.request()
+        deadline = time.time() + 5
+        while pusher.pushes == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert pusher.pushes == 1
+    assert git(remote, "log", "--format=%s", "--all").splitlines() == ["Add a"]
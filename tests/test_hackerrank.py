@@ -1,20 +1,12 @@
-import importlib.util
-import sys
 import types
 import re
 
+from tests import playwright_stub
+
 
 def load_handler():
     """Import HackerRankHandler with a minimal Playwright stub if needed."""
-    try:
-        spec = importlib.util.find_spec("playwright")
-    except ValueError:
-        spec = None
-    if spec is None and "playwright" not in sys.modules:
-        sync_api = types.ModuleType("playwright.sync_api")
-        sync_api.Page = object
-        sys.modules.setdefault("playwright", types.ModuleType("playwright"))
-        sys.modules["playwright.sync_api"] = sync_api
+    playwright_stub.install()
     from apparator.handlers.hackerrank import HackerRankHandler
     return HackerRankHandler
 
@@ -39,40 +31,30 @@ class DummyElement:
         return None
 
 
-class DummyRow:
-    def __init__(self, n):
-        self._a = DummyElement(text=f"title-{n}", href=f"/url-{n}")
-        self._time = DummyElement(text=f"time-{n}")
-
-    def query_selector(self, selector):
-        if selector == "a":
-            return self._a
-        if selector in ("td[aria-label*='Time'], td.submission-time"):
-            return self._time
-        return None
-
-
 class DummyPage:
-    def __init__(self):
+    """Listing page answering LISTING_SCRIPT with one row per page."""
+
+    def __init__(self, pages=2):
+        self.pages = pages
         self.current_page = 0
         self.gotos = []
+        self.evaluations = 0
 
     def goto(self, url, wait_until=None, timeout=None):
         m = re.search(r"page=(\d+)", url)
         self.current_page = int(m.group(1)) if m else 1
         self.gotos.append(self.current_page)
 
-    def query_selector_all(self, selector):
-        if self.current_page > 2:
-            return []
-        return [DummyRow(self.current_page)]
-
-    def query_selector(self, selector):
-        if selector == "li.pagination-next:not(.disabled) a":
-            if self.current_page < 2:
-                return DummyElement()
-            return None
-        return None
+    def evaluate(self, script, arg=None):
+        self.evaluations += 1
+        n = self.current_page
+        if n > self.pages:
+            return {"count": 0, "rows": [], "hasNext": False}
+        return {
+            "count": 1,
+            "rows": [{"href": f"/url-{n}", "title": f"title-{n}", "timestamp": f"time-{n}"}],
+            "hasNext": n < self.pages,
+        }
 
 
 def test_list_submissions_pagination():
@@ -84,6 +66,19 @@ def test_list_submissions_pagination():
     assert page.gotos == [1, 2]
 
 
+def test_list_submissions_one_round_trip_per_page():
+    HackerRankHandler = load_handler()
+    page = DummyPage(pages=3)
+    hr = HackerRankHandler(page, {})
+    results = hr.list_submissions()
+    assert results[2] == {
+        "title": "title-3",
+        "url": "https://www.hackerrank.com/url-3",
+        "timestamp": "time-3",
+    }
+    assert page.evaluations == 3
+
+
 def test_list_submissions_absolute_urls():
     HackerRankHandler = load_handler()
     page = DummyPage()
@@ -92,6 +87,180 @@ def test_list_submissions_absolute_urls():
     assert results[0]["url"].startswith("https://www.hackerrank.com/")
 
 
+def test_iter_submissions_is_lazy():
+    HackerRankHandler = load_handler()
+    page = DummyPage(pages=5)
+    hr = HackerRankHandler(page, {})
+    first = next(hr.iter_submissions())
+    assert first["title"] == "title-1"
+    assert page.gotos == [1]
+
+
+def test_iter_submissions_stops_at_known_run():
+    HackerRankHandler = load_handler()
+    page = DummyPage(pages=10)
+    hr = HackerRankHandler(page, {})
+    base = "https://www.hackerrank.com/url-"
+    known = {base + str(n) for n in range(3, 11)}
+    new = list(hr.iter_submissions(known=known, known_run=2))
+    assert [e["title"] for e in new] == ["title-1", "title-2"]
+    assert page.gotos == [1, 2, 3, 4]
+
+
+def test_iter_submissions_without_early_stop_filters_known():
+    HackerRankHandler = load_handler()
+    page = DummyPage(pages=4)
+    hr = HackerRankHandler(page, {})
+    known = {"https://www.hackerrank.com/url-2", "https://www.hackerrank.com/url-3"}
+    new = list(hr.iter_submissions(known=known, known_run=None))
+    assert [e["title"] for e in new] == ["title-1", "title-4"]
+    assert page.gotos == [1, 2, 3, 4]
+
+
+class DummyApiResponse:
+    def __init__(self, payload=None, status=200):
+        self._payload = payload
+        self.status = status
+        self.ok = status == 200
+
+    def json(self):
+        return self._payload
+
+
+class DummyApiPage(DummyPage):
+    """Listing page whose context serves the submissions REST endpoint."""
+
+    def __init__(self, total=5, status=200, pages=2):
+        super().__init__(pages=pages)
+        self.total = total
+        self.status = status
+        self.api_urls = []
+        self.context = types.SimpleNamespace(
+            request=types.SimpleNamespace(get=self.request_get))
+
+    def request_get(self, url, timeout=None):
+        self.api_urls.append(url)
+        offset = int(re.search(r"offset=(\d+)", url).group(1))
+        limit = int(re.search(r"limit=(\d+)", url).group(1))
+        models = [
+            {
+                "id": 100 + i,
+                "challenge": {"name": f"Challenge {i}", "slug": f"challenge-{i}"},
+                "created_at": f"2024-01-{i + 1:02d}",
+            }
+            for i in range(offset, min(offset + limit, self.total))
+        ]
+        return DummyApiResponse({"models": models, "total": self.total}, self.status)
+
+
+def test_list_submissions_uses_api_without_navigation():
+    HackerRankHandler = load_handler()
+    page = DummyApiPage(total=5)
+    hr = HackerRankHandler(page, {})
+    hr.api_page_size = 2
+    results = hr.list_submissions()
+    assert page.gotos == []
+    assert len(page.api_urls) == 3
+    assert results[0] == {
+        "title": "Challenge 0",
+        "url": "https://www.hackerrank.com/challenges/challenge-0/submissions/code/100",
+        "timestamp": "2024-01-01",
+    }
+    assert len(results) == 5
+
+
+def test_list_submissions_falls_back_to_dom_when_api_fails():
+    HackerRankHandler = load_handler()
+    page = DummyApiPage(status=403)
+    hr = HackerRankHandler(page, {})
+    results = hr.list_submissions()
+    assert len(page.api_urls) == 1
+    assert page.gotos == [1, 2]
+    assert [r["title"] for r in results] == ["title-1", "title-2"]
+
+
+def test_newest_submission_requests_a_single_row():
+    HackerRankHandler = load_handler()
+    page = DummyApiPage(total=5)
+    newest = HackerRankHandler(page, {}).newest_submission()
+    assert page.api_urls == [
+        "https://www.hackerrank.com/rest/contests/master/submissions/?offset=0&limit=1"
+    ]
+    assert newest["title"] == "Challenge 0"
+    assert page.gotos == []
+
+
+def test_newest_submission_reports_an_expired_session():
+    HackerRankHandler = load_handler()
+    from apparator.core.handler_base import SessionExpired
+    import pytest
+
+    with pytest.raises(SessionExpired):
+        HackerRankHandler(DummyApiPage(status=401), {}).newest_submission()
+
+
+def test_newest_submission_falls_back_to_the_first_table_page():
+    HackerRankHandler = load_handler()
+    page = DummyApiPage(status=404)
+    newest = HackerRankHandler(page, {}).newest_submission()
+    assert newest["title"] == "title-1"
+    assert page.gotos == [1]
+
+
+class DummySessionContext:
+    def __init__(self, payload=None, status=200):
+        self.payload = payload
+        self.status = status
+        self.saved = []
+        self.request = types.SimpleNamespace(get=self.request_get)
+
+    def request_get(self, url, timeout=None):
+        return DummyApiResponse(self.payload, self.status)
+
+    def storage_state(self, path=None):
+        self.saved.append(path)
+
+
+class DummyLoginPage:
+    def __init__(self, context):
+        self.context = context
+        self.gotos = []
+
+    def goto(self, url, wait_until=None, timeout=None):
+        self.gotos.append(url)
+
+    def fill(self, selector, value):
+        pass
+
+    def click(self, selector):
+        pass
+
+    def wait_for_url(self, url, timeout=None):
+        pass
+
+
+def test_ensure_login_reuses_valid_session(tmp_path):
+    HackerRankHandler = load_handler()
+    ctx = DummySessionContext({"model": {"username": "me"}})
+    page = DummyLoginPage(ctx)
+    hr = HackerRankHandler(page, {"HR_USER": "me", "HR_PASS": "pw"})
+    assert hr.ensure_login(tmp_path / "state.json") is False
+    assert page.gotos == []
+    assert ctx.saved == []
+
+
+def test_ensure_login_logs_in_and_saves_expired_session(tmp_path):
+    HackerRankHandler = load_handler()
+    ctx = DummySessionContext(status=401)
+    page = DummyLoginPage(ctx)
+    hr = HackerRankHandler(page, {"HR_USER": "me", "HR_PASS": "pw"})
+    state = tmp_path / "nested" / "state.json"
+    assert hr.ensure_login(state) is True
+    assert page.gotos == ["https://www.hackerrank.com/auth/login"]
+    assert ctx.saved == [str(state)]
+    assert state.parent.is_dir()
+
+
 class DummyDownload:
     def __init__(self):
         self.saved_to = None
@@ -121,7 +290,7 @@ class DummyFetchPage:
         self.context = types.SimpleNamespace(request=types.SimpleNamespace(get=self.request_get))
         self.pdf_href = pdf_href
 
-    def request_get(self, url):
+    def request_get(self, url, **kwargs):
         self.requests.append(url)
         return DummyResponse()
 
@@ -131,6 +300,28 @@ class DummyFetchPage:
     def query_selector(self, selector):
         return self.selectors.get(selector)
 
+    def evaluate(self, script, sel):
+        """Mimic SUBMISSION_SCRIPT against the ``selectors`` mapping."""
+        def first(selectors):
+            for s in selectors:
+                if s in self.selectors:
+                    return self.selectors[s]
+            return None
+
+        title = first(sel["title"])
+        statement = first(sel["statement"])
+        code = self.selectors.get(sel["code"])
+        pdf = self.selectors.get(sel["pdf"])
+        return {
+            "title": title.inner_text().strip() if title else None,
+            "statement": statement.inner_text() if statement else None,
+            "code": code.inner_text() if code else None,
+            "pdfHref": pdf.get_attribute("href") if pdf else None,
+        }
+
+    def input_value(self, selector):
+        return self.selectors[selector].inner_text()
+
     def get_attribute(self, selector, name):
         el = self.selectors.get(selector)
         return el.get_attribute(name) if el else None
@@ -183,6 +374,19 @@ def test_fetch_submission_no_download():
     assert page.goto_urls == ["https://example.com"]
 
 
+def test_fetch_submission_falls_back_to_textarea_and_h1():
+    HackerRankHandler = load_handler()
+    page = DummyFetchPage()
+    page.selectors["h1"] = DummyElement(" Heading ")
+    page.selectors["textarea.inputarea"] = DummyElement("code")
+    hr = HackerRankHandler(page, {})
+    result = hr.fetch_submission({"url": "https://example.com"})
+    assert result["title"] == "Heading"
+    assert result["statement"] == ""
+    assert result["solution"] == "code"
+    assert page.waited == ["textarea.inputarea"]
+
+
 def test_fetch_submission_download_pdf(tmp_path):
     HackerRankHandler = load_handler()
     page = make_fetch_page()
@@ -208,3 +412,114 @@ def test_fetch_submission_download_fallback(tmp_path):
     assert page.requests == [href]
     assert page.clicked == ["#pdf-link"]
 
+
+def test_challenge_key_uses_slug_from_url():
+    HackerRankHandler = load_handler()
+    hr = HackerRankHandler(DummyPage(), {})
+    url = "https://www.hackerrank.com/contests/c1/challenges/two-sum/submissions/code/7"
+    assert hr.challenge_key({"title": "Two Sum", "url": url}) == "two-sum"
+    assert hr.challenge_key({"title": "Two Sum", "url": "https://x/other"}) == "Two_Sum"
+
+
+class DummyCachedResponse:
+    def __init__(self, status, content=b"", headers=None):
+        self.status = status
+        self.ok = 200 <= status < 300
+        self.headers = headers or {}
+        self._content = content
+
+    def body(self):
+        return self._content
+
+
+def test_fetch_submission_uses_pdf_cache(tmp_path):
+    from apparator.utils.pdf_cache import PdfCache
+
+    HackerRankHandler = load_handler()
+    cache = PdfCache(tmp_path / "cache", max_age=0)
+    url = "https://www.hackerrank.com/challenges/two-sum/submissions/code/1"
+    sent = []
+
+    def request_get(target, headers=None, **kwargs):
+        sent.append(headers)
+        if headers:
+            return DummyCachedResponse(304)
+        return DummyCachedResponse(200, b"%PDF", {"ETag": '"v1"'})
+
+    # First fetch misses and stores the download with its ETag
+    page = make_fetch_page(fail_download=True)
+    page.context.request.get = request_get
+    hr = HackerRankHandler(page, {"PDF_CACHE": cache})
+    first = tmp_path / "first"
+    first.mkdir()
+    hr.fetch_submission({"url": url}, download_dir=str(first))
+    assert (first / "Challenge.pdf").read_bytes() == b"%PDF"
+
+    # A later fetch of the same challenge only revalidates
+    page = make_fetch_page()
+    page.context.request.get = request_get
+    hr = HackerRankHandler(page, {"PDF_CACHE": cache})
+    second = tmp_path / "second"
+    second.mkdir()
+    result = hr.fetch_submission({"url": url}, download_dir=str(second))
+    assert result["pdf"] == str(second / "Challenge.pdf")
+    assert (second / "Challenge.pdf").read_bytes() == b"%PDF"
+    assert sent[-1] == {"If-None-Match": '"v1"'}
+    assert page.clicked == [] and page.waited == []
+    assert (cache.stats.misses, cache.stats.revalidated) == (1, 1)
+
+
+def test_failed_pdf_revalidation_falls_back_to_a_download(tmp_path):
+    from apparator.core.har import HarMiss
+    from apparator.utils.pdf_cache import PdfCache
+
+    HackerRankHandler = load_handler()
+    cache = PdfCache(tmp_path / "cache", max_age=0)
+    url = "https://www.hackerrank.com/challenges/two-sum/submissions/code/1"
+    source = tmp_path / "old.pdf"
+    source.write_bytes(b"%PDF old")
+    cache.put("two-sum", str(source), "https://www.hackerrank.com/x.pdf", {"ETag": '"v1"'})
+
+    def request_get(target, headers=None, **kwargs):
+        raise HarMiss(f"GET {target} is not in the HAR recording")
+
+    page = make_fetch_page()
+    page.context.request.get = request_get
+    page.download.save_as = lambda path: open(path, "wb").write(b"%PDF new")
+    hr = HackerRankHandler(page, {"PDF_CACHE": cache})
+    result = hr.fetch_submission({"url": url}, download_dir=str(tmp_path))
+    assert (tmp_path / "Challenge.pdf").read_bytes() == b"%PDF new"
+    assert result["pdf"] == str(tmp_path / "Challenge.pdf")
+    assert page.clicked == ["#pdf-link"]
+
+
+def test_navigation_goes_through_rate_limiter(monkeypatch):
+    from apparator.core import rate_limit
+
+    HackerRankHandler = load_handler()
+    monkeypatch.setattr(rate_limit.time, "sleep", lambda seconds: None)
+    page = make_fetch_page()
+    replies = [types.SimpleNamespace(status=429, headers={}), None]
+
+    def goto(url, wait_until=None, timeout=None):
+        page.goto_urls.append((url, timeout))
+        return replies.pop(0)
+
+    page.goto = goto
+    limiter = rate_limit.RateLimiter(rate=4.0)
+    hr = HackerRankHandler(page, {
+        "RATE_LIMITER": limiter,
+        "RETRY_POLICY": rate_limit.RetryPolicy(timeout=5000),
+    })
+    hr.fetch_submission({"url": "https://www.hackerrank.com/challenges/x/submissions/code/1"})
+    assert [t for _, t in page.goto_urls] == [5000, 5000]
+    assert limiter.rates()["www.hackerrank.com"] < 4.0
+
+
+def test_base_url_override_rebases_every_url():
+    HackerRankHandler = load_handler()
+    page = DummyApiPage(total=1)
+    hr = HackerRankHandler(page, {"HR_BASE_URL": "http://127.0.0.1:8000/"})
+    results = hr.list_submissions()
+    assert page.api_urls[0].startswith("http://127.0.0.1:8000/rest/contests/master/submissions/")
+    assert results[0]["url"] == "http://127.0.0.1:8000/challenges/challenge-0/submissions/code/100"
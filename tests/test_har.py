@@ -0,0 +1,71 @@
+import base64
+import json
+import zipfile
+
+import pytest
+
+from apparator.core.har import HarMiss, HarReplay, har_files
+from tests import playwright_stub
+
+
+def entry(url, status=200, text="", method="GET", encoding=None, **content):
+    body = {"mimeType": "application/json", "text": text, **content}
+    if encoding:
+        body["encoding"] = encoding
+    return {
+        "request": {"method": method, "url": url, "headers": []},
+        "response": {
+            "status": status,
+            "headers": [{"name": "Content-Type", "value": "application/json"}],
+            "content": body,
+        },
+    }
+
+
+def write_har(path, *entries):
+    path.write_text(json.dumps({"log": {"version": "1.2", "entries": list(entries)}}))
+    return path
+
+
+def test_replay_serves_recorded_responses_in_order(tmp_path):
+    write_har(
+        tmp_path / "run.har",
+        entry("https://hr/me", 401),
+        entry("https://hr/me", 200, '{"model": {"username": "bench"}}'),
+        entry("https://hr/aborted", 0),
+    )
+    write_har(
+        tmp_path / "run-1.har",
+        entry("https://hr/s.pdf", text=base64.b64encode(b"%PDF-1.4").decode(), encoding="base64"),
+    )
+    replay = HarReplay.from_recording(tmp_path / "run.har")
+    assert [r.status for r in (replay.get("https://hr/me") for _ in range(3))] == [401, 200, 200]
+    assert replay.get("https://hr/me").json()["model"]["username"] == "bench"
+    assert replay.get("https://hr/s.pdf").body() == b"%PDF-1.4"
+    assert replay.get("https://hr/s.pdf").headers["content-type"] == "application/json"
+    with pytest.raises(HarMiss):
+        replay.get("https://hr/aborted")
+    assert str(replay) == "6 replayed, 1 missing"
+    assert replay.origins() == ["https://hr"]
+
+
+def test_replay_reads_zip_recordings_with_attached_bodies(tmp_path):
+    path = tmp_path / "run.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("har.har", json.dumps({"log": {"entries": [
+            entry("https://hr/page", _file="abc.html"),
+        ]}}))
+        zf.writestr("abc.html", "<h1>hi</h1>")
+    assert HarReplay(har_files(path)).get("https://hr/page#top").text() == "<h1>hi</h1>"
+    with pytest.raises(FileNotFoundError):
+        har_files(tmp_path / "missing.har")
+
+
+def test_handler_requests_are_served_from_the_replay(tmp_path):
+    playwright_stub.install()
+    from apparator.handlers.hackerrank import PROFILE_API_URL, HackerRankHandler
+
+    write_har(tmp_path / "run.har", entry(PROFILE_API_URL, text='{"model": {"username": "bench"}}'))
+    handler = HackerRankHandler(None, {"HAR_REPLAY": HarReplay.from_recording(tmp_path / "run.har")})
+    assert handler.is_logged_in()
+    assert handler.http_get(None, PROFILE_API_URL).ok
@@ -0,0 +1,55 @@
+import pytest
+
+from apparator.utils.html_dom import parse_html
+
+PAGE = """<!doctype html><html><head><title>T</title><script>var x = "<p>";</script></head>
+<body><div id="main" class="wrap box">
+  <ul><li class="pagination-next disabled"><a href="/2">Next</a><li class="item"><a>Other</a></ul>
+  <table aria-label="Submissions Table"><tbody>
+    <tr><td><a href="/a">Two   Sum</a></td><td class="submission-time">1 day</td>
+    <tr><td><a href="/b">Bit Flip</a></td><td aria-label="Time ago">2 days</td>
+  </tbody></table>
+  <div class="statement"><p>First  line.</p><p>Second<br>line</p></div>
+  <pre class="code">
+int main() {
+    return 0;
+}
+</pre>
+  <input name="q" value="v"><textarea class="inputarea">typed</textarea>
+</div></body></html>"""
+
+
+@pytest.fixture
+def doc():
+    return parse_html(PAGE)
+
+
+def test_selectors_match_like_query_selector(doc):
+    rows = doc.select("table[aria-label='Submissions Table'] tbody tr")
+    assert [r.select_one("a").get("href") for r in rows] == ["/a", "/b"]
+    assert [r.select_one("td[aria-label*='Time'], td.submission-time").inner_text() for r in rows] == [
+        "1 day", "2 days",
+    ]
+    assert doc.select_one("li.pagination-next:not(.disabled) a") is None
+    assert doc.select_one("li:not(.disabled) a").inner_text() == "Other"
+    assert [el.tag for el in doc.select("#main > ul > li:first-child, textarea.inputarea")] == [
+        "li", "textarea",
+    ]
+    assert doc.select_one("div[class~=box]").get("id") == "main"
+    assert doc.select("body > table") == []
+    assert doc.select_one("input[name=q]").get("value") == "v"
+
+
+def test_inner_text_approximates_the_browser(doc):
+    assert doc.select_one("tr a").inner_text() == "Two Sum"
+    assert doc.select_one(".statement").inner_text() == "First line.\nSecond\nline"
+    assert doc.select_one(".code").inner_text() == "int main() {\n    return 0;\n}\n"
+    assert "var x" not in doc.inner_text()
+    assert doc.select_one(".inputarea").text_content() == "typed"
+
+
+def test_unsupported_selectors_are_rejected(doc):
+    with pytest.raises(ValueError):
+        doc.select("li + li")
+    with pytest.raises(ValueError):
+        doc.select("a:hover")
@@ -0,0 +1,158 @@
+import gzip
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from apparator.core.http_session import HttpSession
+from benchmarks.fake_hackerrank import FakeHackerRank, SESSION_COOKIE
+from tests import playwright_stub
+
+
+def cookie(host="127.0.0.1", **extra):
+    return {"name": SESSION_COOKIE, "value": "ok", "domain": host, "path": "/", **extra}
+
+
+@pytest.fixture
+def server():
+    with FakeHackerRank(submissions=12, challenges=3, pdf_bytes=2048) as site:
+        yield site
+
+
+class _Echo(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        _Echo.connections.add(self.client_address)
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/gz")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = gzip.compress((self.headers.get("Cookie") or "").encode())
+        self.send_response(200)
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def echo():
+    _Echo.connections = set()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Echo)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_session_sends_matching_cookies_over_one_connection(echo):
+    session = HttpSession([
+        cookie(), cookie("other.example", name="foreign"), cookie(secure=True, name="secure"),
+    ])
+    with session:
+        first = session.get(f"{echo}/gz")
+        second = session.get(f"{echo}/redirect")
+    assert first.text() == f"{SESSION_COOKIE}=ok"
+    assert second.ok and second.url.endswith("/gz")
+    assert len(_Echo.connections) == 1
+
+
+def load_handler():
+    playwright_stub.install()
+    from apparator.handlers.hackerrank import HackerRankHandler
+    return HackerRankHandler
+
+
+def test_fetch_submission_http_reads_the_rest_model_and_pdf(server, tmp_path):
+    HackerRankHandler = load_handler()
+    handler = HackerRankHandler(None, {"HR_BASE_URL": server.base_url})
+    sub = server.submission(0)
+    entry = {"title": sub["name"], "url": server.base_url + server.submission_path(sub)}
+    with HttpSession([cookie()]) as session:
+        details = handler.fetch_submission_http(entry, session, download_dir=str(tmp_path))
+    assert details["solution"] == sub["code"]
+    assert open(details["pdf"], "rb").read() == server.pdf(sub["slug"])
+    assert server.requests["submission"] == 0
+
+
+def test_fetch_submission_http_reports_an_expired_session(server):
+    HackerRankHandler = load_handler()
+    from apparator.core.handler_base import SessionExpired
+
+    handler = HackerRankHandler(None, {"HR_BASE_URL": server.base_url})
+    sub = server.submission(0)
+    entry = {"title": sub["name"], "url": server.base_url + server.submission_path(sub)}
+    with HttpSession() as session, pytest.raises(SessionExpired):
+        handler.fetch_submission_http(entry, session)
+
+
+def test_fetch_submission_http_rejects_a_page_served_as_the_pdf(server, tmp_path):
+    HackerRankHandler = load_handler()
+    handler = HackerRankHandler(None, {"HR_BASE_URL": server.base_url})
+    http_get = handler.http_get
+
+    def login_page_for_pdfs(session, url, **kwargs):
+        resp = http_get(session, url, **kwargs)
+        if "/download_pdf" in url:
+            resp.body = lambda: b"<html>Log in</html>"
+        return resp
+
+    handler.http_get = login_page_for_pdfs
+    sub = server.submission(0)
+    entry = {"title": sub["name"], "url": server.base_url + server.submission_path(sub)}
+    with HttpSession([cookie()]) as session, pytest.raises(RuntimeError, match="not a PDF"):
+        handler.fetch_submission_http(entry, session, download_dir=str(tmp_path))
+
+
+class HalfHttpHandler:
+    """Odd-numbered entries fail over HTTP and must be rendered instead."""
+
+    def __init__(self):
+        self.page = None
+        self.config = {}
+        self.rendered = []
+        self.threads = set()
+
+    def fetch_submission_http(self, entry, session, download_dir=""):
+        self.threads.add(threading.current_thread().name)
+        if int(entry["url"][1:]) % 2:
+            raise RuntimeError("HTTP 500")
+        return {"solution": "http", "pdf": None, "dir": download_dir}
+
+    def fetch_submission(self, entry, download_dir=""):
+        self.rendered.append((entry["url"], download_dir))
+        return {"solution": "page", "pdf": None, "dir": download_dir}
+
+
+def test_fetch_submissions_http_falls_back_to_pages():
+    playwright_stub.install()
+    from apparator.core.fetch_pool import fetch_submissions_http
+
+    handler = HalfHttpHandler()
+    entries = [{"title": f"t{i}", "url": f"u{i}"} for i in range(6)]
+    claims = []
+
+    def download_dir(entry):
+        claims.append(entry["url"])
+        return f"dir-{entry['url']}"
+
+    results = list(fetch_submissions_http(
+        handler, entries, workers=3, download_dir=download_dir,
+        session=types.SimpleNamespace(),
+    ))
+    by_url = {r.entry["url"]: r.details for r in results}
+    assert {u: d["solution"] for u, d in by_url.items()} == {
+        "u0": "http", "u1": "page", "u2": "http", "u3": "page", "u4": "http", "u5": "page",
+    }
+    assert sorted(claims) == [e["url"] for e in entries]
+    assert sorted(handler.rendered) == [("u1", "dir-u1"), ("u3", "dir-u3"), ("u5", "dir-u5")]
+    assert all(name.startswith("http-fetch") for name in handler.threads)
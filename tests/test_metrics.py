@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from apparator.core.metrics import NULL_METRICS, Metrics
+from tests import playwright_stub
+
+
+def test_timers_counters_and_summary():
+    metrics = Metrics()
+    with metrics.timer("navigation"):
+        pass
+    with pytest.raises(RuntimeError):
+        with metrics.timer("navigation"):
+            raise RuntimeError("timeout")
+    metrics.count("bytes_downloaded", 100)
+    metrics.count("bytes_downloaded", 20)
+
+    summary = metrics.summary()
+    nav = summary["timers"]["navigation"]
+    assert (nav["count"], nav["errors"]) == (2, 1)
+    assert nav["total_s"] >= nav["max_s"] >= 0
+    assert summary["counters"] == {"bytes_downloaded": 120}
+
+    text = metrics.prometheus()
+    assert 'apparator_phase_seconds_count{phase="navigation"} 2' in text
+    assert 'apparator_phase_errors_total{phase="navigation"} 1' in text
+    assert "apparator_bytes_downloaded_total 120" in text
+
+
+def test_json_lines_log(tmp_path):
+    log = tmp_path / "events.jsonl"
+    metrics = Metrics(log=log)
+    with metrics.timer("login"):
+        pass
+    metrics.event("summary", **metrics.summary())
+    metrics.close()
+    events = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [e["event"] for e in events] == ["timer", "summary"]
+    assert events[0]["name"] == "login"
+
+
+def test_disabled_metrics_record_nothing():
+    assert NULL_METRICS.timer("a") is NULL_METRICS.timer("b")
+    with NULL_METRICS.timer("a"):
+        pass
+    NULL_METRICS.count("x")
+    assert NULL_METRICS.summary() == {"timers": {}, "counters": {}}
+
+
+def test_handler_phases_are_instrumented(tmp_path):
+    playwright_stub.install()
+    from apparator.handlers.hackerrank import HackerRankHandler
+    from tests.test_hackerrank import make_fetch_page
+
+    metrics = Metrics()
+    page = make_fetch_page(fail_download=True)
+    hr = HackerRankHandler(page, {"METRICS": metrics})
+    hr.fetch_submission({"url": "https://example.com"}, download_dir=str(tmp_path))
+
+    summary = metrics.summary()
+    assert set(summary["timers"]) >= {"navigation", "extract", "pdf", "request"}
+    assert summary["counters"]["bytes_downloaded"] == len(b"data")
+    assert summary["counters"]["submissions_fetched"] == 1
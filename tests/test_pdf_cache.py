@@ -0,0 +1,53 @@
+import time
+
+from apparator.utils.pdf_cache import PdfCache
+
+
+def cached(cache, tmp_path, key, data, **headers):
+    source = tmp_path / f"{key}-download.pdf"
+    source.write_bytes(data)
+    cache.put(key, source, f"https://x/{key}.pdf", headers)
+
+
+def test_fresh_hit_is_served_without_request(tmp_path):
+    cache = PdfCache(tmp_path / "cache")
+    cached(cache, tmp_path, "two-sum", b"pdf")
+    dest = tmp_path / "out.pdf"
+    assert cache.get("two-sum", dest)
+    assert dest.read_bytes() == b"pdf"
+    assert not cache.get("other", tmp_path / "other.pdf")
+    stats = cache.stats.as_dict()
+    assert (stats["hits"], stats["misses"], stats["bytes_saved"]) == (1, 1, 3)
+
+
+def test_stale_entry_is_revalidated(tmp_path):
+    cache = PdfCache(tmp_path / "cache", max_age=0)
+    cached(cache, tmp_path, "p", b"old", ETag='"v1"', **{"Last-Modified": "Mon"})
+    time.sleep(0.01)
+    dest = tmp_path / "out.pdf"
+    assert not cache.get("p", dest)
+    assert cache.validators("p") == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon"}
+
+    assert cache.update("p", dest, "https://x/p.pdf", 304, {})
+    assert dest.read_bytes() == b"old"
+    assert cache.update("p", dest, "https://x/p.pdf", 200, {"ETag": '"v2"'}, b"new")
+    assert dest.read_bytes() == b"new"
+    assert cache.validators("p") == {"If-None-Match": '"v2"'}
+    assert not cache.update("p", dest, "https://x/p.pdf", 500, {})
+    assert cache.stats.revalidated == 1
+
+
+def test_lru_eviction_and_persistence(tmp_path):
+    root = tmp_path / "cache"
+    cache = PdfCache(root, max_bytes=10)
+    cached(cache, tmp_path, "a", b"aaaa")
+    cached(cache, tmp_path, "b", b"bbbb")
+    cache.get("a", tmp_path / "a.pdf")
+    cached(cache, tmp_path, "c", b"cccc")
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.stats.evictions == 1
+    assert cache.total_bytes() == 8
+
+    reopened = PdfCache(root, max_bytes=10)
+    assert len(reopened) == 2
+    assert reopened.get("c", tmp_path / "c.pdf")
@@ -0,0 +1,95 @@
+import asyncio
+import types
+
+import pytest
+
+from apparator.core.rate_limit import (
+    RateLimiter,
+    RetryPolicy,
+    acall_with_retry,
+    call_with_retry,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def response(status, **headers):
+    return types.SimpleNamespace(status=status, headers=headers)
+
+
+def test_token_bucket_spaces_requests_per_host():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2.0, burst=2, clock=clock)
+    waits = [limiter.reserve("https://a.example/x") for _ in range(4)]
+    assert waits == [0.0, 0.0, 0.5, 1.0]
+    # Another host has its own bucket
+    assert limiter.reserve("https://b.example/") == 0.0
+
+
+def test_aimd_adjusts_rate():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=4.0, increase=0.5, decrease=0.5, min_rate=1.0, max_rate=5.0, clock=clock)
+    url = "https://a.example/"
+    limiter.success(url)
+    assert limiter.rates() == {"a.example": 4.5}
+    limiter.throttled(url)
+    limiter.throttled(url)  # same burst: only one decrease
+    assert limiter.rates() == {"a.example": 2.25}
+    clock.now += 2
+    limiter.throttled(url)
+    clock.now += 2
+    limiter.throttled(url)
+    assert limiter.rates() == {"a.example": 1.0}
+    for _ in range(20):
+        limiter.success(url)
+    assert limiter.rates() == {"a.example": 5.0}
+
+
+def test_retries_throttled_responses_and_timeouts():
+    replies = [TimeoutError("slow"), response(429, **{"retry-after": "7"}), response(200)]
+
+    def send():
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    delays = []
+    result = call_with_retry(
+        "https://a.example/", send, retry=RetryPolicy(backoff=1.0), sleep=delays.append
+    )
+    assert result.status == 200
+    assert 0.5 <= delays[0] <= 1.5
+    assert delays[1] == 7.0
+
+
+def test_gives_up_after_attempts():
+    policy = RetryPolicy(attempts=2)
+    assert call_with_retry("u", lambda: response(503), retry=policy, sleep=lambda s: None).status == 503
+    with pytest.raises(TimeoutError):
+        call_with_retry("u", lambda: (_ for _ in ()).throw(TimeoutError()), retry=policy, sleep=lambda s: None)
+    with pytest.raises(ValueError):
+        call_with_retry("u", lambda: (_ for _ in ()).throw(ValueError()), retry=policy, sleep=lambda s: None)
+
+
+def test_async_retry(monkeypatch):
+    async def no_sleep(seconds):
+        pass
+
+    monkeypatch.setattr(asyncio, "sleep", no_sleep)
+    replies = [response(502), response(200)]
+
+    async def send():
+        return replies.pop(0)
+
+    result = asyncio.run(acall_with_retry("u", send, RateLimiter()))
+    assert result.status == 200
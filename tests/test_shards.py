@@ -0,0 +1,162 @@
+import contextlib
+import multiprocessing
+import os
+import subprocess
+import time
+import types
+
+from tests import playwright_stub
+
+# Workers are forked so they inherit the Playwright stub
+FORK = multiprocessing.get_context("fork")
+
+
+def load_shards():
+    playwright_stub.install()
+    from apparator.core import shards
+    return shards
+
+
+class ShardHandler:
+    """
+    Picklable handler for worker processes. ``config["CRASH_ON"]`` names a
+    URL whose first fetch kills the worker (``CRASH_MARKER`` records that it
+    already happened), or every fetch with ``CRASH_ALWAYS``;
+    ``config["BROKEN"]`` names one that always fails.
+    """
+
+    def __init__(self, page, config):
+        self.page = page
+        self.config = config
+        self.metrics = config.get("METRICS")
+        self.limiter = config.get("RATE_LIMITER")
+
+    def challenge_key(self, entry):
+        return entry["title"].replace(" ", "_")
+
+    def fetch_submission(self, entry, download_dir=""):
+        if entry["url"] == self.config.get("CRASH_ON"):
+            marker = self.config.get("CRASH_MARKER")
+            if self.config.get("CRASH_ALWAYS") or not os.path.exists(marker):
+                open(marker, "w").close()
+                # Let the queue's feeder thread send the earlier results
+                time.sleep(0.2)
+                os._exit(1)
+        if entry["url"] == self.config.get("BROKEN"):
+            raise TimeoutError("page timed out")
+        if self.metrics is not None:
+            self.metrics.count("submissions_fetched")
+        return {
+            "title": entry["title"],
+            "solution": f"code {entry['url']} pid {os.getpid()}",
+            "pdf": None,
+            "download_dir": download_dir,
+        }
+
+
+def fake_page(options, block_stats, metrics):
+    block_stats.record("image", True)
+    return contextlib.nullcontext(types.SimpleNamespace(context=None))
+
+
+def entries(n):
+    return [{"title": f"Problem {i}", "url": f"u{i}", "timestamp": ""} for i in range(n)]
+
+
+def parent_handler(config=None):
+    return types.SimpleNamespace(page=None, config=dict(config or {}), metrics=None, limiter=None)
+
+
+def test_every_entry_is_fetched_once_across_processes():
+    shards = load_shards()
+    results = list(shards.fetch_sharded(
+        parent_handler(), entries(12), processes=3,
+        handler_class=ShardHandler, page_opener=fake_page, mp_context=FORK,
+        download_dir=lambda e: f"dir-{e['url']}",
+    ))
+    assert sorted(r.entry["url"] for r in results) == sorted(f"u{i}" for i in range(12))
+    assert all(r.ok for r in results)
+    assert {r.details["download_dir"] for r in results} == {f"dir-u{i}" for i in range(12)}
+    pids = {r.details["solution"].rsplit(" ", 1)[1] for r in results}
+    assert str(os.getpid()) not in pids
+    assert len(pids) > 1
+
+
+def test_errors_come_back_as_shard_errors():
+    shards = load_shards()
+    results = {r.entry["url"]: r for r in shards.fetch_sharded(
+        parent_handler({"BROKEN": "u1"}), entries(3), processes=2,
+        handler_class=ShardHandler, page_opener=fake_page, mp_context=FORK,
+    )}
+    assert isinstance(results["u1"].error, shards.ShardError)
+    assert "TimeoutError: page timed out" in str(results["u1"].error)
+    assert results["u0"].ok and results["u2"].ok
+
+
+def test_a_crashed_workers_shard_is_reassigned(tmp_path):
+    shards = load_shards()
+    config = {"CRASH_ON": "u4", "CRASH_MARKER": str(tmp_path / "crashed")}
+    results = list(shards.fetch_sharded(
+        parent_handler(config), entries(8), processes=2, shard_size=4,
+        handler_class=ShardHandler, page_opener=fake_page, mp_context=FORK,
+    ))
+    assert (tmp_path / "crashed").exists()
+    assert sorted(r.entry["url"] for r in results) == sorted(f"u{i}" for i in range(8))
+    assert all(r.ok for r in results)
+
+
+def test_repeated_crashes_fail_the_shard(tmp_path, monkeypatch):
+    shards = load_shards()
+    monkeypatch.setattr(shards, "POLL_INTERVAL", 0.05)
+    config = {"CRASH_ON": "u1", "CRASH_MARKER": str(tmp_path / "crashed"), "CRASH_ALWAYS": True}
+    results = {r.entry["url"]: r for r in shards.fetch_sharded(
+        parent_handler(config), entries(2), processes=1, shard_size=2, max_reassign=1,
+        handler_class=ShardHandler, page_opener=fake_page, mp_context=FORK,
+    )}
+    assert results["u0"].ok
+    assert "crashed 2 times" in str(results["u1"].error)
+
+
+def test_worker_metrics_and_block_stats_are_merged():
+    shards = load_shards()
+    from apparator.core.blocking import BlockStats
+    from apparator.core.metrics import Metrics
+    from apparator.core.rate_limit import RateLimiter
+
+    handler = parent_handler()
+    handler.metrics = Metrics()
+    handler.limiter = RateLimiter(rate=1000, max_rate=1000)
+    stats = BlockStats()
+    list(shards.fetch_sharded(
+        handler, entries(6), processes=2, block_stats=stats,
+        handler_class=ShardHandler, page_opener=fake_page, mp_context=FORK,
+    ))
+    assert handler.metrics.summary()["counters"]["submissions_fetched"] == 6
+    assert stats.requests_blocked == 2
+
+
+def test_sync_runner_shards_with_processes(tmp_path, monkeypatch):
+    playwright_stub.install()
+    from apparator.core import sync
+    from apparator.core.fetch_pool import FetchResult
+    from apparator.utils.state_store import SubmissionStore
+
+    calls = {}
+
+    def fake_sharded(handler, entries, processes, download_dir=None, **kwargs):
+        calls["processes"] = processes
+        for entry in entries:
+            download_dir(entry)
+            yield FetchResult(entry, details={"solution": f"code {entry['url']}", "pdf": None})
+
+    monkeypatch.setattr(sync, "fetch_sharded", fake_sharded)
+    handler = ShardHandler(None, {})
+    handler.iter_submissions = lambda known=None, known_run=None: iter(entries(2))
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    for args in (["init", "-q"], ["config", "user.email", "s@example.com"], ["config", "user.name", "S"]):
+        subprocess.run(["git", "-C", str(repo), *args], check=True)
+    with SubmissionStore(tmp_path / "state.db") as store:
+        report = sync.SyncRunner(handler, store, repo).run(processes=3, concurrency=2)
+    assert calls["processes"] == 3
+    assert report.fetched == 2 and report.committed == 2
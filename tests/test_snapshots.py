@@ -0,0 +1,113 @@
+import multiprocessing
+
+import pytest
+
+from apparator.core.http_session import HttpSession
+from apparator.utils.snapshots import SnapshotArchive, load_snapshot
+from benchmarks.fake_hackerrank import FakeHackerRank, SESSION_COOKIE
+from tests import playwright_stub
+
+
+def load_handler():
+    playwright_stub.install()
+    from apparator.handlers.hackerrank import HackerRankHandler
+    return HackerRankHandler
+
+
+def test_archive_stores_compressed_records(tmp_path):
+    archive = SnapshotArchive(tmp_path)
+    body = "<html>" + "<p>row</p>" * 500 + "</html>"
+    path = archive.add("listing", "https://hr/page=1", body, entry={"url": "u"})
+    archive.add("listing", "https://hr/page=1", body + "<!-- again -->")
+    archive.add("submission", "https://hr/s/1", "<html></html>")
+    assert path.stat().st_size < len(body) / 10
+    record = load_snapshot(path)
+    assert record["kind"] == "listing" and record["body"].endswith("<!-- again -->")
+    assert record["entry"] is None
+    assert len(archive) == 2
+    assert archive.paths(["submission"]) == [archive.path_for("submission", "https://hr/s/1")]
+    assert archive.stats.pages == 3 and archive.stats.bytes_stored < archive.stats.bytes_raw
+
+
+@pytest.fixture
+def archived_site(tmp_path):
+    """The fake site's listing pages, REST listing and submission pages, archived."""
+    archive = SnapshotArchive(tmp_path / "snapshots")
+    with FakeHackerRank(submissions=25, challenges=4, page_size=10) as site:
+        cookie = {"name": SESSION_COOKIE, "value": "ok", "domain": "127.0.0.1", "path": "/"}
+        with HttpSession([cookie]) as session:
+            for page in (1, 2, 3):
+                url = f"{site.base_url}/submissions/all?page={page}"
+                archive.add("listing", url, session.get(url).text())
+            url = f"{site.base_url}/rest/contests/master/submissions/?offset=0&limit=100"
+            archive.add("listing_api", url, session.get(url).text(), content_type="application/json")
+            for i in range(25):
+                sub = site.submission(i)
+                url = site.base_url + site.submission_path(sub)
+                archive.add("submission", url, session.get(url).text(), entry={"title": "", "url": url})
+        yield site, archive
+
+
+def test_handler_reextracts_archived_pages(archived_site):
+    HackerRankHandler = load_handler()
+    from apparator.core.reextract import reextract
+
+    site, archive = archived_site
+    results = list(reextract(archive, HackerRankHandler, {"HR_BASE_URL": site.base_url}, processes=1))
+    assert len(results) == 29 and all(r.ok and not r.missing for r in results)
+
+    listed = [e["url"] for r in results if r.kind == "listing" for e in r.details["entries"]]
+    api = [e["url"] for r in results if r.kind == "listing_api" for e in r.details["entries"]]
+    expected = [site.base_url + site.submission_path(site.submission(i)) for i in range(25)]
+    assert sorted(listed) == sorted(api) == sorted(expected)
+
+    by_url = {r.url: r.details for r in results if r.kind == "submission"}
+    for i in range(25):
+        sub = site.submission(i)
+        details = by_url[site.base_url + site.submission_path(sub)]
+        assert details["solution"] == sub["code"]
+        assert details["title"] == sub["name"]
+        assert details["statement"] == f"Solve {sub['name']}."
+        assert details["pdf_href"] == f"/static/{sub['slug']}.pdf"
+
+
+def test_reextract_refuses_handlers_without_snapshot_support(tmp_path):
+    playwright_stub.install()
+    from apparator.core.handler_base import SiteHandler
+    from apparator.core.reextract import reextract
+
+    with pytest.raises(TypeError, match="cannot re-extract"):
+        reextract(SnapshotArchive(tmp_path), SiteHandler)
+
+
+def test_reextract_spreads_chunks_over_processes(archived_site, monkeypatch):
+    HackerRankHandler = load_handler()
+    from apparator.core.reextract import reextract
+    from apparator.handlers import hackerrank
+
+    site, archive = archived_site
+    sequential = [r.as_dict() for r in reextract(archive, HackerRankHandler, processes=1)]
+    # A stale selector shows up as empty fields, not as an error
+    monkeypatch.setattr(hackerrank, "CODE_SELECTOR", ".code-editor")
+    parallel = list(reextract(
+        archive, HackerRankHandler, processes=3, chunk_size=4, kinds=["submission"],
+        mp_context=multiprocessing.get_context("fork"),
+    ))
+    assert [r.url for r in parallel] == [d["url"] for d in sequential if d["kind"] == "submission"]
+    assert all(r.ok and r.missing == ["solution"] for r in parallel)
+
+
+def test_http_fetch_archives_the_rest_model(tmp_path):
+    HackerRankHandler = load_handler()
+    archive = SnapshotArchive(tmp_path)
+    with FakeHackerRank(submissions=3, challenges=2) as site:
+        handler = HackerRankHandler(None, {"HR_BASE_URL": site.base_url, "SNAPSHOTS": archive})
+        sub = site.submission(1)
+        entry = {"title": sub["name"], "url": site.base_url + site.submission_path(sub)}
+        cookie = {"name": SESSION_COOKIE, "value": "ok", "domain": "127.0.0.1", "path": "/"}
+        with HttpSession([cookie]) as session:
+            details = handler.fetch_submission_http(entry, session)
+    (path,) = archive.paths(["submission_api"])
+    snapshot = load_snapshot(path)
+    assert snapshot["entry"] == entry
+    assert handler.extract_snapshot(snapshot) == {"title": details["title"], "solution": sub["code"]}
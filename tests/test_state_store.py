@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from apparator.utils.state_store import (
+    COMMITTED,
+    FAILED,
+    FETCHED,
+    LISTED,
+    SubmissionStore,
+)
+
+
+def entry(n):
+    return {"title": f"title-{n}", "url": f"https://x/{n}", "timestamp": f"t{n}"}
+
+
+def test_lifecycle_and_queries(tmp_path):
+    with SubmissionStore(tmp_path / "state.db") as store:
+        assert store.record_listed([entry(1), entry(2), entry(3)]) == 3
+        assert store.record_listed([entry(3), entry(4)]) == 1
+
+        store.mark_fetched("https://x/1", folder="problems/title-1")
+        store.mark_committed("https://x/1")
+        store.mark_fetched("https://x/2")
+        store.mark_failed("https://x/3", "timeout")
+
+        assert store.status("https://x/1") == COMMITTED
+        assert store.get("https://x/1")["folder"] == "problems/title-1"
+        assert [e["url"] for e in store.new_entries()] == ["https://x/4"]
+        assert [e["error"] for e in store.failed_entries()] == ["timeout"]
+        assert store.counts() == {LISTED: 1, FETCHED: 1, COMMITTED: 1, FAILED: 1}
+        assert "https://x/2" in store
+        assert len(store) == 4
+
+
+def test_state_survives_reopen(tmp_path):
+    path = tmp_path / "state.db"
+    with SubmissionStore(path) as store:
+        store.record_listed([entry(1)])
+        store.mark_fetched("https://x/1")
+    with SubmissionStore(path) as store:
+        assert store.status("https://x/1") == FETCHED
+        assert store.known_urls() == {"https://x/1"}
+
+
+def test_transaction_rolls_back_on_error(tmp_path):
+    with SubmissionStore(tmp_path / "state.db") as store:
+        store.record_listed([entry(1)])
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                store.mark_fetched("https://x/1")
+                raise RuntimeError("crash")
+        assert store.status("https://x/1") == LISTED
+
+
+def test_unknown_url_update_raises(tmp_path):
+    with SubmissionStore(tmp_path / "state.db") as store:
+        with pytest.raises(KeyError):
+            store.mark_committed("https://x/missing")
+
+
+def test_import_legacy_json(tmp_path):
+    legacy = tmp_path / "submissions.json"
+    legacy.write_text(json.dumps([entry(1), entry(2)]))
+    with SubmissionStore(tmp_path / "state.db") as store:
+        store.record_listed([entry(2)])
+        assert store.import_json(legacy) == 1
+        assert store.status("https://x/1") == COMMITTED
+        assert store.status("https://x/2") == LISTED
+
+
+def test_challenge_entries_and_migration(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        "CREATE TABLE submissions (url TEXT PRIMARY KEY, title TEXT NOT NULL DEFAULT '', "
+        "timestamp TEXT NOT NULL DEFAULT '', status TEXT NOT NULL, folder TEXT, error TEXT, "
+        "listed_at REAL NOT NULL, updated_at REAL NOT NULL)"
+    )
+    conn.commit()
+    conn.close()
+    with SubmissionStore(path) as store:
+        store.record_listed([entry(1), entry(2)])
+        store.mark_fetched("https://x/1", folder="problems/a", challenge="a", digest="d1")
+        assert [e["digest"] for e in store.challenge_entries("a")] == ["d1"]
+        assert store.challenge_entries("b") == []
@@ -0,0 +1,212 @@
+from tests import playwright_stub
+from tests.conftest import git
+
+
+def load_sync():
+    playwright_stub.install()
+    from apparator.core import sync
+    from apparator.utils import state_store
+    return sync, state_store
+
+
+class FakeHandler:
+    """
+    Lists ``urls`` newest first and fails fetches for URLs in ``broken``.
+    ``titles`` and ``code`` override a URL's problem title and solution.
+    """
+
+    def __init__(self, urls, broken=(), titles=None, code=None):
+        self.urls = list(urls)
+        self.broken = set(broken)
+        self.titles = titles or {}
+        self.code = code or {}
+        self.fetched = []
+        self.pdf_downloads = []
+        self.page = None
+        self.config = {}
+
+    def challenge_key(self, entry):
+        return entry["title"].replace(" ", "_")
+
+    def iter_submissions(self, known=None, known_run=None):
+        for url in self.urls:
+            if known is None or url not in known:
+                title = self.titles.get(url, f"Problem {url}")
+                yield {"title": title, "url": url, "timestamp": ""}
+
+    def fetch_submission(self, entry, download_dir=""):
+        self.fetched.append(entry["url"])
+        if entry["url"] in self.broken:
+            raise TimeoutError("page timed out")
+        pdf = None
+        if download_dir:
+            self.pdf_downloads.append(entry["url"])
+            pdf = f"{download_dir}/{entry['title']}.pdf"
+            with open(pdf, "wb") as fh:
+                fh.write(b"%PDF statement")
+        solution = self.code.get(entry["url"], f"code {entry['url']}")
+        return {"title": entry["title"], "statement": "", "solution": solution, "pdf": pdf}
+
+
+def commit_subjects(repo):
+    return git(repo, "log", "--format=%s").splitlines()
+
+
+def test_run_fetches_and_commits_each_entry(repo, tmp_path):
+    sync, state_store = load_sync()
+    with state_store.SubmissionStore(tmp_path / "state.db") as store:
+        handler = FakeHandler(["a", "b"])
+        report = sync.SyncRunner(handler, store, repo).run()
+        assert (report.listed, report.fetched, report.committed) == (2, 2, 2)
+        assert store.counts()[state_store.COMMITTED] == 2
+    assert sorted(commit_subjects(repo)) == ["Add Problem a", "Add Problem b"]
+    folder = repo / "problems" / "Problem_a"
+    [solution] = folder.glob("solution-*.txt")
+    assert solution.read_text() == "code a"
+    assert (folder / "statement.pdf").read_bytes() == b"%PDF statement"
+
+
+def test_http_workers_use_pages_for_handlers_without_an_http_path(repo, tmp_path):
+    sync, state_store = load_sync()
+    with state_store.SubmissionStore(tmp_path / "state.db") as store:
+        handler = FakeHandler(["a", "b"])
+        report = sync.SyncRunner(handler, store, repo).run(http_workers=4)
+        assert report.committed == 2
+    assert sorted(handler.fetched) == ["a", "b"]
+
+
+def test_failures_are_retried_until_capped(repo, tmp_path):
+    sync, state_store = load_sync()
+    with state_store.SubmissionStore(tmp_path / "state.db") as store:
+        handler = FakeHandler(["a", "bad"], broken={"bad"})
+        runner = sync.SyncRunner(handler, store, repo, max_attempts=2)
+
+        first = runner.run()
+        assert [f["url"] for f in first.failed] == ["bad"]
+        assert first.exhausted == []
+
+        second = runner.run()
+        assert [e["url"] for e in second.exhausted] == ["bad"]
+
+        third = runner.run()
+        assert third.failed == []
+        assert handler.fetched.count("bad") == 2
+        assert handler.fetched.count("a") == 1
+
+
+def test_interrupted_run_resumes_without_refetching(repo, tmp_path):
+    sync, state_store = load_sync()
+    with state_store.SubmissionStore(tmp_path / "state.db") as store:
+        handler = FakeHandler(["a"])
+        runner = sync.SyncRunner(handler, store, repo)
+        # Simulate a crash between writing the files and committing them
+        runner.list_new()
+        folder = runner.entry_folder({"title": "Problem a"})
+        folder.mkdir(parents=True)
+        (folder / "solution.txt").write_text("code a")
+        store.mark_fetched("a", folder=str(folder))
+
+        report = runner.run()
+        assert report.resumed == 1
+        assert handler.fetched == []
+        assert store.status("a") == state_store.COMMITTED
+    assert commit_subjects(repo) == ["Add Problem a"]
+
+
+def test_batched_commits_mark_entries_after_the_batch_is_written(repo, tmp_path):
+    sync, state_store = load_sync()
+    from apparator.utils.github_sync import BatchCommitter
+
+    with state_store.SubmissionStore(tmp_path / "state.db") as store:
+        handler = FakeHandler(["a", "b", "c"])
+        committer = BatchCommitter(repo, squash=True)
+        report = sync.SyncRunner(handler, store, repo, committer=committer).run()
+        assert report.committed == 3
+        assert store.counts()[state_store.COMMITTED] == 3
+    assert commit_subjects(repo) == ["Add 3 submissions"]
+
+
+def test_committed_entries_request_a_push(repo, tmp_path):
+    sync, state_store = load_sync()
+
+    class RecordingPusher:
+        requests = 0
+
+        def request(self):
+            self.requests += 1
+
+    with state_store.SubmissionStore(tmp_path / "state.db") as store:
+        pusher = RecordingPusher()
+        sync.SyncRunner(FakeHandler(["a", "b"]), store, repo, pusher=pusher).run()
+        assert pusher.requests == 2
+
+
+def test_identical_resubmissions_are_not_rewritten_or_committed(repo, tmp_path):
+    sync, state_store = load_sync()
+    urls = ["s3", "s2", "s1"]
+    handler = FakeHandler(
+        urls,
+        titles={url: "Two Sum" for url in urls},
+        code={"s3": "v2", "s2": "v1", "s1": "v1"},
+    )
+    with state_store.SubmissionStore(tmp_path / "state.db") as store:
+        report = sync.SyncRunner(handler, store, repo).run()
+        assert (report.fetched, report.committed, report.unchanged) == (3, 2, 1)
+        assert store.counts()[state_store.COMMITTED] == 3
+        assert [e["url"] for e in store.challenge_entries("Two_Sum")] == urls
+    # Only the first submission to the problem downloads its statement
+    assert len(handler.pdf_downloads) == 1
+    folder = repo / "problems" / "Two_Sum"
+    assert sorted(p.read_text() for p in folder.glob("solution-*.txt")) == ["v1", "v2"]
+    assert len(commit_subjects(repo)) == 2
+    assert git(repo, "status", "--porcelain") == ""
+
+
+def test_files_left_uncommitted_by_a_crash_are_committed(repo, tmp_path):
+    sync, state_store = load_sync()
+    handler = FakeHandler(["a"], titles={"a": "P"})
+    with state_store.SubmissionStore(tmp_path / "state.db") as store:
+        runner = sync.SyncRunner(handler, store, repo)
+        # A previous run wrote the files, then died before checkpointing
+        entry = {"title": "P", "url": "a"}
+        runner.artifacts.add_solution("P", entry, "code a")
+        pdf = tmp_path / "P.pdf"
+        pdf.write_bytes(b"%PDF statement")
+        runner.artifacts.add_statement("P", pdf)
+        report = runner.run()
+        assert (report.committed, report.unchanged) == (1, 0)
+    assert commit_subjects(repo) == ["Add P"]
+    assert git(repo, "status", "--porcelain") == ""
+
+
+def test_later_runs_reuse_the_stored_statement(repo, tmp_path):
+    sync, state_store = load_sync()
+    with state_store.SubmissionStore(tmp_path / "state.db") as store:
+        first = FakeHandler(["a"], titles={"a": "P", "b": "P"})
+        sync.SyncRunner(first, store, repo).run()
+        second = FakeHandler(["b", "a"], titles={"a": "P", "b": "P"})
+        report = sync.SyncRunner(second, store, repo).run()
+        assert report.committed == 1
+    assert second.pdf_downloads == []
+
+
+def test_statement_claim_is_released_when_no_pdf_was_stored(repo, tmp_path):
+    sync, state_store = load_sync()
+
+    class NoPdfHandler(FakeHandler):
+        def fetch_submission(self, entry, download_dir=""):
+            details = super().fetch_submission(entry, download_dir)
+            if entry["url"] == "a":
+                details["pdf"] = None
+            return details
+
+    handler = NoPdfHandler(["a"], titles={"a": "P", "b": "P"})
+    with state_store.SubmissionStore(tmp_path / "state.db") as store:
+        runner = sync.SyncRunner(handler, store, repo)
+        runner.run()
+        assert not (repo / "problems" / "P" / "statement.pdf").exists()
+        handler.urls = ["b", "a"]
+        runner.run()
+    # The same runner tries the statement again with the next submission
+    assert handler.pdf_downloads == ["a", "b"]
+    assert (repo / "problems" / "P" / "statement.pdf").exists()
@@ -0,0 +1,103 @@
+from tests import playwright_stub
+from tests.conftest import git
+
+
+def load_watch():
+    playwright_stub.install()
+    from apparator.core import watch
+    from apparator.core.handler_base import SessionExpired
+    from apparator.core.sync import SyncRunner
+    from apparator.utils.state_store import SubmissionStore
+    return watch, SessionExpired, SyncRunner, SubmissionStore
+
+
+class WatchedHandler:
+    """
+    Serves ``timeline[i]`` (newest first) as the listing at poll ``i``;
+    ``expire_at`` lists the polls whose first attempt finds the session
+    expired.
+    """
+
+    def __init__(self, timeline, expire_at=()):
+        self.timeline = timeline
+        self.expire_at = set(expire_at)
+        self.tick = 0
+        self.logged_in = True
+        self.logins = 0
+        self.listings = 0
+        self.peeks = 0
+        self.config = {}
+        self.page = None
+
+    def current(self):
+        return self.timeline[min(self.tick, len(self.timeline) - 1)]
+
+    def challenge_key(self, entry):
+        return entry["title"].replace(" ", "_")
+
+    def ensure_login(self, storage_path=None):
+        if self.logged_in:
+            return False
+        self.logged_in = True
+        self.logins += 1
+        return True
+
+    def newest_submission(self):
+        self.tick += 1
+        self.peeks += 1
+        if self.tick in self.expire_at:
+            self.expire_at.discard(self.tick)
+            self.logged_in = False
+            self.tick -= 1
+            from apparator.core.handler_base import SessionExpired
+            raise SessionExpired("401")
+        urls = self.current()
+        return {"title": f"Problem {urls[0]}", "url": urls[0], "timestamp": ""} if urls else None
+
+    def iter_submissions(self, known=None, known_run=None):
+        self.listings += 1
+        for url in self.current():
+            if known is None or url not in known:
+                yield {"title": f"Problem {url}", "url": url, "timestamp": ""}
+
+    def fetch_submission(self, entry, download_dir=""):
+        return {"title": entry["title"], "solution": f"code {entry['url']}", "pdf": None}
+
+
+def make_watcher(repo, tmp_path, handler, **kwargs):
+    watch, _, SyncRunner, SubmissionStore = load_watch()
+    store = SubmissionStore(tmp_path / "state.db")
+    runner = SyncRunner(handler, store, repo)
+    return watch.Watcher(runner, interval=0, max_interval=0, **kwargs)
+
+
+def test_watch_only_syncs_when_something_new_appears(repo, tmp_path):
+    handler = WatchedHandler([["a"], ["a"], ["a"], ["b", "a"], ["b", "a"]])
+    reports = []
+    watcher = make_watcher(repo, tmp_path, handler, on_sync=reports.append)
+    watcher.run(max_polls=4)
+    assert watcher.polls == 4
+    assert watcher.syncs == 2
+    assert handler.listings == 2
+    assert [r.committed for r in reports] == [1, 1]
+    assert git(repo, "log", "--format=%s").splitlines() == ["Add Problem b", "Add Problem a"]
+
+
+def test_watch_reloads_an_expired_session(repo, tmp_path):
+    handler = WatchedHandler([["a"], ["b", "a"]], expire_at={1})
+    watcher = make_watcher(repo, tmp_path, handler)
+    watcher.run(max_polls=1)
+    assert handler.logins == 1
+    assert watcher.session_reloads == 1
+    assert watcher.syncs == 2
+
+
+def test_idle_polls_back_off_up_to_the_maximum(repo, tmp_path, monkeypatch):
+    watch, _, SyncRunner, SubmissionStore = load_watch()
+    handler = WatchedHandler([["a"]])
+    runner = SyncRunner(handler, SubmissionStore(tmp_path / "state.db"), repo)
+    watcher = watch.Watcher(runner, interval=1, max_interval=5, backoff=2)
+    delays = []
+    monkeypatch.setattr(watcher._stop, "wait", lambda delay: delays.append(delay) or False)
+    watcher.run(max_polls=5)
+    assert delays == [1, 2, 4, 5, 5]